@@ -8,7 +8,12 @@ from django.db.models.functions import TruncMonth
 
 from rangefilter.filters import DateRangeFilter
 
-from .models import Expenses, ExpenseType
+from vlore_back.admin import EstimatedCountMixin, TrigramSearchMixin
+from vlore_back.aggregation import grouping_sets_aggregate
+
+from .models import ExpenseMonthlyRollup, Expenses, ExpenseType
+from .services.rollup import rollup_filters
+from .services.stats_cache import get_cached_totals
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +25,25 @@ class ExpenseTypeAdmin(admin.ModelAdmin):
     ordering = ['name']
 
 
+@admin.register(ExpenseMonthlyRollup)
+class ExpenseMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ['month', 'expense_type', 'is_fixed', 'total', 'count']
+    list_filter = ['expense_type', 'is_fixed']
+    list_select_related = ['expense_type']
+    ordering = ['-month']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Expenses)
-class ExpensesAdmin(admin.ModelAdmin):
+class ExpensesAdmin(TrigramSearchMixin, EstimatedCountMixin, admin.ModelAdmin):
     list_display = [
         'date',
         'expense_type_display',
@@ -54,6 +76,8 @@ class ExpensesAdmin(admin.ModelAdmin):
 
     ordering = ['-date']
     list_per_page = 20
+    # expense_type_display lee el tipo de cada fila
+    list_select_related = ['expense_type']
 
     def expense_type_display(self, obj):
         """
@@ -154,33 +178,53 @@ class ExpensesAdmin(admin.ModelAdmin):
                     """
                     return f"${amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
-                totales = {
-                    'total': format_amount(
-                        queryset.aggregate(total=Sum('amount'))['total'] or 0
-                    ),
-                    'por_mes': [
+                def compute_totales():
+                    # Los totales se cachean bajo la versión nueva apenas se
+                    # confirma un cambio: se calculan en la base principal para
+                    # no guardar datos de una réplica atrasada
+                    filters = rollup_filters(request.GET)
+                    if filters is not None:
+                        source = ExpenseMonthlyRollup.objects.using('default').filter(**filters)
+                        amount = 'total'
+                    else:
+                        source = queryset.using('default').annotate(
+                            month=TruncMonth('date')
+                        )
+                        amount = 'amount'
+
+                    # Total, meses y tipos de gasto salen de una sola consulta
+                    resultados = grouping_sets_aggregate(
+                        source,
                         {
-                            'mes': mes['mes'],
-                            'total': format_amount(mes['total'])
-                        }
-                        for mes in queryset.annotate(
-                            mes=TruncMonth('date')
-                        ).values('mes').annotate(
-                            total=Sum('amount')
-                        ).order_by('-mes')[:3]
-                    ],
-                    'por_categoria': [
-                        {
-                            'nombre': cat['expense_type__name'],
-                            'total': format_amount(cat['total'])
-                        }
-                        for cat in queryset.values(
-                            'expense_type__name'
-                        ).annotate(
-                            total=Sum('amount')
-                        ).order_by('-total')
-                    ]
-                }
+                            'total': (),
+                            'por_mes': ('month',),
+                            'por_categoria': ('expense_type__name',),
+                        },
+                        {'total': Sum(amount)},
+                    )
+                    por_mes = sorted(resultados['por_mes'], key=lambda mes: mes['month'], reverse=True)
+                    por_categoria = sorted(resultados['por_categoria'], key=lambda cat: cat['total'], reverse=True)
+
+                    return {
+                        'total': format_amount(resultados['total'][0]['total'] or 0),
+                        'por_mes': [
+                            {
+                                'mes': mes['month'],
+                                'total': format_amount(mes['total'])
+                            }
+                            for mes in por_mes[:3]
+                        ],
+                        'por_categoria': [
+                            {
+                                'nombre': cat['expense_type__name'],
+                                'total': format_amount(cat['total'])
+                            }
+                            for cat in por_categoria
+                        ]
+                    }
+
+                # Los totales se cachean por filtros y versión de los datos
+                totales = get_cached_totals(request.GET, compute_totales)
 
                 response.context_data['totales'] = totales
 
@@ -6,15 +6,16 @@ from expenses.constants import ExpenseTypeChoices
 
 def create_expense_types(apps, schema_editor):
     ExpenseType = apps.get_model('expenses', 'ExpenseType')
+    db_alias = schema_editor.connection.alias
     
     # Crear los tipos de gastos desde las constantes
     for code, name in ExpenseTypeChoices.choices:
-        ExpenseType.objects.create(code=code, name=name)
+        ExpenseType.objects.using(db_alias).create(code=code, name=name)
 
 
 def reverse_create_expense_types(apps, schema_editor):
     ExpenseType = apps.get_model('expenses', 'ExpenseType')
-    ExpenseType.objects.all().delete()
+    ExpenseType.objects.using(schema_editor.connection.alias).all().delete()
 
 
 class Migration(migrations.Migration):
@@ -60,7 +61,9 @@ class Migration(migrations.Migration):
         
         # 5. Migrar los datos
         migrations.RunPython(
-            code=lambda apps, schema_editor: apps.get_model('expenses', 'Expenses').objects.all().update(
+            code=lambda apps, schema_editor: apps.get_model('expenses', 'Expenses').objects.using(
+                schema_editor.connection.alias
+            ).update(
                 expense_type_code=models.F('expense_type')
             ),
             reverse_code=lambda apps, schema_editor: None
@@ -68,7 +71,9 @@ class Migration(migrations.Migration):
         
         # 6. Actualizar la relación
         migrations.RunPython(
-            code=lambda apps, schema_editor: apps.get_model('expenses', 'Expenses').objects.all().update(
+            code=lambda apps, schema_editor: apps.get_model('expenses', 'Expenses').objects.using(
+                schema_editor.connection.alias
+            ).update(
                 expense_type_new_id=models.Subquery(
                     apps.get_model('expenses', 'ExpenseType').objects.filter(
                         code=models.OuterRef('expense_type_code')
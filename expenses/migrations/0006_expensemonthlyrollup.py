@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollup(apps, schema_editor):
+    """Carga el resumen mensual a partir de los gastos existentes"""
+    Expenses = apps.get_model('expenses', 'Expenses')
+    ExpenseMonthlyRollup = apps.get_model('expenses', 'ExpenseMonthlyRollup')
+    db_alias = schema_editor.connection.alias
+    ExpenseMonthlyRollup.objects.using(db_alias).bulk_create([
+        ExpenseMonthlyRollup(**row)
+        for row in (
+            Expenses.objects.using(db_alias)
+            .annotate(month=TruncMonth('date'))
+            .values('month', 'expense_type_id', 'is_fixed')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0005_expenses_is_fixed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mes')),
+                ('is_fixed', models.BooleanField(null=True, verbose_name='Gasto fijo')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Total')),
+                ('count', models.PositiveIntegerField(verbose_name='Cantidad de gastos')),
+                ('expense_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='expenses.expensetype', verbose_name='Tipo de gasto')),
+            ],
+            options={
+                'verbose_name': 'Resumen mensual de gastos',
+                'verbose_name_plural': 'Resúmenes mensuales de gastos',
+                'indexes': [models.Index(fields=['month'], name='expenses_ex_month_a4851c_idx')],
+            },
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
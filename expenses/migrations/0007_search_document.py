@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-18 11:37
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from vlore_back.search import normalize_search_text
+
+
+def build_search_documents(apps, schema_editor):
+    """Arma el documento de búsqueda de los gastos existentes"""
+    Expenses = apps.get_model('expenses', 'Expenses')
+    db_alias = schema_editor.connection.alias
+    expenses = list(Expenses.objects.using(db_alias).select_related('expense_type'))
+    for expense in expenses:
+        values = [expense.observations]
+        if expense.expense_type:
+            values.extend([expense.expense_type.name, expense.expense_type.code])
+        expense.search_document = normalize_search_text(*values)
+    Expenses.objects.using(db_alias).bulk_update(expenses, ['search_document'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0006_expensemonthlyrollup'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='expenses',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expenses',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='expenses_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
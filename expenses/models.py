@@ -1,7 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from vlore_back.models import TimestampsMixin
+from vlore_back.models import SearchDocumentMixin, TimestampsMixin
 
 
 class ExpenseType(TimestampsMixin):
@@ -27,7 +28,7 @@ class ExpenseType(TimestampsMixin):
         return self.name
 
 
-class Expenses(TimestampsMixin):
+class Expenses(TimestampsMixin, SearchDocumentMixin):
     date = models.DateField(
         verbose_name=_('Fecha del gasto'),
         help_text=_('Fecha en que se realizó el gasto')
@@ -64,6 +65,51 @@ class Expenses(TimestampsMixin):
         verbose_name = _('Gasto')
         verbose_name_plural = _('Gastos')
         ordering = ['-date']
+        indexes = [
+            GinIndex(fields=['search_document'], opclasses=['gin_trgm_ops'], name='expenses_search_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.expense_type.name} - {self.date} - ${self.amount}"
+
+    def get_search_document_values(self):
+        # Incluye el tipo de gasto: se actualiza desde una señal si se renombra
+        values = [self.observations]
+        if self.expense_type:
+            values.extend([self.expense_type.name, self.expense_type.code])
+        return values
+
+
+class ExpenseMonthlyRollup(models.Model):
+    """
+    Totales de gastos por mes, tipo de gasto y gasto fijo/variable
+
+    Se recalcula dentro de la misma transacción en que se crea, modifica o
+    borra un gasto (ver services/rollup.py). Incluye los gastos dados de baja
+    con deleted_at, igual que el listado del admin, para que el pie sume las
+    mismas filas que se listan.
+    """
+    month = models.DateField(verbose_name=_('Mes'))
+
+    expense_type = models.ForeignKey(
+        ExpenseType,
+        on_delete=models.CASCADE,
+        verbose_name=_('Tipo de gasto'),
+        null=True,
+    )
+
+    is_fixed = models.BooleanField(null=True, verbose_name=_('Gasto fijo'))
+
+    total = models.DecimalField(max_digits=14, decimal_places=2, verbose_name=_('Total'))
+
+    count = models.PositiveIntegerField(verbose_name=_('Cantidad de gastos'))
+
+    class Meta:
+        verbose_name = _('Resumen mensual de gastos')
+        verbose_name_plural = _('Resúmenes mensuales de gastos')
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%m/%Y} - {self.expense_type} - ${self.total}"
@@ -0,0 +1,125 @@
+import datetime
+
+from django import forms
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from ..models import ExpenseMonthlyRollup, Expenses
+
+# Clave del advisory lock que serializa las recargas del resumen mensual
+ROLLUP_LOCK_ID = 8_202_402
+
+
+def month_start(date):
+    """Primer día del mes de `date`"""
+    return date.replace(day=1)
+
+
+def next_month(date):
+    """Primer día del mes siguiente al de `date`"""
+    return (month_start(date) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def refresh_expense_rollup(months):
+    """
+    Recalcula el resumen mensual de los meses indicados
+
+    Las filas de esos meses se borran y se vuelven a insertar a partir de
+    Expenses. Se ejecuta en la transacción en curso, con un advisory lock para
+    que dos recargas concurrentes del mismo mes no dupliquen filas.
+
+    Args:
+        months: Iterable de fechas; se toma el mes de cada una
+    """
+    months = sorted({month_start(month) for month in months if month is not None})
+    if not months:
+        return
+
+    dates = Q()
+    for month in months:
+        dates |= Q(date__gte=month, date__lt=next_month(month))
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ROLLUP_LOCK_ID])
+
+        ExpenseMonthlyRollup.objects.filter(month__in=months).delete()
+        ExpenseMonthlyRollup.objects.bulk_create([
+            ExpenseMonthlyRollup(**row)
+            for row in (
+                Expenses.objects.filter(dates)
+                .annotate(month=TruncMonth('date'))
+                .values('month', 'expense_type_id', 'is_fixed')
+                .annotate(total=Sum('amount'), count=Count('id'))
+                .order_by()
+            )
+        ])
+
+
+def rebuild_expense_rollup():
+    """Reconstruye el resumen mensual completo"""
+    months = (
+        Expenses.objects.annotate(month=TruncMonth('date'))
+        .values_list('month', flat=True)
+        .distinct()
+        .order_by()
+    )
+    with transaction.atomic():
+        ExpenseMonthlyRollup.objects.all().delete()
+        refresh_expense_rollup(list(months))
+
+
+def rollup_filters(params):
+    """
+    Traduce los filtros del listado de gastos a filtros de ExpenseMonthlyRollup
+
+    Solo se pueden resolver desde el resumen los filtros por tipo de gasto,
+    gasto fijo y un rango de fechas que empiece y termine en bordes de mes,
+    sin búsqueda.
+
+    Args:
+        params: QueryDict con los parámetros GET del listado
+
+    Returns:
+        dict | None: Filtros para ExpenseMonthlyRollup, o None si hay que
+        agregar sobre Expenses
+    """
+    filters = {}
+    date_field = forms.DateField()
+
+    for key, values in params.lists():
+        value = values[-1]
+        try:
+            if key in ('p', 'o'):
+                continue
+            elif key == 'q':
+                if value.strip():
+                    return None
+            elif key == 'date__range__gte':
+                if value:
+                    date = date_field.clean(value)
+                    if date.day != 1:
+                        return None
+                    filters['month__gte'] = date
+            elif key == 'date__range__lte':
+                if value:
+                    date = date_field.clean(value)
+                    if next_month(date) - datetime.timedelta(days=1) != date:
+                        return None
+                    filters['month__lte'] = month_start(date)
+            elif key == 'expense_type__id__exact':
+                filters['expense_type_id'] = int(value)
+            elif key == 'expense_type__isnull':
+                filters['expense_type__isnull'] = value in ('True', 'true', '1')
+            elif key == 'is_fixed__exact':
+                filters['is_fixed'] = value in ('True', 'true', '1')
+            elif key == 'is_fixed__isnull':
+                filters['is_fixed__isnull'] = value in ('True', 'true', '1')
+            else:
+                return None
+        except (forms.ValidationError, ValueError):
+            return None
+
+    return filters
@@ -0,0 +1,65 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Versión de los datos de gastos: cambia con cada alta, modificación o baja
+VERSION_KEY = 'expenses:stats:version'
+
+# Parámetros del listado que no cambian el conjunto filtrado
+IGNORED_PARAMS = ('p', 'o')
+
+
+def get_stats_version():
+    """Devuelve la versión actual de los datos, inicializándola si no existe"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # time_ns evita reutilizar una versión vieja si se vacía la caché
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_stats_version():
+    """
+    Invalida todos los totales cacheados
+
+    Se asigna una versión nueva en lugar de incrementarla: FileBasedCache no
+    tiene incr atómico entre procesos y dos cambios concurrentes igual dejan
+    una versión distinta a la anterior.
+    """
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def stats_cache_key(params):
+    """
+    Clave de caché de los totales para los parámetros GET del listado
+
+    Los parámetros se normalizan (orden, valores vacíos, paginación y orden
+    de columnas) para que el mismo filtro siempre use la misma clave.
+    """
+    normalized = sorted(
+        (key, sorted(value for value in values if value))
+        for key, values in params.lists()
+        if key not in IGNORED_PARAMS
+    )
+    normalized = [(key, values) for key, values in normalized if values]
+    digest = hashlib.md5(repr(normalized).encode('utf-8')).hexdigest()
+    return f"expenses:stats:{get_stats_version()}:{digest}"
+
+
+def get_cached_totals(params, compute):
+    """
+    Devuelve los totales del listado desde la caché o los calcula con `compute`
+
+    Args:
+        params: QueryDict con los parámetros GET del listado
+        compute: Función sin argumentos que calcula los totales
+    """
+    key = stats_cache_key(params)
+    totals = cache.get(key)
+    if totals is None:
+        totals = compute()
+        cache.set(key, totals, settings.EXPENSES_STATS_CACHE_TIMEOUT)
+    return totals
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Expenses, ExpenseType
+from .services.rollup import refresh_expense_rollup
+from .services.stats_cache import bump_stats_version
+
+
+@receiver(pre_save, sender=Expenses)
+def remember_previous_date(sender, instance, **kwargs):
+    """Guarda la fecha anterior del gasto para recalcular también ese mes"""
+    instance._rollup_previous_date = None
+    if instance.pk:
+        instance._rollup_previous_date = (
+            Expenses.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+        )
+
+
+@receiver(pre_save, sender=ExpenseType)
+def remember_previous_name(sender, instance, **kwargs):
+    """Guarda el nombre y código anteriores del tipo para saber si cambiaron"""
+    instance._previous_name = None
+    if instance.pk:
+        instance._previous_name = (
+            ExpenseType.objects.filter(pk=instance.pk).values_list('name', 'code').first()
+        )
+
+
+@receiver(post_save, sender=Expenses)
+def refresh_rollup_on_save(sender, instance, raw=False, **kwargs):
+    """Recalcula el resumen mensual en la misma transacción"""
+    if raw:
+        return
+    refresh_expense_rollup([instance.date, getattr(instance, '_rollup_previous_date', None)])
+
+
+@receiver(post_delete, sender=Expenses)
+def refresh_rollup_on_delete(sender, instance, **kwargs):
+    refresh_expense_rollup([instance.date])
+
+
+@receiver(post_save, sender=Expenses)
+@receiver(post_delete, sender=Expenses)
+@receiver(post_save, sender=ExpenseType)
+@receiver(post_delete, sender=ExpenseType)
+def invalidate_stats_cache(sender, **kwargs):
+    """Invalida los totales cacheados del listado cuando se confirma el cambio"""
+    transaction.on_commit(bump_stats_version)
+
+
+@receiver(post_save, sender=ExpenseType)
+def refresh_search_documents(sender, instance, raw=False, **kwargs):
+    """
+    El documento de búsqueda de los gastos incluye el nombre y código de su tipo
+
+    Solo se reescribe si cambió alguno de los dos: un tipo nuevo todavía no
+    tiene gastos y otras ediciones no afectan la búsqueda.
+    """
+    if raw:
+        return
+    previous_name = getattr(instance, '_previous_name', None)
+    if previous_name is None or previous_name == (instance.name, instance.code):
+        return
+    expenses = list(instance.expenses_set.select_related('expense_type'))
+    for expense in expenses:
+        expense.update_search_document()
+    Expenses.objects.bulk_update(expenses, ['search_document'], batch_size=500)
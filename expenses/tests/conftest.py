@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Caché en memoria propia del test, en lugar de la caché en archivos compartida"""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
@@ -0,0 +1,17 @@
+import datetime
+from decimal import Decimal
+
+from expenses.models import Expenses, ExpenseType
+
+
+def create_expense(code='VAR', name='Varios', **overrides):
+    """Gasto válido; el tipo se reutiliza si ya existe (los tipos base los crea una migración)"""
+    expense_type, _ = ExpenseType.objects.get_or_create(code=code, defaults={'name': name})
+    data = {
+        'date': datetime.date(2024, 1, 15),
+        'expense_type': expense_type,
+        'amount': Decimal('100.00'),
+        'is_fixed': False,
+    }
+    data.update(overrides)
+    return Expenses.objects.create(**data)
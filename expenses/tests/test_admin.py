@@ -0,0 +1,42 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib import admin
+from django.urls import reverse
+from django.utils import timezone
+
+from expenses.models import ExpenseMonthlyRollup
+
+from .factories import create_expense
+
+pytestmark = pytest.mark.django_db
+
+
+def test_monthly_rollup_is_read_only(rf, admin_user):
+    request = rf.get('/')
+    request.user = admin_user
+    model_admin = admin.site._registry[ExpenseMonthlyRollup]
+
+    assert not model_admin.has_add_permission(request)
+    assert not model_admin.has_change_permission(request)
+    assert not model_admin.has_delete_permission(request)
+
+
+@pytest.mark.usefixtures('locmem_cache')
+@pytest.mark.parametrize('params', [
+    # Sin filtros: los totales salen del resumen mensual
+    {},
+    # Rango que no termina en borde de mes: se agrega sobre Expenses
+    {'date__range__gte': '2024-01-01', 'date__range__lte': '2024-02-20'},
+])
+def test_footer_total_matches_listed_rows(admin_client, params):
+    create_expense(amount=Decimal('100.00'))
+    create_expense(amount=Decimal('40.00'), date=datetime.date(2024, 2, 10))
+    create_expense(amount=Decimal('25.00'), deleted_at=timezone.now())
+
+    response = admin_client.get(reverse('admin:expenses_expenses_changelist'), params)
+
+    listed = sum(expense.amount for expense in response.context['cl'].result_list)
+    assert listed == Decimal('165.00')
+    assert response.context['totales']['total'] == '$165,00'
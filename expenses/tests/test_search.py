@@ -0,0 +1,44 @@
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from expenses.models import Expenses
+
+from .factories import create_expense
+
+pytestmark = pytest.mark.django_db
+
+
+def search(term):
+    model_admin = admin.site._registry[Expenses]
+    queryset, _ = model_admin.get_search_results(None, Expenses.objects.all(), term)
+    return set(queryset.values_list('observations', flat=True))
+
+
+def test_search_matches_observations_and_expense_type():
+    create_expense(code='PUB', name='Publicidad', observations='Campaña de invierno')
+    create_expense(code='ALQ', name='Alquiler', observations='Local céntrico')
+
+    assert search('campana') == {'Campaña de invierno'}
+    assert search('publicidad invierno') == {'Campaña de invierno'}
+    assert search('alq') == {'Local céntrico'}
+
+
+def test_renaming_expense_type_updates_search_documents():
+    expense = create_expense(code='PUB', name='Publicidad', observations='Campaña de invierno')
+
+    expense.expense_type.name = 'Marketing digital'
+    expense.expense_type.save()
+
+    assert search('marketing') == {'Campaña de invierno'}
+    assert search('publicidad') == set()
+
+
+def test_saving_expense_type_without_renaming_keeps_search_documents():
+    expense = create_expense(code='PUB', name='Publicidad', observations='Campaña de invierno')
+
+    with CaptureQueriesContext(connection) as queries:
+        expense.expense_type.save()
+
+    assert not any('search_document' in query['sql'] for query in queries.captured_queries)
@@ -0,0 +1,91 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.http import QueryDict
+from django.urls import reverse
+
+from expenses.models import ExpenseMonthlyRollup, Expenses, ExpenseType
+from expenses.services.stats_cache import get_cached_totals, get_stats_version, stats_cache_key
+from vlore_back.routers import REPLICA_DB, replica_configured
+
+from .factories import create_expense
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('locmem_cache')]
+
+
+def test_cache_key_ignores_order_empty_values_and_pagination():
+    key = stats_cache_key(QueryDict('expense_type__id__exact=2&is_fixed__exact=1&q='))
+
+    assert stats_cache_key(QueryDict('is_fixed__exact=1&p=3&o=2&expense_type__id__exact=2')) == key
+    assert stats_cache_key(QueryDict('is_fixed__exact=0&expense_type__id__exact=2')) != key
+
+
+def test_totals_are_computed_once_per_version():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': len(calls)}
+
+    params = QueryDict('is_fixed__exact=1')
+    assert get_cached_totals(params, compute) == {'total': 1}
+    assert get_cached_totals(params, compute) == {'total': 1}
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('change', ['save', 'delete'])
+def test_expense_changes_bump_version_on_commit(django_capture_on_commit_callbacks, change):
+    expense = create_expense()
+    version = get_stats_version()
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        if change == 'save':
+            expense.amount = Decimal('250.00')
+            expense.save()
+        else:
+            expense.delete()
+        # Hasta confirmar la transacción se siguen sirviendo los totales anteriores
+        assert get_stats_version() == version
+
+    assert callbacks
+    assert get_stats_version() != version
+
+
+def test_changelist_totals_follow_new_expenses(admin_client, django_capture_on_commit_callbacks):
+    create_expense(amount=Decimal('100.00'))
+    url = reverse('admin:expenses_expenses_changelist')
+
+    assert admin_client.get(url).context['totales']['total'] == '$100,00'
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_expense(amount=Decimal('50.00'))
+
+    assert admin_client.get(url).context['totales']['total'] == '$150,00'
+
+
+@pytest.mark.skipif(not replica_configured(), reason='Sin réplica configurada (DB_REPLICA_HOST)')
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_totals_are_not_cached_from_replica(admin_client):
+    create_expense(amount=Decimal('100.00'))
+    # La réplica atrasada tiene otros datos: el listado los muestra, los totales no
+    [expense_type] = ExpenseType.objects.using(REPLICA_DB).bulk_create([ExpenseType(code='REP', name='Réplica')])
+    Expenses.objects.using(REPLICA_DB).bulk_create([
+        Expenses(date=datetime.date(2024, 1, 15), expense_type=expense_type, amount=Decimal('999.00'), is_fixed=False),
+    ])
+    ExpenseMonthlyRollup.objects.using(REPLICA_DB).create(
+        month=datetime.date(2024, 1, 1), expense_type=expense_type, is_fixed=False, total=Decimal('999.00'), count=1
+    )
+    url = reverse('admin:expenses_expenses_changelist')
+
+    response = admin_client.get(url)
+    assert [expense.amount for expense in response.context['cl'].result_list] == [Decimal('999.00')]
+    assert response.context['totales']['total'] == '$100,00'
+
+    # Fuera de una transacción el alta confirma y cambia la versión enseguida
+    version = get_stats_version()
+    create_expense(amount=Decimal('50.00'))
+    assert get_stats_version() != version
+
+    assert admin_client.get(url).context['totales']['total'] == '$150,00'
+    assert admin_client.get(url, {'q': 'zzz'}).context['totales']['total'] == '$0,00'
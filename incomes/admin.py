@@ -1,11 +1,63 @@
+import datetime
+import re
+
 from django.contrib import admin
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.html import format_html
+from django.utils.text import smart_split, unescape_string_literal
+
+from vlore_back.admin import EstimatedCountMixin, KeysetPaginationMixin
+
+from .constants import OrderStatus
+from .filters import CachedFacetListFilter
+from .models import (
+    Income,
+    IncomeDailyRollup,
+    IncomeFacetValue,
+    IncomeLine,
+    TiendanubeSyncState,
+    TiendanubeWebhookEvent,
+)
+
+# Período por defecto y cantidad de filas del reporte de productos más vendidos
+TOP_PRODUCTS_DAYS = 90
+TOP_PRODUCTS_LIMIT = 50
+
+# Términos de búsqueda que parecen un identificador (número de orden, CUIT,
+# id de transacción): sin espacios, con al menos un dígito y sin '@'
+IDENTIFIER_TERM = re.compile(r'^#?(?=.*\d)[\w./-]+$')
+
+# Campos de texto libre de la búsqueda (con índices GIN de trigramas sobre UPPER)
+TEXT_SEARCH_FIELDS = ('buyer_name', 'email', 'product_name')
 
-from .models import Income
+
+def parse_report_date(value):
+    """Fecha AAAA-MM-DD de un parámetro del reporte, o None si falta o no es válida"""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        # Bien formada pero inexistente, p. ej. 2024-02-30
+        return None
+
+
+class IncomeLineInline(admin.TabularInline):
+    model = IncomeLine
+    extra = 0
+    can_delete = False
+    fields = ('sku', 'name', 'unit_price', 'quantity', 'line_total')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Income)
-class IncomeAdmin(admin.ModelAdmin):
+class IncomeAdmin(KeysetPaginationMixin, EstimatedCountMixin, admin.ModelAdmin):
     list_display = (
         'order_number',
         'buyer_name',
@@ -20,11 +72,11 @@ class IncomeAdmin(admin.ModelAdmin):
         'payment_status',
         'shipping_status',
         'date',
-        'currency',
-        'country',
-        'payment_method',
-        'shipping_method',
-        'channel'
+        ('currency', CachedFacetListFilter),
+        ('country', CachedFacetListFilter),
+        ('payment_method', CachedFacetListFilter),
+        ('shipping_method', CachedFacetListFilter),
+        ('channel', CachedFacetListFilter)
     )
     search_fields = (
         'order_number',
@@ -37,6 +89,7 @@ class IncomeAdmin(admin.ModelAdmin):
     )
     date_hierarchy = 'date'
     readonly_fields = ('created_at', 'updated_at')
+    inlines = [IncomeLineInline]
 
     fieldsets = (
         ('Información de la Orden', {
@@ -117,7 +170,186 @@ class IncomeAdmin(admin.ModelAdmin):
         )
     total_display.short_description = 'Total'
 
-    def get_queryset(self, request):
-        """Optimización de consultas para mejorar el rendimiento"""
-        queryset = super().get_queryset(request)
-        return queryset.select_related()
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Búsqueda del listado resuelta con índices
+
+        Cada término se busca con icontains sobre el texto libre (índices de
+        trigramas). Los que además parecen un identificador se comparan por
+        igualdad o prefijo contra los campos de identificación (índices
+        varchar_pattern_ops), en OR con el texto libre para que "cliente42" o
+        el "2" de "Remera 2" sigan encontrando nombres y productos. Todos los
+        términos deben coincidir.
+        """
+        terms = [
+            unescape_string_literal(term) if term[0] in ('"', "'") and term[-1] == term[0] else term
+            for term in smart_split(search_term)
+        ]
+        terms = [term.strip() for term in terms if term.strip()]
+        if not terms:
+            return queryset, False
+
+        for term in terms:
+            condition = Q()
+            for field in TEXT_SEARCH_FIELDS:
+                condition |= Q(**{f'{field}__icontains': term})
+            if IDENTIFIER_TERM.match(term):
+                identifier = term.lstrip('#')
+                digits = re.sub(r'\D', '', identifier)
+                condition |= (
+                    Q(order_number__startswith=identifier)
+                    | Q(order_id=identifier)
+                    | Q(tax_id__startswith=identifier)
+                    | Q(payment_transaction_id__startswith=identifier)
+                )
+                if digits and digits != identifier:
+                    # El CUIT puede estar guardado sin guiones
+                    condition |= Q(tax_id__startswith=digits)
+            queryset = queryset.filter(condition)
+
+        return queryset, False
+
+    def get_urls(self):
+        urls = [
+            path(
+                'top-products/',
+                self.admin_site.admin_view(self.top_products_view),
+                name='incomes_income_top_products'
+            ),
+            path(
+                'revenue/',
+                self.admin_site.admin_view(self.revenue_report_view),
+                name='incomes_income_revenue'
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def top_products_view(self, request):
+        """
+        Reporte de productos más vendidos en un rango de fechas
+
+        Agrupa IncomeLine por SKU dentro del rango: el índice (date, sku) permite
+        resolverlo sin recorrer la tabla de ingresos.
+        """
+        today = timezone.localdate()
+        date_to = parse_report_date(request.GET.get('hasta')) or today
+        date_from = parse_report_date(request.GET.get('desde')) or date_to - datetime.timedelta(days=TOP_PRODUCTS_DAYS)
+
+        products = (
+            IncomeLine.objects
+            .filter(date__range=(date_from, date_to))
+            .values('sku')
+            .annotate(
+                name=Max('name'),
+                units=Sum('quantity'),
+                revenue=Sum('line_total'),
+                orders=Count('income_id', distinct=True),
+            )
+            .order_by('-revenue')[:TOP_PRODUCTS_LIMIT]
+        )
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Productos más vendidos',
+            'products': products,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+        return TemplateResponse(request, 'admin/incomes/income/top_products.html', context)
+
+    def revenue_report_view(self, request):
+        """
+        Facturación mensual o anual leída del resumen diario (IncomeDailyRollup)
+
+        No incluye las órdenes canceladas.
+        """
+        period = request.GET.get('periodo', 'mes')
+        trunc = TruncYear if period == 'anio' else TruncMonth
+
+        rows = (
+            IncomeDailyRollup.objects
+            .exclude(order_status=OrderStatus.CANCELLED)
+            .annotate(period=trunc('date'))
+            .values('period')
+            .annotate(
+                revenue=Sum('revenue'),
+                discount=Sum('discount'),
+                shipping=Sum('shipping'),
+                orders=Sum('orders'),
+                units=Sum('units'),
+            )
+            .order_by('-period')
+        )
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Facturación anual' if period == 'anio' else 'Facturación mensual',
+            'period': period,
+            'rows': rows,
+        }
+        return TemplateResponse(request, 'admin/incomes/income/revenue_report.html', context)
+
+
+@admin.register(IncomeDailyRollup)
+class IncomeDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'order_status', 'payment_status', 'channel', 'revenue', 'orders', 'units')
+    list_filter = ('order_status', 'payment_status', 'channel')
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IncomeFacetValue)
+class IncomeFacetValueAdmin(admin.ModelAdmin):
+    list_display = ('field', 'value', 'count')
+    list_filter = ('field',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TiendanubeSyncState)
+class TiendanubeSyncStateAdmin(admin.ModelAdmin):
+    list_display = ('store_id', 'last_updated_at', 'last_run_at')
+    readonly_fields = ('last_run_at',)
+
+
+@admin.register(TiendanubeWebhookEvent)
+class TiendanubeWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event', 'resource_id', 'received_at', 'processed_at', 'attempts', 'leased_until')
+    list_filter = ('event',)
+    search_fields = ('resource_id',)
+    actions = ('retry_events',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Reintentar los eventos seleccionados')
+    def retry_events(self, request, queryset):
+        """
+        Devuelve a la cola los eventos pendientes seleccionados
+
+        Reinicia los intentos y la espera para que el próximo lote los tome,
+        aunque hayan agotado TIENDANUBE_WEBHOOK_MAX_ATTEMPTS. Los eventos ya
+        procesados no se modifican.
+        """
+        updated = queryset.filter(processed_at__isnull=True).update(attempts=0, leased_until=None)
+        self.message_user(request, f"{updated} eventos devueltos a la cola")
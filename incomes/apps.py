@@ -5,3 +5,6 @@ class IncomesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'incomes'
     verbose_name = 'Ingresos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
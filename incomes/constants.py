@@ -22,3 +22,12 @@ class ShippingStatus(models.TextChoices):
     SHIPPED = 'enviado', _('Enviado')
     DELIVERED = 'entregado', _('Entregado')
     # Añadir otros estados según sea necesario
+
+
+class WebhookEvent(models.TextChoices):
+    """Eventos de pedidos de Tiendanube que se procesan vía webhook"""
+    ORDER_CREATED = 'order/created', _('Pedido creado')
+    ORDER_UPDATED = 'order/updated', _('Pedido actualizado')
+    ORDER_PAID = 'order/paid', _('Pedido pagado')
+    ORDER_FULFILLED = 'order/fulfilled', _('Pedido enviado')
+    ORDER_CANCELLED = 'order/cancelled', _('Pedido cancelado')
@@ -0,0 +1,17 @@
+from django.contrib.admin import AllValuesFieldListFilter
+
+from .services.facets import get_facet_values
+
+
+class CachedFacetListFilter(AllValuesFieldListFilter):
+    """
+    Filtro por valores de un campo que lee las opciones de IncomeFacetValue
+
+    Igual que AllValuesFieldListFilter, pero sin el SELECT DISTINCT sobre
+    toda la tabla de ingresos: las opciones salen de la tabla de valores
+    precalculados, que se recarga con cada importación.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_choices = get_facet_values(field_path)
@@ -0,0 +1,123 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+INDEX_STATS_SQL = """
+    SELECT
+        s.relname,
+        s.indexrelname,
+        s.idx_scan,
+        pg_relation_size(s.indexrelid),
+        pg_size_pretty(pg_relation_size(s.indexrelid)),
+        i.indisunique OR i.indisprimary,
+        i.indkey::text,
+        i.indclass::text,
+        pg_get_expr(i.indexprs, i.indrelid),
+        pg_get_expr(i.indpred, i.indrelid)
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema()
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Informa uso y tamaño de los índices (pg_stat_user_indexes) y señala los que '
+        'no se usan o están duplicados por otro índice de la misma tabla'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tabla', help='Limita el informe a una tabla, p. ej. incomes_income')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('La auditoría de índices requiere PostgreSQL')
+
+        sql = INDEX_STATS_SQL
+        params = []
+        if options['tabla']:
+            sql += ' AND s.relname = %s'
+            params.append(options['tabla'])
+        sql += ' ORDER BY s.relname, pg_relation_size(s.indexrelid) DESC'
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()')
+            stats_reset = cursor.fetchone()[0]
+            cursor.execute(sql, params)
+            indexes = [
+                {
+                    'table': row[0],
+                    'name': row[1],
+                    'scans': row[2],
+                    'bytes': row[3],
+                    'size': row[4],
+                    'unique': row[5],
+                    'columns': row[6].split(),
+                    'opclasses': row[7].split(),
+                    'expressions': row[8],
+                    'predicate': row[9],
+                }
+                for row in cursor.fetchall()
+            ]
+
+        if not indexes:
+            self.stdout.write('No hay índices para informar')
+            return
+
+        self.stdout.write(f"Estadísticas acumuladas desde: {stats_reset or 'el inicio del servidor'}")
+        self.stdout.write(f"{'Tabla':<32} {'Índice':<40} {'Lecturas':>12} {'Tamaño':>10}")
+        for index in indexes:
+            self.stdout.write(
+                f"{index['table']:<32} {index['name']:<40} {index['scans']:>12} {index['size']:>10}"
+            )
+
+        unused = [index for index in indexes if index['scans'] == 0 and not index['unique']]
+        if unused:
+            self.stdout.write(self.style.WARNING(
+                '\nSin lecturas (solo suman costo a cada escritura):'
+            ))
+            for index in unused:
+                self.stdout.write(f"  {index['table']}.{index['name']} ({index['size']})")
+
+        redundant = self.find_redundant(indexes)
+        if redundant:
+            self.stdout.write(self.style.WARNING('\nDuplicados o cubiertos por otro índice:'))
+            for index, covering in redundant:
+                self.stdout.write(
+                    f"  {index['table']}.{index['name']} ({index['size']}) -> {covering['name']}"
+                )
+
+        wasted = sum(index['bytes'] for index in unused) + sum(index['bytes'] for index, _ in redundant)
+        if not unused and not redundant:
+            self.stdout.write(self.style.SUCCESS('\nNo se encontraron índices sin uso ni duplicados'))
+        else:
+            self.stdout.write(f"\nEspacio ocupado por los índices señalados: {wasted // 1024} KB")
+
+    def find_redundant(self, indexes):
+        """
+        Índices cuyas columnas son un prefijo de las de otro índice de la misma tabla
+
+        Solo se comparan índices sobre columnas (sin expresiones ni condición)
+        con las mismas clases de operadores; los índices únicos no se señalan
+        porque además garantizan una restricción.
+        """
+        redundant = []
+        for index in indexes:
+            if index['unique'] or index['expressions'] or index['predicate']:
+                continue
+            size = len(index['columns'])
+            for other in indexes:
+                if (
+                    other is index
+                    or other['table'] != index['table']
+                    or other['expressions']
+                    or other['predicate']
+                    or other['columns'][:size] != index['columns']
+                    or other['opclasses'][:size] != index['opclasses']
+                ):
+                    continue
+                # Entre dos índices idénticos se señala solo uno de ellos
+                if len(other['columns']) == size and not other['unique'] and other['name'] > index['name']:
+                    continue
+                redundant.append((index, other))
+                break
+        return redundant
@@ -0,0 +1,117 @@
+import csv
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from incomes.models import Income
+from incomes.services.import_incomes import parse_row
+from incomes.services.row_parser import INCOME_CSV_COLUMNS, IncomeRowParser
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara filas/s del parser compilado (IncomeRowParser) contra el parser '
+        'fila por fila (parse_row) sobre un CSV de ventas generado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000, help='Filas del archivo generado')
+        parser.add_argument('--file', help='Usar un CSV existente en lugar de generar uno')
+        parser.add_argument('--keep-file', action='store_true', help='No borrar el archivo generado')
+
+    def handle(self, *args, **options):
+        file_path = options['file']
+        generated = not file_path
+        if generated:
+            file_path = self.generate_file(options['rows'])
+
+        try:
+            results = [
+                ('parse_row (DictReader)', self.run_legacy(file_path, build=False)),
+                ('IncomeRowParser', self.run_compiled(file_path, build=False)),
+                ('parse_row + Income()', self.run_legacy(file_path, build=True)),
+                ('IncomeRowParser + Income()', self.run_compiled(file_path, build=True)),
+            ]
+        finally:
+            if generated and not options['keep_file']:
+                os.remove(file_path)
+            elif generated:
+                self.stdout.write(f"Archivo generado: {file_path}")
+
+        for name, (rows, elapsed) in results:
+            self.stdout.write(f"{name:<30} {rows} filas en {elapsed:.2f}s -> {rows / elapsed:,.0f} filas/s")
+
+        legacy_rate = results[2][1][0] / results[2][1][1]
+        compiled_rate = results[3][1][0] / results[3][1][1]
+        self.stdout.write(self.style.SUCCESS(f"Mejora con Income(): x{compiled_rate / legacy_rate:.2f}"))
+
+    def generate_file(self, rows):
+        """Genera un CSV con el formato de la exportación de ventas de Tiendanube"""
+        random.seed(0)
+        start = datetime.date(2023, 1, 1)
+        prices = [f"{random.randint(1000, 90000)},{random.choice(['00', '50', '99'])}" for _ in range(300)]
+        names = ['Juan Pérez', 'María González', 'Lucía Fernández', 'Martín Gómez', 'Sofía Díaz']
+        header = [column for _, column, _, _ in INCOME_CSV_COLUMNS]
+
+        fd, file_path = tempfile.mkstemp(suffix='.csv', prefix='ventas_bench_')
+        self.stdout.write(f"Generando {rows} filas...")
+        with os.fdopen(fd, 'w', encoding='cp1252', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(header)
+            for number in range(rows):
+                date = (start + datetime.timedelta(days=number % 700)).strftime('%d/%m/%Y')
+                price = random.choice(prices)
+                values = {
+                    'Número de orden': str(10000 + number),
+                    'Email': f"cliente{number % 5000}@ejemplo.com",
+                    'Fecha': date,
+                    'Estado de la orden': 'cerrada',
+                    'Estado del pago': 'pagado',
+                    'Estado del envío': 'enviado',
+                    'Moneda': 'ARS',
+                    'Subtotal de productos': price,
+                    'Descuento': '0,00',
+                    'Costo de envío': random.choice(['0,00', '3500,00', '4200,50']),
+                    'Total': price,
+                    'Nombre del comprador': random.choice(names),
+                    'DNI / CUIT': str(20000000 + number % 9000),
+                    'Fecha de pago': date,
+                    'Fecha de envío': date,
+                    'Nombre del producto': 'Remera básica',
+                    'Precio del producto': price,
+                    'Cantidad del producto': str(random.randint(1, 3)),
+                    'SKU': f"SKU-{number % 400}",
+                    'Canal': 'Tienda online',
+                    'Identificador de la orden': str(900000000 + number),
+                    'Producto Físico': 'Sí',
+                }
+                writer.writerow([values.get(column, '') for column in header])
+        return file_path
+
+    def run_legacy(self, file_path, build):
+        started = time.perf_counter()
+        rows = 0
+        with open(file_path, 'r', encoding='cp1252', newline='') as csv_file:
+            for row in csv.DictReader(csv_file):
+                fields = parse_row(row)
+                if build:
+                    Income(**fields)
+                rows += 1
+        return rows, time.perf_counter() - started
+
+    def run_compiled(self, file_path, build):
+        started = time.perf_counter()
+        rows = 0
+        with open(file_path, 'r', encoding='cp1252', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            parse = IncomeRowParser(next(reader))
+            for row in reader:
+                fields = parse(row)
+                if build:
+                    Income(**fields)
+                rows += 1
+        return rows, time.perf_counter() - started
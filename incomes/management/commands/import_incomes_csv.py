@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from incomes.services.bulk_upsert import UPSERT_BATCH_SIZE
+from incomes.services.copy_incomes import import_csv_copy
+from incomes.services.import_incomes import import_csv, import_csv_batched
+from incomes.services.parallel_import import import_csv_parallel
+
+
+class Command(BaseCommand):
+    help = 'Importa ventas desde un archivo CSV exportado de Tiendanube'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file_path', help='Ruta al archivo CSV de ventas')
+        parser.add_argument(
+            '--mode',
+            choices=['row', 'batch', 'copy'],
+            default='batch',
+            help=(
+                'row: guarda fila por fila; batch: upsert por lotes (por defecto); '
+                'copy: COPY a una tabla de staging y merge único (solo PostgreSQL)'
+            )
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=UPSERT_BATCH_SIZE,
+            help='Cantidad de filas por lote en el modo batch'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos para parsear el archivo en paralelo en el modo batch'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor a cero')
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser mayor a cero')
+        if options['workers'] > 1 and options['mode'] != 'batch':
+            raise CommandError('--workers solo está disponible en el modo batch')
+
+        if options['mode'] == 'row':
+            count, errors = import_csv(options['file_path'])
+            self.stdout.write(self.style.SUCCESS(f"{count} registros importados, {errors} errores"))
+            return
+
+        if options['mode'] == 'copy':
+            created, updated, errors, rows_per_second = import_csv_copy(options['file_path'])
+        elif options['workers'] > 1:
+            created, updated, errors, rows_per_second = import_csv_parallel(
+                options['file_path'],
+                workers=options['workers'],
+                batch_size=options['batch_size']
+            )
+        else:
+            created, updated, errors, rows_per_second = import_csv_batched(
+                options['file_path'],
+                batch_size=options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} creados, {updated} actualizados, {errors} errores "
+            f"({rows_per_second:.0f} filas/s)"
+        ))
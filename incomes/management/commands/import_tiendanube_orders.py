@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from incomes.services.tiendanube_api import TiendanubeAPI
+
+
+class Command(BaseCommand):
+    help = 'Importa los pedidos de Tiendanube al modelo Income'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Cantidad de días hacia atrás a importar'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.TIENDANUBE_CONCURRENCY,
+            help='Solicitudes simultáneas a la API de Tiendanube'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Importa solo los pedidos modificados desde la última sincronización '
+                '(la primera vez usa --days)'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency debe ser mayor a cero')
+
+        if options['incremental']:
+            created, updated, errors = TiendanubeAPI.sync_orders_incrementally(
+                initial_days=options['days'],
+                concurrency=options['concurrency']
+            )
+        else:
+            created, updated, errors = TiendanubeAPI.import_orders_to_incomes(
+                days_ago=options['days'],
+                concurrency=options['concurrency']
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación completada: {created} creados, {updated} actualizados, {errors} errores"
+        ))
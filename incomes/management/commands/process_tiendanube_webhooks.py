@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from incomes.services.webhooks import process_pending_events
+
+
+class Command(BaseCommand):
+    help = 'Procesa los eventos de webhook de Tiendanube encolados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TIENDANUBE_WEBHOOK_BATCH_SIZE,
+            help='Eventos a procesar por lote'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir esperando eventos nuevos en lugar de terminar cuando la cola queda vacía'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Segundos de espera entre consultas cuando la cola está vacía (con --loop) o un lote solo tuvo errores'
+        )
+
+    def handle(self, *args, **options):
+        total_processed = 0
+        total_errors = 0
+
+        while True:
+            processed, errors = process_pending_events(batch_size=options['batch_size'])
+            total_processed += processed
+            total_errors += errors
+
+            if processed or errors:
+                self.stdout.write(f"Lote procesado: {processed} eventos, {errors} errores")
+            if processed:
+                continue
+            if errors:
+                # Los eventos fallidos quedan en espera; no insistir de inmediato
+                time.sleep(options['interval'])
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Procesamiento completado: {total_processed} eventos, {total_errors} errores"
+        ))
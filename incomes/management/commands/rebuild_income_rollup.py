@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from incomes.services.rollup import rebuild_income_rollup
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de ingresos (IncomeDailyRollup) para un rango de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial (AAAA-MM-DD); por defecto la primera venta')
+        parser.add_argument('--hasta', help='Fecha final (AAAA-MM-DD); por defecto la última venta')
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ('desde', 'hasta'):
+            value = options[option]
+            try:
+                dates[option] = parse_date(value) if value else None
+            except ValueError:
+                # Bien formada pero inexistente, p. ej. 2024-02-30
+                dates[option] = None
+            if value and dates[option] is None:
+                raise CommandError(f'--{option} debe tener el formato AAAA-MM-DD')
+
+        rows = rebuild_income_rollup(dates['desde'], dates['hasta'])
+        self.stdout.write(self.style.SUCCESS(f"Resumen reconstruido: {rows} filas"))
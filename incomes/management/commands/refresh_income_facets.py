@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from incomes.models import IncomeFacetValue
+from incomes.services.facets import refresh_income_facets
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los valores de los filtros laterales del listado de ingresos (IncomeFacetValue)'
+
+    def handle(self, *args, **options):
+        refresh_income_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f"Filtros recalculados: {IncomeFacetValue.objects.count()} valores"
+        ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-18 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TiendanubeSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.CharField(max_length=50, unique=True, verbose_name='Tienda')),
+                ('last_updated_at', models.DateTimeField(blank=True, help_text='Marca de agua: updated_at del último pedido importado', null=True, verbose_name='Pedidos sincronizados hasta')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Última ejecución')),
+            ],
+            options={
+                'verbose_name': 'Estado de sincronización con Tiendanube',
+                'verbose_name_plural': 'Estados de sincronización con Tiendanube',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0002_tiendanubesyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TiendanubeWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.CharField(max_length=50, verbose_name='Tienda')),
+                ('event', models.CharField(choices=[('order/created', 'Pedido creado'), ('order/updated', 'Pedido actualizado'), ('order/paid', 'Pedido pagado'), ('order/fulfilled', 'Pedido enviado'), ('order/cancelled', 'Pedido cancelado')], max_length=30, verbose_name='Evento')),
+                ('resource_id', models.CharField(max_length=50, verbose_name='Identificador del pedido')),
+                ('payload', models.JSONField(verbose_name='Contenido')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Recibido')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Procesado')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+            ],
+            options={
+                'verbose_name': 'Evento de webhook de Tiendanube',
+                'verbose_name_plural': 'Eventos de webhook de Tiendanube',
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['received_at'], name='incomes_webhook_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0003_tiendanubewebhookevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncomeLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('sku', models.CharField(blank=True, max_length=50, verbose_name='SKU')),
+                ('name', models.CharField(max_length=255, verbose_name='Nombre del producto')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio unitario')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('line_total', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Total de la línea')),
+                ('income', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='incomes.income', verbose_name='Ingreso')),
+            ],
+            options={
+                'verbose_name': 'Línea de ingreso',
+                'verbose_name_plural': 'Líneas de ingreso',
+                'indexes': [models.Index(fields=['sku'], name='incomes_inc_sku_c95cfa_idx'), models.Index(fields=['date', 'sku'], name='incomes_inc_date_31b7ac_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def backfill_lines(apps, schema_editor):
+    """
+    Crea una línea por cada ingreso existente a partir de sus campos de producto
+
+    Se hace con un único INSERT ... SELECT para no traer los ingresos a memoria.
+    """
+    Income = apps.get_model('incomes', 'Income')
+    IncomeLine = apps.get_model('incomes', 'IncomeLine')
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"""
+        INSERT INTO {quote(IncomeLine._meta.db_table)}
+            (income_id, date, sku, name, unit_price, quantity, line_total)
+        SELECT id, date, COALESCE(sku, ''), product_name, product_price,
+               product_quantity, product_price * product_quantity
+        FROM {quote(Income._meta.db_table)}
+        """
+    )
+
+
+def remove_lines(apps, schema_editor):
+    IncomeLine = apps.get_model('incomes', 'IncomeLine')
+    IncomeLine.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0004_incomeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lines, remove_lines),
+    ]
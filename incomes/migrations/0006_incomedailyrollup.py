@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+
+def build_rollup(apps, schema_editor):
+    """Carga el resumen diario a partir de los ingresos existentes en un único INSERT ... SELECT"""
+    Income = apps.get_model('incomes', 'Income')
+    IncomeLine = apps.get_model('incomes', 'IncomeLine')
+    IncomeDailyRollup = apps.get_model('incomes', 'IncomeDailyRollup')
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"""
+        INSERT INTO {quote(IncomeDailyRollup._meta.db_table)}
+            (date, order_status, payment_status, channel, revenue, discount, shipping, orders, units)
+        SELECT i.date, i.order_status, i.payment_status, COALESCE(i.channel, ''),
+               SUM(i.total), SUM(i.discount), SUM(i.shipping_cost),
+               COUNT(*), COALESCE(SUM(l.units), 0)
+        FROM {quote(Income._meta.db_table)} AS i
+        LEFT JOIN (
+            SELECT income_id, SUM(quantity) AS units
+            FROM {quote(IncomeLine._meta.db_table)}
+            GROUP BY income_id
+        ) AS l ON l.income_id = i.id
+        GROUP BY i.date, i.order_status, i.payment_status, COALESCE(i.channel, '')
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0005_backfill_incomeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncomeDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('order_status', models.CharField(choices=[('abierta', 'Abierta'), ('cerrada', 'Cerrada'), ('cancelada', 'Cancelada')], max_length=20, verbose_name='Estado de la orden')),
+                ('payment_status', models.CharField(choices=[('pendiente', 'Pendiente'), ('pagado', 'Pagado'), ('cancelado', 'Cancelado')], max_length=20, verbose_name='Estado del pago')),
+                ('channel', models.CharField(blank=True, max_length=50, verbose_name='Canal')),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Facturación')),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Descuentos')),
+                ('shipping', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Envíos')),
+                ('orders', models.PositiveIntegerField(verbose_name='Pedidos')),
+                ('units', models.PositiveIntegerField(verbose_name='Unidades')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de ingresos',
+                'verbose_name_plural': 'Resúmenes diarios de ingresos',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='incomedailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'order_status', 'payment_status', 'channel'), name='incomes_daily_rollup_key'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
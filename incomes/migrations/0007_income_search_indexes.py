@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-18 11:36
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0006_incomedailyrollup'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='income',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('buyer_name'), name='gin_trgm_ops'), name='incomes_buyer_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'), name='incomes_email_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('product_name'), name='gin_trgm_ops'), name='incomes_product_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['order_number'], name='incomes_order_number_like', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['tax_id'], name='incomes_tax_id_like', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['payment_transaction_id'], name='incomes_payment_tx_like', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
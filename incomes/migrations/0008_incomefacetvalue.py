@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-18 11:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+FACET_FIELDS = ('currency', 'country', 'payment_method', 'shipping_method', 'channel')
+
+
+def build_facets(apps, schema_editor):
+    """Carga los valores de los filtros a partir de los ingresos existentes"""
+    Income = apps.get_model('incomes', 'Income')
+    IncomeFacetValue = apps.get_model('incomes', 'IncomeFacetValue')
+    db_alias = schema_editor.connection.alias
+    IncomeFacetValue.objects.using(db_alias).bulk_create([
+        IncomeFacetValue(field=field, value=row[field], count=row['count'])
+        for field in FACET_FIELDS
+        for row in Income.objects.using(db_alias).values(field).annotate(count=Count('id')).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0007_income_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncomeFacetValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=50, verbose_name='Campo')),
+                ('value', models.CharField(blank=True, max_length=255, null=True, verbose_name='Valor')),
+                ('count', models.PositiveIntegerField(blank=True, help_text='Vacío hasta la próxima recarga completa', null=True, verbose_name='Ingresos')),
+            ],
+            options={
+                'verbose_name': 'Valor de filtro de ingresos',
+                'verbose_name_plural': 'Valores de filtros de ingresos',
+                'indexes': [models.Index(fields=['field', 'value'], name='incomes_inc_field_d8a2dc_idx')],
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0008_incomefacetvalue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['date', 'id'], name='incomes_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-18 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0009_income_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_order_n_88f5d6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_email_e6ccff_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_date_e0bc36_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_order_s_f883ab_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_payment_6ca58e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_shippin_a195d0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_buyer_n_f1e017_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='incomes_inc_order_i_f75942_idx',
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['date', 'order_status', 'payment_status'], name='incomes_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['channel', 'date'], name='incomes_channel_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('order_status', 'abierta')), fields=['-date'], name='incomes_open_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('payment_status', 'pendiente')), fields=['-date'], name='incomes_unpaid_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['sku'], name='incomes_sku_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incomes', '0010_income_index_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiendanubewebhookevent',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reservado hasta'),
+        ),
+    ]
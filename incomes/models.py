@@ -1,7 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
-from .constants import OrderStatus, PaymentStatus, ShippingStatus
+from .constants import OrderStatus, PaymentStatus, ShippingStatus, WebhookEvent
 
 
 class Income(models.Model):
@@ -239,21 +241,217 @@ class Income(models.Model):
         verbose_name_plural = _('Ingresos')
         ordering = ['-date']
         indexes = [
-            models.Index(fields=['order_number']),
-            models.Index(fields=['email']),
-            models.Index(fields=['date']),
-            models.Index(fields=['order_status']),
-            models.Index(fields=['payment_status']),
-            models.Index(fields=['shipping_status']),
-            models.Index(fields=['buyer_name']),
-            models.Index(fields=['order_id']),
+            # Listado y reportes: rango de fechas, opcionalmente por estado de la orden y del pago
+            models.Index(fields=['date', 'order_status', 'payment_status'], name='incomes_date_status_idx'),
+            models.Index(fields=['channel', 'date'], name='incomes_channel_date_idx'),
+            # Órdenes abiertas y pagos pendientes: pocas filas que se consultan seguido
+            models.Index(
+                fields=['-date'],
+                name='incomes_open_date_idx',
+                condition=models.Q(order_status=OrderStatus.OPEN)
+            ),
+            models.Index(
+                fields=['-date'],
+                name='incomes_unpaid_date_idx',
+                condition=models.Q(payment_status=PaymentStatus.PENDING)
+            ),
+            models.Index(fields=['sku'], name='incomes_sku_idx'),
+            # Orden estable del listado y cursor de la paginación por keyset del admin
+            models.Index(fields=['date', 'id'], name='incomes_date_id_idx'),
+            # Búsqueda del admin: icontains sobre texto libre usa UPPER(col) LIKE '%...%'
+            GinIndex(OpClass(Upper('buyer_name'), name='gin_trgm_ops'), name='incomes_buyer_name_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='incomes_email_trgm'),
+            GinIndex(OpClass(Upper('product_name'), name='gin_trgm_ops'), name='incomes_product_name_trgm'),
+            # Búsqueda por identificadores: igualdad y prefijo (LIKE 'x%'). El de
+            # order_number reemplaza al índice común; order_id ya tiene el de unique
+            models.Index(fields=['order_number'], name='incomes_order_number_like', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['tax_id'], name='incomes_tax_id_like', opclasses=['varchar_pattern_ops']),
+            models.Index(
+                fields=['payment_transaction_id'],
+                name='incomes_payment_tx_like',
+                opclasses=['varchar_pattern_ops']
+            ),
         ]
 
     def __str__(self):
         return f"Orden #{self.order_number} - {self.buyer_name} - {self.total} {self.currency}"
 
-    def save(self, *args, **kwargs):
-        # Asegurarse de que el total se calcule correctamente
+    def compute_total(self):
+        """Recalcula el total a partir del subtotal, el descuento y el costo de envío"""
         if self.product_subtotal and self.discount is not None and self.shipping_cost is not None:
             self.total = self.product_subtotal - self.discount + self.shipping_cost
+
+    def save(self, *args, **kwargs):
+        # Asegurarse de que el total se calcule correctamente
+        self.compute_total()
         super().save(*args, **kwargs)
+
+
+class IncomeLine(models.Model):
+    """
+    Línea de producto de un ingreso: una por cada producto del pedido
+
+    La fecha se copia del ingreso para poder agregar por (fecha, SKU) sin join.
+    """
+    income = models.ForeignKey(
+        Income,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name=_('Ingreso')
+    )
+    date = models.DateField(_('Fecha'))
+    sku = models.CharField(_('SKU'), max_length=50, blank=True)
+    name = models.CharField(_('Nombre del producto'), max_length=255)
+    unit_price = models.DecimalField(
+        _('Precio unitario'),
+        max_digits=12,
+        decimal_places=2
+    )
+    quantity = models.PositiveIntegerField(_('Cantidad'))
+    line_total = models.DecimalField(
+        _('Total de la línea'),
+        max_digits=12,
+        decimal_places=2
+    )
+
+    class Meta:
+        verbose_name = _('Línea de ingreso')
+        verbose_name_plural = _('Líneas de ingreso')
+        indexes = [
+            models.Index(fields=['sku']),
+            models.Index(fields=['date', 'sku']),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.name}"
+
+    def save(self, *args, **kwargs):
+        self.line_total = self.unit_price * self.quantity
+        super().save(*args, **kwargs)
+
+
+class IncomeDailyRollup(models.Model):
+    """
+    Totales de ventas por día, estado de la orden, estado del pago y canal
+
+    Se mantiene de forma incremental desde los guardados e importaciones de
+    Income (ver services/rollup.py) para que los reportes no recorran la tabla
+    de ingresos completa. El canal vacío o nulo se guarda como ''.
+    """
+    date = models.DateField(_('Fecha'))
+    order_status = models.CharField(
+        _('Estado de la orden'),
+        max_length=20,
+        choices=OrderStatus.choices
+    )
+    payment_status = models.CharField(
+        _('Estado del pago'),
+        max_length=20,
+        choices=PaymentStatus.choices
+    )
+    channel = models.CharField(_('Canal'), max_length=50, blank=True)
+    revenue = models.DecimalField(_('Facturación'), max_digits=14, decimal_places=2)
+    discount = models.DecimalField(_('Descuentos'), max_digits=14, decimal_places=2)
+    shipping = models.DecimalField(_('Envíos'), max_digits=14, decimal_places=2)
+    orders = models.PositiveIntegerField(_('Pedidos'))
+    units = models.PositiveIntegerField(_('Unidades'))
+
+    class Meta:
+        verbose_name = _('Resumen diario de ingresos')
+        verbose_name_plural = _('Resúmenes diarios de ingresos')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'order_status', 'payment_status', 'channel'],
+                name='incomes_daily_rollup_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.order_status} {self.payment_status} {self.channel}"
+
+
+class IncomeFacetValue(models.Model):
+    """
+    Valores distintos de los filtros laterales del listado de ingresos
+
+    Evita un SELECT DISTINCT sobre toda la tabla de ingresos en cada carga
+    del listado. Se recarga al terminar cada importación o sincronización y
+    los guardados sueltos solo agregan los valores nuevos (ver services/facets.py).
+    """
+    field = models.CharField(_('Campo'), max_length=50)
+    value = models.CharField(_('Valor'), max_length=255, null=True, blank=True)
+    count = models.PositiveIntegerField(
+        _('Ingresos'),
+        null=True,
+        blank=True,
+        help_text=_('Vacío hasta la próxima recarga completa')
+    )
+
+    class Meta:
+        verbose_name = _('Valor de filtro de ingresos')
+        verbose_name_plural = _('Valores de filtros de ingresos')
+        indexes = [
+            models.Index(fields=['field', 'value']),
+        ]
+
+    def __str__(self):
+        return f"{self.field}: {self.value}"
+
+
+class TiendanubeSyncState(models.Model):
+    """
+    Estado de la sincronización incremental de pedidos de una tienda de Tiendanube
+    """
+    store_id = models.CharField(_('Tienda'), max_length=50, unique=True)
+    last_updated_at = models.DateTimeField(
+        _('Pedidos sincronizados hasta'),
+        blank=True,
+        null=True,
+        help_text=_('Marca de agua: updated_at del último pedido importado')
+    )
+    last_run_at = models.DateTimeField(
+        _('Última ejecución'),
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        verbose_name = _('Estado de sincronización con Tiendanube')
+        verbose_name_plural = _('Estados de sincronización con Tiendanube')
+
+    def __str__(self):
+        return f"Tienda {self.store_id} - {self.last_updated_at or 'sin sincronizar'}"
+
+
+class TiendanubeWebhookEvent(models.Model):
+    """
+    Cola de eventos recibidos por webhook desde Tiendanube
+
+    El endpoint solo persiste el evento; el comando process_tiendanube_webhooks
+    los aplica a Income en lotes. Mientras se procesa, el evento queda
+    reservado hasta leased_until.
+    """
+    store_id = models.CharField(_('Tienda'), max_length=50)
+    event = models.CharField(_('Evento'), max_length=30, choices=WebhookEvent.choices)
+    resource_id = models.CharField(_('Identificador del pedido'), max_length=50)
+    payload = models.JSONField(_('Contenido'))
+    received_at = models.DateTimeField(_('Recibido'), auto_now_add=True)
+    processed_at = models.DateTimeField(_('Procesado'), blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(_('Intentos'), default=0)
+    last_error = models.TextField(_('Último error'), blank=True)
+    leased_until = models.DateTimeField(_('Reservado hasta'), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _('Evento de webhook de Tiendanube')
+        verbose_name_plural = _('Eventos de webhook de Tiendanube')
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(
+                fields=['received_at'],
+                condition=models.Q(processed_at__isnull=True),
+                name='incomes_webhook_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.resource_id}"
@@ -0,0 +1,201 @@
+from django.db import DatabaseError, transaction
+
+from vlore_back.metrics import record_import_rows
+
+from ..models import Income, IncomeLine
+
+# Cantidad de filas por lote por defecto para las importaciones masivas
+UPSERT_BATCH_SIZE = 1000
+
+# Campos que se sobrescriben cuando la orden ya existe (se conserva la fecha de creación)
+UPDATE_FIELDS = [
+    field.name
+    for field in Income._meta.concrete_fields
+    if not field.primary_key and field.name not in ('order_id', 'created_at')
+]
+
+
+def upsert_incomes(
+    incomes, update_fields=None, failed_order_ids=None, touched_dates=None, duplicate_order_ids=None
+):
+    """
+    Inserta o actualiza un lote de ingresos usando order_id como clave
+
+    Cada lote se escribe con un único bulk_create(update_conflicts=True) dentro
+    de su propia transacción. Si el lote falla, se divide a la mitad y se
+    reintenta hasta aislar las filas con error, sin volver a escribir fila por fila.
+
+    Si una orden aparece más de una vez en el lote se guarda su primera
+    aparición, como la importación fila por fila (donde las siguientes
+    chocaban con el order_id único); las repetidas no se cuentan como
+    creadas, actualizadas ni con error.
+
+    Args:
+        incomes: Lista de instancias de Income sin guardar
+        update_fields: Campos a sobrescribir en las órdenes existentes (por defecto todos)
+        failed_order_ids: Lista opcional donde se agregan los order_id que no se pudieron guardar
+        touched_dates: Set opcional donde se agregan las fechas afectadas (anteriores y
+            nuevas) para recalcular el resumen diario
+        duplicate_order_ids: Lista opcional donde se agrega el order_id de cada fila
+            repetida que no se escribió
+
+    Returns:
+        Tuple: (created, updated, errors)
+    """
+    created = 0
+    updated = 0
+    errors = 0
+
+    # Postgres no permite actualizar dos veces la misma fila en un mismo INSERT ... ON CONFLICT
+    by_order_id = {}
+    for income in incomes:
+        if not income.order_id:
+            errors += 1
+            print(f"Error al procesar fila: falta el identificador de la orden ({income.order_number})")
+            continue
+        if income.order_id in by_order_id:
+            if duplicate_order_ids is not None:
+                duplicate_order_ids.append(income.order_id)
+            continue
+        income.compute_total()
+        by_order_id[income.order_id] = income
+
+    batch_created, batch_updated, batch_errors = _write_batch(
+        list(by_order_id.values()),
+        update_fields or UPDATE_FIELDS,
+        failed_order_ids if failed_order_ids is not None else [],
+        touched_dates if touched_dates is not None else set()
+    )
+
+    created += batch_created
+    updated += batch_updated
+    errors += batch_errors
+    record_import_rows(created, updated, errors)
+    return created, updated, errors
+
+
+def _write_batch(incomes, update_fields, failed_order_ids, touched_dates):
+    """Escribe el lote en una transacción y, si falla, lo bisecta para aislar errores"""
+    if not incomes:
+        return 0, 0, 0
+
+    try:
+        with transaction.atomic():
+            existing = dict(
+                Income.objects.filter(
+                    order_id__in=[income.order_id for income in incomes]
+                ).values_list('order_id', 'date')
+            )
+            Income.objects.bulk_create(
+                incomes,
+                update_conflicts=True,
+                unique_fields=['order_id'],
+                update_fields=update_fields,
+            )
+    except DatabaseError as e:
+        if len(incomes) == 1:
+            print(f"Error al guardar la orden {incomes[0].order_id}: {e}")
+            failed_order_ids.append(incomes[0].order_id)
+            return 0, 0, 1
+
+        middle = len(incomes) // 2
+        left = _write_batch(incomes[:middle], update_fields, failed_order_ids, touched_dates)
+        right = _write_batch(incomes[middle:], update_fields, failed_order_ids, touched_dates)
+        return tuple(a + b for a, b in zip(left, right))
+
+    touched_dates.update(existing.values())
+    touched_dates.update(income.date for income in incomes)
+    updated = len(existing)
+    return len(incomes) - updated, updated, 0
+
+
+def save_income_lines(lines_by_order_id, replace_order_ids):
+    """
+    Guarda las líneas de producto de un lote de órdenes ya guardadas
+
+    Las órdenes en `replace_order_ids` pierden sus líneas anteriores antes de
+    insertar las nuevas; al resto se les agregan. Las órdenes que no existen
+    en Income (p. ej. porque fallaron al guardarse) se ignoran.
+
+    Args:
+        lines_by_order_id: Dict {order_id: [{sku, name, unit_price, quantity}, ...]}
+        replace_order_ids: order_id cuyas líneas existentes se reemplazan
+    """
+    if not lines_by_order_id:
+        return
+
+    with transaction.atomic():
+        incomes = {
+            order_id: (pk, date)
+            for order_id, pk, date in Income.objects.filter(
+                order_id__in=list(lines_by_order_id)
+            ).values_list('order_id', 'id', 'date')
+        }
+
+        IncomeLine.objects.filter(
+            income_id__in=[pk for order_id, (pk, _) in incomes.items() if order_id in replace_order_ids]
+        ).delete()
+
+        IncomeLine.objects.bulk_create([
+            IncomeLine(
+                income_id=incomes[order_id][0],
+                date=incomes[order_id][1],
+                sku=(line['sku'] or '')[:50],
+                name=(line['name'] or '')[:255],
+                unit_price=line['unit_price'],
+                quantity=line['quantity'],
+                line_total=line['unit_price'] * line['quantity'],
+            )
+            for order_id, lines in lines_by_order_id.items()
+            if order_id in incomes
+            for line in lines
+        ], batch_size=UPSERT_BATCH_SIZE)
+
+
+def upsert_csv_batch(incomes, seen_order_ids, touched_dates=None):
+    """
+    Guarda un lote de filas del CSV de ventas junto con sus líneas de producto
+
+    Cada fila del CSV es un producto del pedido: la orden se guarda con su
+    primera fila de la importación y las siguientes solo agregan su línea.
+    Las líneas de una orden se reemplazan la primera vez que aparece en la
+    importación y las filas siguientes de la misma orden se agregan.
+
+    Args:
+        incomes: Lista de instancias de Income sin guardar (una por fila)
+        seen_order_ids: Set de order_id ya vistos en esta importación (se actualiza)
+        touched_dates: Set opcional donde se agregan las fechas afectadas
+
+    Returns:
+        Tuple: (created, updated, errors, duplicates) donde duplicates es la
+        cantidad de filas de órdenes ya leídas que solo agregaron su línea
+    """
+    failed_order_ids = []
+    duplicate_order_ids = []
+    new_incomes = []
+    for income in incomes:
+        if income.order_id in seen_order_ids:
+            duplicate_order_ids.append(income.order_id)
+        else:
+            new_incomes.append(income)
+    created, updated, errors = upsert_incomes(
+        new_incomes,
+        failed_order_ids=failed_order_ids,
+        touched_dates=touched_dates,
+        duplicate_order_ids=duplicate_order_ids,
+    )
+
+    failed = set(failed_order_ids)
+    lines_by_order_id = {}
+    for income in incomes:
+        if income.order_id and income.order_id not in failed:
+            lines_by_order_id.setdefault(income.order_id, []).append({
+                'sku': income.sku,
+                'name': income.product_name,
+                'unit_price': income.product_price,
+                'quantity': income.product_quantity,
+            })
+
+    save_income_lines(lines_by_order_id, set(lines_by_order_id) - seen_order_ids)
+    seen_order_ids.update(lines_by_order_id)
+    return created, updated, errors, len(duplicate_order_ids)
@@ -0,0 +1,250 @@
+import csv
+import os
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from vlore_back.metrics import record_import_rows
+
+from ..models import Income, IncomeLine
+from .bulk_upsert import UPDATE_FIELDS
+from .facets import refresh_income_facets
+from .rollup import refresh_income_rollup
+from .row_parser import IncomeRowParser
+
+# Columnas que se cargan vía COPY (todas las concretas salvo la clave primaria)
+COPY_FIELDS = [field for field in Income._meta.concrete_fields if not field.primary_key]
+
+# Validaciones que en el camino ORM haría la base de datos fila por fila:
+# si una sola fila las viola, COPY aborta la carga completa
+_CHECKS = [
+    (
+        field.name,
+        field.max_length if isinstance(field, models.CharField) else None,
+        field.null,
+        isinstance(field, models.PositiveIntegerField),
+        (
+            DecimalValidator(field.max_digits, field.decimal_places)
+            if isinstance(field, models.DecimalField) else None
+        ),
+    )
+    for field in COPY_FIELDS
+    if field.name not in ('created_at', 'updated_at')
+]
+
+# La línea de producto se inserta después con line_total = precio * cantidad
+_LINE_TOTAL_FIELD = IncomeLine._meta.get_field('line_total')
+_LINE_TOTAL_VALIDATOR = DecimalValidator(_LINE_TOTAL_FIELD.max_digits, _LINE_TOTAL_FIELD.decimal_places)
+
+
+class _LineStream:
+    """Adapta un iterador de líneas a un objeto tipo archivo para COPY FROM STDIN"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+
+        data = ''.join(chunks)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def _copy_value(value):
+    """Serializa un valor al formato de texto de COPY"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def normalize_fields(fields):
+    """
+    Valida y completa los valores de una fila ya parseada antes de enviarla a COPY
+
+    Returns:
+        Dict: Valores de campo listos para COPY (el total se recalcula como en Income.save)
+    """
+    if not fields['order_id']:
+        raise ValueError('falta el identificador de la orden')
+
+    # Misma regla que Income.compute_total(); el total calculado también se valida
+    if fields['product_subtotal']:
+        fields['total'] = fields['product_subtotal'] - fields['discount'] + fields['shipping_cost']
+
+    for name, max_length, nullable, positive, decimal_validator in _CHECKS:
+        value = fields[name]
+        if value is None:
+            if not nullable:
+                raise ValueError(f"el campo {name} es obligatorio")
+        elif max_length is not None and len(value) > max_length:
+            raise ValueError(f"el campo {name} supera los {max_length} caracteres")
+        elif positive and value < 0:
+            raise ValueError(f"el campo {name} no puede ser negativo")
+        elif decimal_validator is not None:
+            # Un monto fuera de numeric(max_digits, decimal_places) haría fallar todo el COPY
+            try:
+                decimal_validator(value)
+            except ValidationError as e:
+                raise ValueError(f"el campo {name} no es un monto válido ({value}): {' '.join(e.messages)}")
+
+    line_total = fields['product_price'] * fields['product_quantity']
+    try:
+        _LINE_TOTAL_VALIDATOR(line_total)
+    except ValidationError as e:
+        raise ValueError(f"el total de la línea no es un monto válido ({line_total}): {' '.join(e.messages)}")
+
+    return fields
+
+
+def import_csv_copy(file_path):
+    """
+    Importa un archivo CSV al modelo Income usando COPY de PostgreSQL
+
+    El archivo se lee en streaming, cada fila se parsea con IncomeRowParser y
+    se carga con COPY en una tabla de staging UNLOGGED. Luego se fusiona en
+    incomes_income con un único INSERT ... ON CONFLICT (order_id) DO UPDATE.
+    Todo ocurre en una sola transacción: si la fusión falla no queda nada a
+    medio importar.
+
+    Returns:
+        Tuple: (created, updated, errors, rows_per_second)
+    """
+    stats = {'rows': 0, 'errors': 0}
+    now = timezone.now()
+    quote = connection.ops.quote_name
+    staging = quote(f"{Income._meta.db_table}_staging_{os.getpid()}")
+    table = quote(Income._meta.db_table)
+    line_table = quote(IncomeLine._meta.db_table)
+    columns = ', '.join(quote(field.column) for field in COPY_FIELDS)
+
+    def lines(csv_file):
+        reader = csv.reader(csv_file)
+        parse = IncomeRowParser(next(reader, []))
+        for line_number, row in enumerate(reader, start=1):
+            if not row:
+                continue
+            try:
+                fields = normalize_fields(parse(row))
+            except Exception as e:
+                stats['errors'] += 1
+                print(f"Error al procesar fila {line_number}: {e}")
+                continue
+
+            fields['created_at'] = now
+            fields['updated_at'] = now
+            stats['rows'] += 1
+            values = [str(line_number)]
+            values.extend(_copy_value(fields[field.name]) for field in COPY_FIELDS)
+            yield '\t'.join(values) + '\n'
+
+    update_columns = ', '.join(
+        '{0} = EXCLUDED.{0}'.format(quote(Income._meta.get_field(name).column))
+        for name in UPDATE_FIELDS
+    )
+
+    print(f"Iniciando importación con COPY desde {file_path}")
+    started = time.monotonic()
+
+    with open(file_path, 'r', encoding='cp1252', newline='') as csv_file:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE {staging} AS "
+                f"SELECT 0::bigint AS line, {columns} FROM {table} WITH NO DATA"
+            )
+            cursor.copy_expert(
+                f"COPY {staging} (line, {columns}) FROM STDIN",
+                _LineStream(lines(csv_file))
+            )
+            # Fechas a recalcular en el resumen diario: las nuevas y las que tenían las órdenes existentes
+            cursor.execute(
+                f"""
+                SELECT {quote('date')} FROM {staging}
+                UNION
+                SELECT i.{quote('date')} FROM {table} AS i
+                WHERE i.{quote('order_id')} IN (SELECT {quote('order_id')} FROM {staging})
+                """
+            )
+            touched_dates = [row[0] for row in cursor.fetchall()]
+
+            # Si la orden aparece más de una vez en el archivo se guarda su
+            # primera fila, como en upsert_incomes. xmax distinto de 0 indica
+            # que la fila ya existía y se actualizó
+            cursor.execute(
+                f"""
+                WITH merged AS (
+                    INSERT INTO {table} ({columns})
+                    SELECT DISTINCT ON ({quote('order_id')}) {columns}
+                    FROM {staging}
+                    ORDER BY {quote('order_id')}, line
+                    ON CONFLICT ({quote('order_id')}) DO UPDATE SET {update_columns}
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+                """
+            )
+            created, updated = cursor.fetchone()
+
+            # Cada fila del archivo es un producto: se reemplazan las líneas de las órdenes importadas
+            cursor.execute(
+                f"""
+                DELETE FROM {line_table} AS l
+                USING {table} AS i
+                WHERE l.{quote('income_id')} = i.{quote('id')}
+                AND i.{quote('order_id')} IN (SELECT {quote('order_id')} FROM {staging})
+                """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {line_table}
+                    ({quote('income_id')}, {quote('date')}, {quote('sku')}, {quote('name')},
+                     {quote('unit_price')}, {quote('quantity')}, {quote('line_total')})
+                SELECT i.{quote('id')}, i.{quote('date')}, COALESCE(s.{quote('sku')}, ''),
+                       COALESCE(s.{quote('product_name')}, ''), s.{quote('product_price')},
+                       s.{quote('product_quantity')}, s.{quote('product_price')} * s.{quote('product_quantity')}
+                FROM {staging} AS s
+                JOIN {table} AS i ON i.{quote('order_id')} = s.{quote('order_id')}
+                ORDER BY s.line
+                """
+            )
+            cursor.execute(f"DROP TABLE {staging}")
+
+            refresh_income_rollup(touched_dates)
+            refresh_income_facets()
+
+    # Las filas repetidas de una orden solo aportan su línea de producto
+    duplicates = stats['rows'] - created - updated
+    errors = stats['errors']
+    record_import_rows(created, updated, errors)
+
+    elapsed = time.monotonic() - started
+    rows_per_second = (stats['rows'] + errors) / elapsed if elapsed else 0
+    print(
+        f"Importación completada. {created} creados, {updated} actualizados, "
+        f"{errors} errores, {duplicates} filas de órdenes repetidas ({rows_per_second:.0f} filas/s)."
+    )
+    return created, updated, errors, rows_per_second
@@ -0,0 +1,68 @@
+from django.db import connection, transaction
+from django.db.models import Count
+
+from ..models import Income, IncomeFacetValue
+
+# Campos del listado de ingresos cuyos filtros se sirven desde IncomeFacetValue
+FACET_FIELDS = ('currency', 'country', 'payment_method', 'shipping_method', 'channel')
+
+# Clave del advisory lock que serializa las escrituras de IncomeFacetValue
+FACETS_LOCK_ID = 8_202_403
+
+
+def _lock():
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [FACETS_LOCK_ID])
+
+
+def refresh_income_facets():
+    """
+    Recalcula los valores y cantidades de todos los filtros cacheados
+
+    Se ejecuta al terminar las importaciones: una agrupación por campo sobre
+    la tabla de ingresos, en lugar de una por cada carga del listado.
+    """
+    with transaction.atomic():
+        _lock()
+        rows = [
+            IncomeFacetValue(field=field, value=row[field], count=row['count'])
+            for field in FACET_FIELDS
+            for row in Income.objects.values(field).annotate(count=Count('id')).order_by()
+        ]
+        IncomeFacetValue.objects.all().delete()
+        IncomeFacetValue.objects.bulk_create(rows)
+
+
+def add_income_facet_values(incomes):
+    """
+    Agrega los valores de filtro que aún no existen para los ingresos indicados
+
+    Para guardados sueltos y webhooks: no recorre la tabla de ingresos, por lo
+    que las cantidades de los valores nuevos quedan vacías hasta la próxima
+    recarga completa.
+
+    Args:
+        incomes: Iterable de instancias de Income (o de dicts con los mismos campos)
+    """
+    seen = set()
+    for income in incomes:
+        for field in FACET_FIELDS:
+            value = income[field] if isinstance(income, dict) else getattr(income, field)
+            seen.add((field, value))
+    if not seen:
+        return
+
+    with transaction.atomic():
+        _lock()
+        existing = set(IncomeFacetValue.objects.values_list('field', 'value'))
+        IncomeFacetValue.objects.bulk_create([
+            IncomeFacetValue(field=field, value=value)
+            for field, value in seen - existing
+        ])
+
+
+def get_facet_values(field):
+    """Devuelve los valores cacheados de un filtro, ordenados como los muestra Django"""
+    values = IncomeFacetValue.objects.filter(field=field).values_list('value', flat=True)
+    return sorted(set(values), key=lambda value: (value is None, value or ''))
@@ -0,0 +1,190 @@
+import csv
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+from vlore_back.metrics import record_import_rows
+
+from ..models import Income
+from .bulk_upsert import UPSERT_BATCH_SIZE, upsert_csv_batch
+from .facets import refresh_income_facets
+from .rollup import refresh_income_rollup
+from .row_parser import IncomeRowParser
+
+# Tamaño aproximado de cada rango de bytes que parsea un proceso
+RANGE_SIZE = 4 * 1024 * 1024
+
+# Tamaño de bloque para buscar los límites de los rangos
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def split_file(file_path, range_size=RANGE_SIZE):
+    """
+    Divide un CSV en rangos de bytes alineados a registros
+
+    Un salto de línea solo es fin de registro si la cantidad de comillas leídas
+    hasta ahí es par: así los campos entre comillas con saltos de línea (p. ej.
+    las notas del comprador) nunca quedan partidos entre dos rangos. cp1252 es
+    de un byte por carácter, por lo que se puede contar comillas sobre los bytes.
+
+    Returns:
+        Tuple: (header, ranges) con los nombres de columna y una lista de (inicio, fin)
+    """
+    size = os.path.getsize(file_path)
+    ranges = []
+
+    with open(file_path, 'rb') as csv_file:
+        header_line = csv_file.readline()
+        start = csv_file.tell()
+        target = start + range_size
+        in_quotes = 0
+
+        while True:
+            block_start = csv_file.tell()
+            block = csv_file.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+
+            offset = 0
+            while block_start + len(block) > target:
+                search_from = max(target - block_start, offset)
+                in_quotes ^= block.count(b'"', offset, search_from) & 1
+                offset = search_from
+
+                newline = block.find(b'\n', offset)
+                while newline != -1:
+                    in_quotes ^= block.count(b'"', offset, newline) & 1
+                    offset = newline + 1
+                    if not in_quotes:
+                        break
+                    newline = block.find(b'\n', offset)
+
+                if newline == -1:
+                    # El límite cae en el bloque siguiente
+                    break
+
+                end = block_start + offset
+                ranges.append((start, end))
+                start = end
+                target = end + range_size
+
+            in_quotes ^= block.count(b'"', offset) & 1
+
+    if start < size:
+        ranges.append((start, size))
+
+    header = next(csv.reader([header_line.decode('cp1252')]))
+    return header, ranges
+
+
+def _parse_range(file_path, header, start, end):
+    """Parsea un rango de bytes del CSV en un proceso del pool"""
+    with open(file_path, 'rb') as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start)
+
+    parsed = []
+    errors = []
+    parse = IncomeRowParser(header)
+    for row in csv.reader(io.StringIO(data.decode('cp1252'), newline='')):
+        if not row:
+            continue
+        try:
+            parsed.append(parse(row))
+        except Exception as e:
+            errors.append(str(e))
+    return parsed, errors
+
+
+def import_csv_parallel(file_path, workers=None, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Importa un archivo CSV al modelo Income parseando en varios procesos
+
+    El archivo se divide en rangos de bytes que se parsean en un pool de
+    procesos. Los resultados vuelven en orden a este proceso, que es el único
+    que escribe en la base de datos, con el mismo upsert por lotes que
+    import_csv_batched.
+
+    Returns:
+        Tuple: (created, updated, errors, rows_per_second)
+    """
+    workers = workers or os.cpu_count() or 1
+    created = 0
+    updated = 0
+    errors = 0
+    parse_errors = 0
+    duplicates = 0
+    batch = []
+    seen_order_ids = set()
+    touched_dates = set()
+
+    print(f"Iniciando importación en paralelo desde {file_path} ({workers} procesos)")
+    started = time.monotonic()
+
+    def flush():
+        nonlocal created, updated, errors, duplicates
+        batch_created, batch_updated, batch_errors, batch_duplicates = upsert_csv_batch(
+            batch, seen_order_ids, touched_dates
+        )
+        created += batch_created
+        updated += batch_updated
+        errors += batch_errors
+        duplicates += batch_duplicates
+        batch.clear()
+        print(f"Procesados {created + updated + errors + duplicates} registros...")
+
+    header, ranges = split_file(file_path)
+    pending_ranges = iter(ranges)
+
+    # Los procesos hijos no deben heredar conexiones abiertas a la base de datos
+    connections.close_all()
+
+    # fork: los hijos heredan Django ya configurado y solo parsean
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = deque()
+
+        def submit_next():
+            byte_range = next(pending_ranges, None)
+            if byte_range is not None:
+                futures.append(executor.submit(_parse_range, file_path, header, *byte_range))
+
+        # Se mantienen pocos rangos en vuelo para acotar la memoria
+        for _ in range(workers * 2):
+            submit_next()
+
+        while futures:
+            parsed, row_errors = futures.popleft().result()
+            submit_next()
+
+            for error in row_errors:
+                errors += 1
+                parse_errors += 1
+                print(f"Error al procesar fila: {error}")
+
+            for fields in parsed:
+                batch.append(Income(**fields))
+                if len(batch) >= batch_size:
+                    flush()
+
+    if batch:
+        flush()
+
+    # upsert_csv_batch registra sus filas; las que no se pudieron parsear se registran acá
+    record_import_rows(0, 0, parse_errors)
+
+    refresh_income_rollup(touched_dates)
+    refresh_income_facets()
+
+    elapsed = time.monotonic() - started
+    rows_per_second = (created + updated + errors + duplicates) / elapsed if elapsed else 0
+    print(
+        f"Importación completada. {created} creados, {updated} actualizados, "
+        f"{errors} errores, {duplicates} filas de órdenes repetidas ({rows_per_second:.0f} filas/s)."
+    )
+    return created, updated, errors, rows_per_second
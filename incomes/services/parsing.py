@@ -0,0 +1,37 @@
+"""Conversores de valores del CSV de ventas compartidos por parse_row e IncomeRowParser"""
+import datetime
+from decimal import Decimal
+
+from django.utils.dateparse import parse_date
+
+
+def clean_decimal(value):
+    """Convierte un valor a decimal, manejando formatos y valores nulos"""
+    if not value or value == '':
+        return Decimal('0')
+    # Eliminar posibles símbolos de moneda y espacios
+    value = str(value).replace('$', '').replace(' ', '').replace(',', '.')
+    try:
+        return Decimal(value)
+    except:
+        return Decimal('0')
+
+
+def parse_date_string(date_string):
+    """
+    Convierte una cadena de fecha a un objeto date, manejando varios formatos
+    """
+    if not date_string or date_string == '':
+        return None
+
+    try:
+        # Formato dd/mm/yyyy
+        if '/' in date_string:
+            day, month, year = date_string.split('/')
+            return datetime.date(int(year), int(month), int(day))
+        # Formato yyyy-mm-dd
+        elif '-' in date_string:
+            return parse_date(date_string)
+        return None
+    except:
+        return None
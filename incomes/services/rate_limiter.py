@@ -0,0 +1,73 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket del lado del cliente, seguro entre hilos
+
+    Replica el leaky bucket de la API de Tiendanube: `capacity` solicitudes en
+    ráfaga que se reponen a `rate` por segundo. Los encabezados x-rate-limit-*
+    de cada respuesta ajustan el estado al que informa el servidor, de modo que
+    varios hilos compartiendo el mismo bucket no superen el límite.
+    """
+
+    MIN_RATE = 0.1
+    MAX_RATE = 100.0
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Detiene todas las solicitudes durante `seconds` (p. ej. tras un 429)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def update_from_headers(self, headers):
+        """
+        Ajusta el bucket con los encabezados de límite de la respuesta
+
+        x-rate-limit-limit: tamaño del bucket
+        x-rate-limit-remaining: solicitudes disponibles
+        x-rate-limit-reset: milisegundos hasta que el bucket se vacíe
+        """
+        try:
+            limit = int(headers['x-rate-limit-limit'])
+            remaining = int(headers['x-rate-limit-remaining'])
+            reset_ms = int(headers.get('x-rate-limit-reset', 0))
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self.lock:
+            self._refill(time.monotonic())
+            self.capacity = float(max(limit, 1))
+            # Las respuestas concurrentes llegan desordenadas: nos quedamos con la más restrictiva
+            self.tokens = min(self.tokens, float(remaining))
+
+            used = limit - remaining
+            if used > 0 and reset_ms > 0:
+                rate = used / (reset_ms / 1000)
+                self.rate = min(max(rate, self.MIN_RATE), self.MAX_RATE)
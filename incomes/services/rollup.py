@@ -0,0 +1,100 @@
+from django.db import connection, transaction
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ..models import Income, IncomeDailyRollup, IncomeLine
+
+# Clave del advisory lock que serializa las recargas del resumen diario
+ROLLUP_LOCK_ID = 8_202_401
+
+# Cantidad de fechas que se recalculan por consulta
+ROLLUP_DATES_PER_QUERY = 500
+
+
+def refresh_income_rollup(dates):
+    """
+    Recalcula el resumen diario de las fechas indicadas
+
+    Las filas de esas fechas se borran y se vuelven a insertar a partir de
+    Income dentro de una transacción con un advisory lock, de modo que dos
+    recargas concurrentes de la misma fecha no dupliquen filas.
+
+    Args:
+        dates: Iterable de fechas (datetime.date) a recalcular
+    """
+    dates = sorted({date for date in dates if date is not None})
+    for start in range(0, len(dates), ROLLUP_DATES_PER_QUERY):
+        chunk = dates[start:start + ROLLUP_DATES_PER_QUERY]
+        _replace_rollup(date__in=chunk)
+
+
+def rebuild_income_rollup(date_from=None, date_to=None):
+    """
+    Reconstruye el resumen diario completo o el de un rango de fechas
+
+    Returns:
+        int: Cantidad de filas del resumen generadas
+    """
+    filters = {}
+    if date_from:
+        filters['date__gte'] = date_from
+    if date_to:
+        filters['date__lte'] = date_to
+    return _replace_rollup(**filters)
+
+
+def _replace_rollup(**filters):
+    """Borra y vuelve a calcular las filas del resumen que cumplen `filters`"""
+    totals = (
+        Income.objects.filter(**filters)
+        .values('date', 'order_status', 'payment_status')
+        .annotate(
+            key_channel=Coalesce('channel', Value('')),
+            revenue=Sum('total'),
+            discount=Sum('discount'),
+            shipping=Sum('shipping_cost'),
+            orders=Count('id'),
+        )
+        .order_by()
+    )
+    # Las unidades salen de las líneas: el ingreso solo guarda la cantidad de un producto
+    units = (
+        IncomeLine.objects.filter(**filters)
+        .values('date', 'income__order_status', 'income__payment_status')
+        .annotate(
+            key_channel=Coalesce('income__channel', Value('')),
+            units=Sum('quantity'),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ROLLUP_LOCK_ID])
+
+        units_by_key = {
+            (row['date'], row['income__order_status'], row['income__payment_status'], row['key_channel']): row['units']
+            for row in units
+        }
+        rows = [
+            IncomeDailyRollup(
+                date=row['date'],
+                order_status=row['order_status'],
+                payment_status=row['payment_status'],
+                channel=row['key_channel'],
+                revenue=row['revenue'],
+                discount=row['discount'],
+                shipping=row['shipping'],
+                orders=row['orders'],
+                units=units_by_key.get(
+                    (row['date'], row['order_status'], row['payment_status'], row['key_channel']), 0
+                ) or 0,
+            )
+            for row in totals
+        ]
+
+        IncomeDailyRollup.objects.filter(**filters).delete()
+        IncomeDailyRollup.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
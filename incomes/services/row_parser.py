@@ -0,0 +1,196 @@
+import datetime
+from decimal import Decimal
+from functools import lru_cache
+from operator import itemgetter
+
+from .parsing import clean_decimal, parse_date_string
+
+TEXT = 'text'
+DATE = 'date'
+DECIMAL = 'decimal'
+INTEGER = 'integer'
+PHYSICAL = 'physical'
+
+# Mapeo columna del CSV -> campo de Income. Debe mantenerse alineado con
+# parse_row, que es la implementación de referencia fila por fila.
+INCOME_CSV_COLUMNS = (
+    # Información de la orden
+    ('order_number', 'Número de orden', TEXT, ''),
+    ('email', 'Email', TEXT, ''),
+    ('date', 'Fecha', DATE, None),
+    ('order_status', 'Estado de la orden', TEXT, 'abierta'),
+    ('payment_status', 'Estado del pago', TEXT, 'pendiente'),
+    ('shipping_status', 'Estado del envío', TEXT, 'no_empaquetado'),
+    ('currency', 'Moneda', TEXT, 'ARS'),
+
+    # Información financiera
+    ('product_subtotal', 'Subtotal de productos', DECIMAL, None),
+    ('discount', 'Descuento', DECIMAL, None),
+    ('shipping_cost', 'Costo de envío', DECIMAL, None),
+    ('total', 'Total', DECIMAL, None),
+
+    # Información del comprador
+    ('buyer_name', 'Nombre del comprador', TEXT, ''),
+    ('tax_id', 'DNI / CUIT', TEXT, ''),
+    ('phone', 'Teléfono', TEXT, ''),
+
+    # Información de envío
+    ('shipping_name', 'Nombre para el envío', TEXT, ''),
+    ('shipping_phone', 'Teléfono para el envío', TEXT, ''),
+    ('address', 'Dirección', TEXT, ''),
+    ('address_number', 'Número', TEXT, ''),
+    ('floor_apt', 'Piso', TEXT, ''),
+    ('locality', 'Localidad', TEXT, ''),
+    ('city', 'Ciudad', TEXT, ''),
+    ('postal_code', 'Código postal', TEXT, ''),
+    ('state_province', 'Provincia o estado', TEXT, ''),
+    ('country', 'País', TEXT, ''),
+
+    # Métodos de pago y envío
+    ('shipping_method', 'Medio de envío', TEXT, ''),
+    ('payment_method', 'Medio de pago', TEXT, ''),
+    ('discount_coupon', 'Cupón de descuento', TEXT, ''),
+
+    # Notas
+    ('buyer_notes', 'Notas del comprador', TEXT, ''),
+    ('seller_notes', 'Notas del vendedor', TEXT, ''),
+
+    # Fechas adicionales
+    ('payment_date', 'Fecha de pago', DATE, None),
+    ('shipping_date', 'Fecha de envío', DATE, None),
+
+    # Información del producto
+    ('product_name', 'Nombre del producto', TEXT, ''),
+    ('product_price', 'Precio del producto', DECIMAL, None),
+    ('product_quantity', 'Cantidad del producto', INTEGER, 0),
+    ('sku', 'SKU', TEXT, ''),
+
+    # Información adicional
+    ('channel', 'Canal', TEXT, ''),
+    ('tracking_code', 'Código de tracking del envío', TEXT, ''),
+    ('payment_transaction_id', 'Identificador de la transacción en el medio de pago', TEXT, ''),
+    ('order_id', 'Identificador de la orden', TEXT, ''),
+    ('is_physical_product', 'Producto Físico', PHYSICAL, None),
+
+    # Información de personal
+    ('registered_by', 'Persona que registró la venta', TEXT, ''),
+    ('sales_branch', 'Sucursal de venta', TEXT, ''),
+    ('seller', 'Vendedor', TEXT, ''),
+)
+
+NOT_PHYSICAL_VALUES = frozenset(['no', 'n', 'false', '0'])
+
+
+@lru_cache(maxsize=8192)
+def parse_decimal(value):
+    """
+    clean_decimal con caché y un camino rápido para los montos más comunes
+
+    Los montos de la exportación suelen ser solo dígitos o dígitos con un único
+    separador decimal (1500, 1500,50, 1500.50): esos se convierten directamente
+    sin los reemplazos de clean_decimal. El resto (símbolos, espacios, signos,
+    varios separadores) pasa por clean_decimal, con el mismo resultado.
+    """
+    if value:
+        if value.isdecimal():
+            return Decimal(value)
+        for separator in ',.':
+            whole, found, fraction = value.partition(separator)
+            if found and whole.isdecimal() and fraction.isdecimal():
+                return Decimal(f'{whole}.{fraction}')
+    return clean_decimal(value)
+
+
+@lru_cache(maxsize=8192)
+def parse_date(value):
+    """
+    parse_date_string con caché y un camino rápido para el formato dd/mm/yyyy
+    """
+    if value and len(value) == 10 and value[2] == '/' and value[5] == '/':
+        try:
+            return datetime.date(int(value[6:]), int(value[3:5]), int(value[:2]))
+        except ValueError:
+            return None
+    return parse_date_string(value)
+
+
+def parse_integer(value):
+    return int(value or 0)
+
+
+def parse_physical(value):
+    return value.lower() not in NOT_PHYSICAL_VALUES
+
+
+CONVERTERS = {
+    DATE: parse_date,
+    DECIMAL: parse_decimal,
+    INTEGER: parse_integer,
+    PHYSICAL: parse_physical,
+}
+
+# Valor de cada tipo cuando la columna no existe en el archivo (igual que parse_row)
+MISSING_VALUES = {
+    DATE: lambda default: None,
+    DECIMAL: lambda default: parse_decimal(default),
+    INTEGER: lambda default: int(default or 0),
+    PHYSICAL: lambda default: True,
+    TEXT: lambda default: default,
+}
+
+
+class IncomeRowParser:
+    """
+    Parser de filas del CSV de ventas compilado a partir del encabezado
+
+    Las posiciones de cada columna se resuelven una sola vez por archivo. Cada
+    fila (una lista de csv.reader) se convierte con acceso por índice en lugar
+    de ~45 búsquedas por nombre en un dict, y las fechas y montos usan
+    conversores con caché.
+
+    Uso:
+        reader = csv.reader(csv_file)
+        parse = IncomeRowParser(next(reader))
+        for row in reader:
+            fields = parse(row)
+    """
+
+    def __init__(self, header):
+        positions = {name: index for index, name in enumerate(header)}
+        self.width = len(header)
+
+        text_names = []
+        text_indexes = []
+        self._converted = []
+        self._constants = {}
+
+        for field, column, kind, default in INCOME_CSV_COLUMNS:
+            index = positions.get(column)
+            if index is None:
+                self._constants[field] = MISSING_VALUES[kind](default)
+            elif kind == TEXT:
+                text_names.append(field)
+                text_indexes.append(index)
+            else:
+                self._converted.append((field, index, CONVERTERS[kind]))
+
+        self._text_names = tuple(text_names)
+        if len(text_indexes) == 1:
+            only = text_indexes[0]
+            self._get_text = lambda row: (row[only],)
+        elif text_indexes:
+            self._get_text = itemgetter(*text_indexes)
+        else:
+            self._get_text = lambda row: ()
+
+    def __call__(self, row):
+        """Convierte una fila en los valores de campo de un Income"""
+        if len(row) < self.width:
+            # csv.DictReader completa las filas cortas con None
+            row = row + [None] * (self.width - len(row))
+
+        fields = dict(zip(self._text_names, self._get_text(row)))
+        for field, index, converter in self._converted:
+            fields[field] = converter(row[index])
+        fields.update(self._constants)
+        return fields
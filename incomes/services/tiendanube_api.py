@@ -1,11 +1,27 @@
+import random
+import time
+
 import requests
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
+from vlore_back import metrics
 
-from ..models import Income
+from ..models import Income, TiendanubeSyncState
 from ..constants import OrderStatus, PaymentStatus, ShippingStatus
+from .bulk_upsert import save_income_lines, upsert_incomes
+from .facets import add_income_facet_values
+from .rollup import refresh_income_rollup
+from .rate_limiter import TokenBucket
+
+# Pedidos por página al listar órdenes
+ORDERS_PER_PAGE = 50
 
 
 class TiendanubeAPI:
@@ -14,7 +30,7 @@ class TiendanubeAPI:
     """
     BASE_URL = "https://api.tiendanube.com/v1"
 
-    def __init__(self):
+    def __init__(self, base_url=None):
         self.store_id = settings.TIENDANUBE_STORE_ID
         self.access_token = settings.TIENDANUBE_ACCESS_TOKEN
         self.headers = {
@@ -22,15 +38,93 @@ class TiendanubeAPI:
             'Content-Type': 'application/json',
             'User-Agent': 'Mi Backoffice Django (email@ejemplo.com)'
         }
-        self.api_url = f"{self.BASE_URL}/{self.store_id}"
+        base_url = base_url or getattr(settings, 'TIENDANUBE_API_URL', self.BASE_URL)
+        self.api_url = f"{base_url.rstrip('/')}/{self.store_id}"
+
+        # Una sola sesión con pool de conexiones keep-alive, compartida entre hilos
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.TIENDANUBE_POOL_SIZE,
+            pool_block=True
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.rate_limiter = TokenBucket(
+            capacity=settings.TIENDANUBE_RATE_LIMIT_BURST,
+            rate=settings.TIENDANUBE_RATE_LIMIT_PER_SECOND
+        )
+
+    def _get(self, url, params=None):
+        """
+        Hace un GET respetando el límite de la API
 
-    def get_orders(self, since_date=None, status=None, page=1, per_page=50):
+        Cada solicitud espera un token del bucket. Ante un 429 se pausan todas
+        las solicitudes el tiempo que indique el servidor; ante errores 5xx o de
+        conexión se reintenta con backoff exponencial y jitter.
+
+        Returns:
+            Response: La última respuesta obtenida
+        """
+        max_retries = settings.TIENDANUBE_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            self.rate_limiter.acquire()
+            backoff = min(2 ** attempt, 60) * (0.5 + random.random() / 2)
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=settings.TIENDANUBE_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.TIENDANUBE_REQUEST_DURATION.observe(time.perf_counter() - started, 'connection_error')
+                if attempt == max_retries:
+                    raise
+                time.sleep(backoff)
+                continue
+
+            self.rate_limiter.update_from_headers(response.headers)
+            if response.status_code == 429:
+                result = 'rate_limited'
+            elif response.status_code >= 500:
+                result = 'server_error'
+            else:
+                result = 'ok'
+            metrics.TIENDANUBE_REQUEST_DURATION.observe(time.perf_counter() - started, result)
+
+            if attempt == max_retries:
+                return response
+
+            if response.status_code == 429:
+                self.rate_limiter.pause(self._retry_after(response, backoff))
+                continue
+
+            if response.status_code >= 500:
+                time.sleep(backoff)
+                continue
+
+            return response
+
+    @staticmethod
+    def _retry_after(response, default):
+        """Segundos a esperar tras un 429 según los encabezados de la respuesta"""
+        try:
+            return int(response.headers['x-rate-limit-reset']) / 1000
+        except (KeyError, ValueError):
+            pass
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            return default
+
+    def get_orders(self, since_date=None, status=None, page=1, per_page=50, updated_since=None):
         """
         Obtiene los pedidos desde la API de Tiendanube
 
         Args:
             since_date: Fecha desde la cual obtener pedidos (formato: YYYY-MM-DD)
             status: Estado de los pedidos ('open', 'closed', 'cancelled')
+            updated_since: Fecha y hora ISO 8601 desde la cual obtener pedidos modificados
             page: Número de página para la paginación
             per_page: Cantidad de registros por página
 
@@ -49,7 +143,10 @@ class TiendanubeAPI:
         if status:
             params['status'] = status
 
-        response = requests.get(url, headers=self.headers, params=params)
+        if updated_since:
+            params['updated_at_min'] = updated_since
+
+        response = self._get(url, params=params)
 
         if response.status_code == 200:
             return response.json()
@@ -77,7 +174,7 @@ class TiendanubeAPI:
         if updated_since:
             params['updated_since'] = updated_since
 
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._get(url, params=params)
 
         if response.status_code == 200:
             return response.json()
@@ -95,136 +192,353 @@ class TiendanubeAPI:
             Dict: Detalles del pedido
         """
         url = f"{self.api_url}/orders/{order_id}"
-        response = requests.get(url, headers=self.headers)
+        response = self._get(url)
 
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Error al obtener detalles del pedido {order_id}: {response.status_code} - {response.text}")
 
-    def import_orders_to_incomes(days_ago=30):
+    def complete_orders(self, orders, executor):
+        """
+        Completa los pedidos de una página con sus detalles
+
+        Si el pedido del listado ya trae todos los campos necesarios se usa tal
+        cual; si no, los detalles se piden en paralelo en el executor.
+
+        Yields:
+            Tuple: (order, order_details, error) en el mismo orden de la página
+        """
+        pending = []
+        for order in orders:
+            if all(field in order for field in ORDER_REQUIRED_FIELDS):
+                pending.append((order, None))
+            else:
+                pending.append((order, executor.submit(self.get_order_details, order['id'])))
+
+        for order, future in pending:
+            if future is None:
+                yield order, order, None
+                continue
+            try:
+                yield order, future.result(), None
+            except Exception as e:
+                yield order, None, e
+
+    @staticmethod
+    def import_orders_to_incomes(days_ago=30, concurrency=None):
         """
         Importa los pedidos de Tiendanube al modelo Income
 
         Args:
             days_ago: Número de días hacia atrás para importar pedidos
+            concurrency: Cantidad máxima de solicitudes simultáneas a la API
 
         Returns:
             Tuple: (orders_created, orders_updated, errors)
         """
+        # Calcular fecha desde la cual importar
+        since_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+
+        created, updated, errors, _ = TiendanubeAPI._import_orders(
+            {'since_date': since_date},
+            concurrency=concurrency
+        )
+        return created, updated, errors
+
+    @staticmethod
+    def sync_orders_incrementally(initial_days=365, concurrency=None):
+        """
+        Importa solo los pedidos modificados desde la última sincronización
+
+        La primera vez (sin marca de agua guardada) importa los últimos
+        `initial_days` días. Luego pide a la API solo los pedidos con
+        updated_at posterior a la marca de agua, que avanza únicamente cuando
+        todas las páginas se importaron y nunca más allá de un pedido con error.
+
+        La paginación es por offset: un pedido modificado durante la corrida
+        puede cambiar de página y quedar sin leer. Por eso la marca de agua
+        tampoco pasa del inicio de la corrida y lo modificado desde entonces se
+        vuelve a pedir en la siguiente.
+
+        Returns:
+            Tuple: (orders_created, orders_updated, errors)
+        """
+        state, _ = TiendanubeSyncState.objects.get_or_create(store_id=str(settings.TIENDANUBE_STORE_ID))
+
+        if state.last_updated_at:
+            filters = {'updated_since': state.last_updated_at.isoformat()}
+        else:
+            filters = {'since_date': (datetime.now() - timedelta(days=initial_days)).strftime('%Y-%m-%d')}
+
+        started_at = timezone.now()
+        created, updated, errors, watermark = TiendanubeAPI._import_orders(filters, concurrency=concurrency)
+        if watermark:
+            watermark = min(watermark, started_at)
+
+        with transaction.atomic():
+            state = TiendanubeSyncState.objects.select_for_update().get(pk=state.pk)
+            if watermark and (state.last_updated_at is None or watermark > state.last_updated_at):
+                state.last_updated_at = watermark
+            state.last_run_at = started_at
+            state.save()
+
+        return created, updated, errors
+
+    @staticmethod
+    def _import_orders(filters, concurrency=None, batch_size=None):
+        """
+        Recorre las páginas de pedidos que cumplen `filters` y las guarda en Income
+
+        Los detalles de los pedidos se piden en paralelo (hasta `concurrency`
+        solicitudes simultáneas) y la página siguiente se descarga, en un hilo
+        aparte, mientras se guarda la actual. Los pedidos se acumulan y se escriben de a
+        `batch_size` con upsert_orders.
+
+        Args:
+            filters: Argumentos de get_orders (since_date, updated_since, status)
+            concurrency: Cantidad máxima de solicitudes simultáneas a la API
+            batch_size: Pedidos por escritura (por defecto TIENDANUBE_UPSERT_BATCH_SIZE)
+
+        Returns:
+            Tuple: (created, updated, errors, watermark) donde watermark es el
+            updated_at hasta el cual todo quedó importado, o None si la
+            importación no se completó
+        """
         created = 0
         updated = 0
         errors = 0
-
-        # Calcular fecha desde la cual importar
-        since_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+        complete = True
+        last_imported = None
+        first_failed = None
+        pending = []
+        touched_dates = set()
 
         api = TiendanubeAPI()
-
-        # Obtener todos los pedidos paginados
-        page = 1
-        while True:
-            try:
-                orders = api.get_orders(since_date=since_date, page=page, per_page=50)
+        concurrency = concurrency or settings.TIENDANUBE_CONCURRENCY
+        batch_size = batch_size or settings.TIENDANUBE_UPSERT_BATCH_SIZE
+
+        def record_failure(order_updated_at):
+            nonlocal complete, first_failed
+            if order_updated_at is None:
+                complete = False
+            elif first_failed is None or order_updated_at < first_failed:
+                first_failed = order_updated_at
+
+        def flush():
+            nonlocal created, updated, errors, last_imported
+            batch_created, batch_updated, failed = upsert_orders(
+                [mapped for mapped, _ in pending], touched_dates=touched_dates
+            )
+            created += batch_created
+            updated += batch_updated
+
+            add_income_facet_values(
+                defaults for (order_id, defaults, _), _ in pending if order_id not in failed
+            )
+            for (order_id, _, _), order_updated_at in pending:
+                if order_id in failed:
+                    errors += 1
+                    record_failure(order_updated_at)
+                elif order_updated_at and (last_imported is None or order_updated_at > last_imported):
+                    last_imported = order_updated_at
+            pending.clear()
+
+        # Los detalles usan hasta `concurrency` hilos; otro aparte descarga la
+        # página siguiente por adelantado sin quitarles lugar
+        with ThreadPoolExecutor(max_workers=concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=1) as page_executor:
+            page = 1
+            next_page = page_executor.submit(api.get_orders, page=page, per_page=ORDERS_PER_PAGE, **filters)
+
+            while next_page is not None:
+                try:
+                    orders = next_page.result()
+                except Exception as e:
+                    print(f"Error al obtener pedidos de la página {page}: {str(e)}")
+                    errors += 1
+                    complete = False
+                    break
 
                 if not orders:
                     break
 
-                for order in orders:
-                    try:
-                        # Obtener detalles completos del pedido si es necesario
-                        order_details = api.get_order_details(order['id'])
-
-                        # Mapear el estado del pedido a nuestras constantes
-                        order_status = OrderStatus.OPEN
-                        if order_details['status'] == 'closed':
-                            order_status = OrderStatus.CLOSED
-                        elif order_details['status'] == 'cancelled':
-                            order_status = OrderStatus.CANCELLED
-
-                        # Mapear el estado del pago
-                        payment_status = PaymentStatus.PENDING
-                        if order_details['payment_status'] == 'paid':
-                            payment_status = PaymentStatus.PAID
-                        elif order_details['payment_status'] == 'cancelled':
-                            payment_status = PaymentStatus.CANCELLED
-
-                        # Mapear el estado del envío
-                        shipping_status = ShippingStatus.NOT_PACKAGED
-                        if order_details['shipping_status'] == 'fulfilled':
-                            shipping_status = ShippingStatus.SHIPPED
-                        elif order_details['shipping_status'] == 'delivered':
-                            shipping_status = ShippingStatus.DELIVERED
-
-                        # Verificar si el pedido ya existe en nuestra base de datos
-                        income, created_record = Income.objects.update_or_create(
-                            order_id=str(order_details['id']),
-                            defaults={
-                                'order_number': str(order_details['number']),
-                                'email': order_details['customer']['email'],
-                                'date': datetime.fromisoformat(order_details['created_at'].replace('Z', '+00:00')).date(),
-                                'order_status': order_status,
-                                'payment_status': payment_status,
-                                'shipping_status': shipping_status,
-                                'currency': order_details['currency'],
-                                'product_subtotal': order_details['subtotal'],
-                                'discount': order_details.get('discount', 0) or 0,
-                                'shipping_cost': order_details.get('shipping_cost', 0) or 0,
-                                'total': order_details['total'],
-                                'buyer_name': f"{order_details['customer']['name']} {order_details['customer'].get('lastname', '')}".strip(),
-                                'tax_id': order_details['customer'].get('identification', ''),
-                                'phone': order_details['customer'].get('phone', ''),
-                                'shipping_name': order_details['shipping_address'].get('name', ''),
-                                'shipping_phone': order_details['shipping_address'].get('phone', ''),
-                                'address': order_details['shipping_address'].get('address', ''),
-                                'address_number': order_details['shipping_address'].get('number', ''),
-                                'floor_apt': f"{order_details['shipping_address'].get('floor', '')} {order_details['shipping_address'].get('apartment', '')}".strip(),
-                                'city': order_details['shipping_address'].get('city', ''),
-                                'postal_code': order_details['shipping_address'].get('zipcode', ''),
-                                'state_province': order_details['shipping_address'].get('province', ''),
-                                'country': order_details['shipping_address'].get('country', ''),
-                                'shipping_method': order_details.get('shipping_option_name', ''),
-                                'payment_method': order_details.get('payment_details', {}).get('method', ''),
-                                'payment_transaction_id': order_details.get('payment_details', {}).get('transaction_id', ''),
-                                # Nota: Para Tiendanube generalmente necesitarás crear múltiples registros de Income
-                                # para un solo pedido si hay múltiples productos
-                                'product_name': ', '.join([item['name'] for item in order_details['products']]),
-                                'product_price': order_details['products'][0]['price'] if order_details['products'] else 0,
-                                'product_quantity': sum([item['quantity'] for item in order_details['products']]),
-                                'payment_date': datetime.fromisoformat(order_details['paid_at'].replace('Z', '+00:00')).date() if order_details.get('paid_at') else None,
-                                'shipping_date': datetime.fromisoformat(order_details['shipped_at'].replace('Z', '+00:00')).date() if order_details.get('shipped_at') else None,
-                                'channel': order_details.get('source', ''),
-                                'tracking_code': order_details.get('tracking_number', ''),
-                                'is_physical_product': True,  # Por defecto en Tiendanube
-                            }
-                        )
-
-                        if created_record:
-                            created += 1
-                        else:
-                            updated += 1
+                # Si ya no hay más pedidos, no se pide otra página
+                next_page = None
+                if len(orders) >= ORDERS_PER_PAGE:
+                    next_page = page_executor.submit(
+                        api.get_orders, page=page + 1, per_page=ORDERS_PER_PAGE, **filters
+                    )
 
+                for order, order_details, error in api.complete_orders(orders, executor):
+                    order_updated_at = parse_api_datetime(order.get('updated_at'))
+                    try:
+                        if error is not None:
+                            raise error
+                        pending.append((map_order_to_income(order_details), order_updated_at))
                     except Exception as e:
                         errors += 1
                         print(f"Error al procesar el pedido {order['id']}: {str(e)}")
+                        record_failure(order_updated_at)
+
+                if len(pending) >= batch_size:
+                    flush()
 
                 # Ir a la siguiente página
                 page += 1
 
-                # Si ya no hay más pedidos, salir del bucle
-                if len(orders) < 50:
-                    break
+        flush()
+        refresh_income_rollup(touched_dates)
 
-            except Exception as e:
-                print(f"Error al obtener pedidos de la página {page}: {str(e)}")
-                errors += 1
-                break
-
-        return created, updated, errors
+        watermark = None
+        if complete:
+            # updated_at_min es inclusivo: un pedido con error se vuelve a pedir la próxima vez
+            watermark = min(filter(None, [last_imported, first_failed]), default=None)
+        return created, updated, errors, watermark
 
+    @staticmethod
     def import_all_orders_from_tiendanube():
         """
         Comando de gestión para importar todos los pedidos desde Tiendanube
+
+        Solo el primer uso recorre el último año; luego se importan los cambios.
         """
-        created, updated, errors = import_orders_to_incomes(days_ago=365)  # Último año
+        created, updated, errors = TiendanubeAPI.sync_orders_incrementally(initial_days=365)  # Último año
         return f"Importación completada: {created} creados, {updated} actualizados, {errors} errores"
+
+
+def upsert_orders(mapped_orders, touched_dates=None):
+    """
+    Guarda un lote de pedidos ya mapeados con un único upsert por order_id
+
+    Solo se sobrescriben los campos que provee la API: los datos cargados desde
+    el CSV (notas, vendedor, sucursal, etc.) se conservan, igual que con
+    update_or_create.
+
+    Args:
+        mapped_orders: Lista de (order_id, defaults, lines) devueltos por map_order_to_income
+        touched_dates: Set opcional donde se agregan las fechas afectadas
+
+    Returns:
+        Tuple: (created, updated, failed_order_ids)
+    """
+    if not mapped_orders:
+        return 0, 0, set()
+
+    incomes = [Income(order_id=order_id, **defaults) for order_id, defaults, _ in mapped_orders]
+    update_fields = sorted(set(mapped_orders[0][1]) | {'updated_at'})
+    failed = []
+    created, updated, _ = upsert_incomes(
+        incomes, update_fields=update_fields, failed_order_ids=failed, touched_dates=touched_dates
+    )
+
+    # La API siempre devuelve el pedido completo: sus líneas reemplazan a las
+    # anteriores. Como en upsert_incomes, un pedido repetido vale por su primera aparición
+    lines_by_order_id = {}
+    for order_id, _, lines in mapped_orders:
+        if order_id not in failed:
+            lines_by_order_id.setdefault(order_id, lines)
+    save_income_lines(lines_by_order_id, set(lines_by_order_id))
+    return created, updated, set(failed)
+
+
+def parse_api_datetime(value):
+    """Convierte una fecha y hora ISO 8601 de la API en un datetime, o None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+# Claves del pedido que lee map_order_to_income, también las que tienen un valor
+# por defecto: si el pedido del listado las trae todas no hace falta pedir sus
+# detalles. Mantener alineado con map_order_to_income.
+ORDER_REQUIRED_FIELDS = (
+    'id', 'number', 'customer', 'created_at', 'status', 'payment_status',
+    'shipping_status', 'currency', 'subtotal', 'discount', 'shipping_cost', 'total',
+    'shipping_address', 'shipping_option_name', 'payment_details', 'products',
+    'paid_at', 'shipped_at', 'source', 'tracking_number',
+)
+
+
+def map_order_to_income(order_details):
+    """
+    Mapea un pedido de Tiendanube a los campos del modelo Income
+
+    La API devuelve los montos como texto, por lo que se convierten a Decimal
+    para que Income.compute_total() pueda operar con ellos.
+
+    Returns:
+        Tuple: (order_id, defaults, lines) para usar en un upsert por order_id,
+        donde lines tiene una entrada por producto del pedido
+    """
+    # Mapear el estado del pedido a nuestras constantes
+    order_status = OrderStatus.OPEN
+    if order_details['status'] == 'closed':
+        order_status = OrderStatus.CLOSED
+    elif order_details['status'] == 'cancelled':
+        order_status = OrderStatus.CANCELLED
+
+    # Mapear el estado del pago
+    payment_status = PaymentStatus.PENDING
+    if order_details['payment_status'] == 'paid':
+        payment_status = PaymentStatus.PAID
+    elif order_details['payment_status'] == 'cancelled':
+        payment_status = PaymentStatus.CANCELLED
+
+    # Mapear el estado del envío
+    shipping_status = ShippingStatus.NOT_PACKAGED
+    if order_details['shipping_status'] == 'fulfilled':
+        shipping_status = ShippingStatus.SHIPPED
+    elif order_details['shipping_status'] == 'delivered':
+        shipping_status = ShippingStatus.DELIVERED
+
+    defaults = {
+        'order_number': str(order_details['number']),
+        'email': order_details['customer']['email'],
+        'date': datetime.fromisoformat(order_details['created_at'].replace('Z', '+00:00')).date(),
+        'order_status': order_status,
+        'payment_status': payment_status,
+        'shipping_status': shipping_status,
+        'currency': order_details['currency'],
+        'product_subtotal': Decimal(str(order_details['subtotal'])),
+        'discount': Decimal(str(order_details.get('discount', 0) or 0)),
+        'shipping_cost': Decimal(str(order_details.get('shipping_cost', 0) or 0)),
+        'total': Decimal(str(order_details['total'])),
+        'buyer_name': f"{order_details['customer']['name']} {order_details['customer'].get('lastname', '')}".strip(),
+        'tax_id': order_details['customer'].get('identification', ''),
+        'phone': order_details['customer'].get('phone', ''),
+        'shipping_name': order_details['shipping_address'].get('name', ''),
+        'shipping_phone': order_details['shipping_address'].get('phone', ''),
+        'address': order_details['shipping_address'].get('address', ''),
+        'address_number': order_details['shipping_address'].get('number', ''),
+        'floor_apt': f"{order_details['shipping_address'].get('floor', '')} {order_details['shipping_address'].get('apartment', '')}".strip(),
+        'city': order_details['shipping_address'].get('city', ''),
+        'postal_code': order_details['shipping_address'].get('zipcode', ''),
+        'state_province': order_details['shipping_address'].get('province', ''),
+        'country': order_details['shipping_address'].get('country', ''),
+        'shipping_method': order_details.get('shipping_option_name', ''),
+        'payment_method': order_details.get('payment_details', {}).get('method', ''),
+        'payment_transaction_id': order_details.get('payment_details', {}).get('transaction_id', ''),
+        # Resumen de los productos del pedido: el detalle por producto se guarda en IncomeLine
+        'product_name': ', '.join([item['name'] for item in order_details['products']]),
+        'product_price': Decimal(str(order_details['products'][0]['price'])) if order_details['products'] else Decimal('0'),
+        'product_quantity': sum([item['quantity'] for item in order_details['products']]),
+        'payment_date': datetime.fromisoformat(order_details['paid_at'].replace('Z', '+00:00')).date() if order_details.get('paid_at') else None,
+        'shipping_date': datetime.fromisoformat(order_details['shipped_at'].replace('Z', '+00:00')).date() if order_details.get('shipped_at') else None,
+        'channel': order_details.get('source', ''),
+        'tracking_code': order_details.get('tracking_number', ''),
+        'is_physical_product': True,  # Por defecto en Tiendanube
+    }
+    lines = [
+        {
+            'sku': item.get('sku') or '',
+            'name': item.get('name') or '',
+            'unit_price': Decimal(str(item.get('price') or 0)),
+            'quantity': int(item.get('quantity') or 0),
+        }
+        for item in order_details['products']
+    ]
+    return str(order_details['id']), defaults, lines
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import TiendanubeWebhookEvent
+from .facets import add_income_facet_values
+from .rollup import refresh_income_rollup
+from .tiendanube_api import TiendanubeAPI, map_order_to_income, upsert_orders
+
+
+def claim_pending_events(batch_size):
+    """
+    Reserva un lote de eventos pendientes para este proceso
+
+    Los eventos se toman con SELECT ... FOR UPDATE SKIP LOCKED y se marcan
+    con leased_until en una transacción corta: otros procesos no los toman
+    mientras dure la reserva y, si este muere antes de terminar, se retoman
+    cuando vence. Cada reserva cuenta como un intento.
+
+    Returns:
+        List: Eventos reservados, del más antiguo al más nuevo
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            TiendanubeWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=settings.TIENDANUBE_WEBHOOK_MAX_ATTEMPTS)
+            .filter(Q(leased_until__isnull=True) | Q(leased_until__lt=now))
+            .order_by('received_at')[:batch_size]
+        )
+        if events:
+            TiendanubeWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                leased_until=now + timedelta(seconds=settings.TIENDANUBE_WEBHOOK_LEASE_SECONDS),
+                attempts=F('attempts') + 1,
+            )
+    return events
+
+
+def retry_delay(attempts):
+    """
+    Devuelve la espera antes de reintentar un evento que falló
+
+    La espera se duplica con cada intento (TIENDANUBE_WEBHOOK_RETRY_SECONDS,
+    el doble, el cuádruple...), de modo que una caída breve de la API no
+    agote los reintentos de los eventos pendientes en pocos segundos.
+
+    Returns:
+        timedelta: Tiempo hasta que el evento se pueda volver a reservar
+    """
+    return timedelta(seconds=settings.TIENDANUBE_WEBHOOK_RETRY_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def process_pending_events(batch_size=None, concurrency=None):
+    """
+    Aplica a Income un lote de eventos de webhook pendientes
+
+    Los eventos se reservan con claim_pending_events, por lo que se pueden
+    correr varios procesos en paralelo sin tomar el mismo evento. Los
+    detalles de los pedidos se piden a la API fuera de toda transacción (sin
+    retener locks durante las solicitudes HTTP); varios eventos del mismo
+    pedido se resuelven con una sola consulta. Luego, en una transacción
+    corta, todos los pedidos del lote se guardan con un único upsert y los
+    eventos se marcan como procesados. Los eventos que fallan quedan
+    reservados durante retry_delay para no reintentarlos de inmediato.
+
+    Returns:
+        Tuple: (events_processed, errors)
+    """
+    batch_size = batch_size or settings.TIENDANUBE_WEBHOOK_BATCH_SIZE
+    concurrency = concurrency or settings.TIENDANUBE_CONCURRENCY
+    processed = 0
+    errors = 0
+
+    events = claim_pending_events(batch_size)
+    if not events:
+        return 0, 0
+
+    events_by_order = {}
+    for event in events:
+        events_by_order.setdefault(event.resource_id, []).append(event)
+
+    api = TiendanubeAPI()
+    mapped_orders = []
+    failed = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            order_id: executor.submit(api.get_order_details, order_id)
+            for order_id in events_by_order
+        }
+        for order_id, future in futures.items():
+            try:
+                mapped_orders.append(map_order_to_income(future.result()))
+            except Exception as e:
+                print(f"Error al procesar el webhook del pedido {order_id}: {str(e)}")
+                failed[order_id] = str(e)
+
+    with transaction.atomic():
+        # Todos los pedidos del lote se escriben con un único upsert
+        touched_dates = set()
+        _, _, failed_order_ids = upsert_orders(mapped_orders, touched_dates=touched_dates)
+        refresh_income_rollup(touched_dates)
+        add_income_facet_values(
+            defaults for order_id, defaults, _ in mapped_orders if order_id not in failed_order_ids
+        )
+        for order_id in failed_order_ids:
+            failed[order_id] = 'Error al guardar el pedido'
+
+        now = timezone.now()
+        for order_id, order_events in events_by_order.items():
+            event_ids = [event.pk for event in order_events]
+            if order_id in failed:
+                errors += len(order_events)
+                for event in order_events:
+                    # claim_pending_events ya sumó el intento en la base
+                    TiendanubeWebhookEvent.objects.filter(pk=event.pk).update(
+                        last_error=failed[order_id],
+                        leased_until=now + retry_delay(event.attempts + 1),
+                    )
+            else:
+                processed += len(order_events)
+                TiendanubeWebhookEvent.objects.filter(pk__in=event_ids).update(
+                    processed_at=now, last_error='', leased_until=None
+                )
+
+    return processed, errors
@@ -0,0 +1,103 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Income, IncomeLine
+from .services.facets import add_income_facet_values
+from .services.rollup import refresh_income_rollup
+
+# Campos del ingreso que se copian a su línea cuando el pedido tiene un solo producto
+PRODUCT_FIELDS = ('product_name', 'product_price', 'product_quantity', 'sku')
+
+
+@receiver(pre_save, sender=Income)
+def remember_previous_date(sender, instance, using=None, **kwargs):
+    """
+    Guarda la fecha y el producto anteriores del ingreso
+
+    La fecha anterior se usa para recalcular también ese día y mover sus
+    líneas; el producto, para saber si hay que actualizar la línea.
+    """
+    instance._rollup_previous_date = None
+    instance._previous_product = None
+    if instance.pk:
+        previous = (
+            Income.objects.using(using).filter(pk=instance.pk).values_list('date', *PRODUCT_FIELDS).first()
+        )
+        if previous:
+            instance._rollup_previous_date = previous[0]
+            instance._previous_product = previous[1:]
+
+
+def create_single_line(income):
+    """
+    Crea la línea de un ingreso guardado de a uno (admin, Income.objects.create)
+
+    Copia los campos de producto igual que save_income_lines. Las importaciones
+    masivas y la sincronización con Tiendanube usan bulk_create y guardan sus
+    líneas por su cuenta.
+    """
+    IncomeLine.objects.using(income._state.db).create(
+        income=income,
+        date=income.date,
+        sku=income.sku or '',
+        name=income.product_name,
+        unit_price=income.product_price,
+        quantity=income.product_quantity,
+    )
+
+
+def sync_single_line(income):
+    """
+    Copia los campos de producto del ingreso a su línea si el pedido tiene una sola
+
+    En los pedidos de varios productos los campos del ingreso son un resumen
+    (nombres unidos, precio del primero) y no se pueden repartir entre las
+    líneas: esas líneas no se modifican al editar el ingreso.
+    """
+    lines = list(IncomeLine.objects.using(income._state.db).filter(income=income)[:2])
+    if len(lines) != 1:
+        return
+    line = lines[0]
+    line.sku = income.sku or ''
+    line.name = income.product_name
+    line.unit_price = income.product_price
+    line.quantity = income.product_quantity
+    line.save(using=income._state.db)
+
+
+@receiver(post_save, sender=Income)
+def refresh_rollup_on_save(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Recalcula el resumen diario de las fechas afectadas al confirmar la transacción
+
+    Un ingreso nuevo recibe su línea a partir de los campos de producto, para
+    que cuente en las unidades del resumen y en el reporte de productos. Si cambió el producto de un pedido de una sola línea (p. ej. al editarlo
+    en el admin) la línea se actualiza en la misma transacción. Los valores
+    de los filtros laterales solo suman los nuevos: los que dejan de usarse
+    se quitan en la próxima recarga completa (refresh_income_facets).
+
+    Las importaciones masivas (bulk_create, COPY) no disparan señales:
+    recalculan el resumen por su cuenta al terminar.
+    """
+    if raw:
+        return
+    previous_date = getattr(instance, '_rollup_previous_date', None)
+    if previous_date and previous_date != instance.date:
+        # Las líneas copian la fecha del ingreso
+        IncomeLine.objects.using(instance._state.db).filter(income=instance).update(date=instance.date)
+    previous_product = getattr(instance, '_previous_product', None)
+    if created:
+        create_single_line(instance)
+    elif previous_product and previous_product != tuple(getattr(instance, name) for name in PRODUCT_FIELDS):
+        sync_single_line(instance)
+    dates = {instance.date, previous_date}
+    transaction.on_commit(partial(refresh_income_rollup, dates))
+    transaction.on_commit(partial(add_income_facet_values, [instance]))
+
+
+@receiver(post_delete, sender=Income)
+def refresh_rollup_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(refresh_income_rollup, {instance.date}))
@@ -0,0 +1,25 @@
+import pytest
+
+from .fake_tiendanube import FakeTiendanube
+
+
+@pytest.fixture
+def fake_tiendanube(settings):
+    """Inicia un FakeTiendanube y apunta la configuración de la API a él"""
+    servers = []
+
+    def start(orders, **kwargs):
+        fake = FakeTiendanube(orders, **kwargs).__enter__()
+        servers.append(fake)
+        settings.TIENDANUBE_API_URL = fake.url
+        return fake
+
+    settings.TIENDANUBE_STORE_ID = '123'
+    settings.TIENDANUBE_POOL_SIZE = 10
+    settings.TIENDANUBE_RATE_LIMIT_BURST = 1000
+    settings.TIENDANUBE_RATE_LIMIT_PER_SECOND = 1000
+    settings.TIENDANUBE_MAX_RETRIES = 0
+    settings.TIENDANUBE_TIMEOUT = 5
+    yield start
+    for fake in servers:
+        fake.__exit__(None, None, None)
@@ -0,0 +1,33 @@
+import datetime
+from decimal import Decimal
+from itertools import count
+
+from incomes.models import Income
+
+_order_ids = count(1)
+
+
+def income_data(**overrides):
+    """Campos mínimos de un ingreso válido; order_id y order_number son únicos por llamada"""
+    number = next(_order_ids)
+    data = {
+        'order_id': f'9{number:07d}',
+        'order_number': str(1000 + number),
+        'email': f'comprador{number}@example.com',
+        'date': datetime.date(2024, 1, 15),
+        'currency': 'ARS',
+        'product_subtotal': Decimal('1000.00'),
+        'discount': Decimal('0.00'),
+        'shipping_cost': Decimal('0.00'),
+        'total': Decimal('1000.00'),
+        'buyer_name': 'Ana Pérez',
+        'product_name': 'Remera lisa',
+        'product_price': Decimal('1000.00'),
+        'product_quantity': 1,
+    }
+    data.update(overrides)
+    return data
+
+
+def create_income(**overrides):
+    return Income.objects.create(**income_data(**overrides))
@@ -0,0 +1,169 @@
+"""
+Servidor HTTP local que imita los endpoints de pedidos de la API de Tiendanube
+
+Corre en un hilo (http.server) para ejercitar TiendanubeAPI de punta a punta:
+la sesión con keep-alive, el rate limiter, la paginación y los detalles en
+paralelo. Registra cada solicitud y la máxima cantidad de solicitudes
+atendidas a la vez.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from incomes.services.tiendanube_api import parse_api_datetime
+
+
+def make_order(order_id, updated_at='2024-03-01T10:00:00+0000', with_products=True):
+    """Pedido como lo devuelve la API; sin productos obliga a pedir sus detalles"""
+    order = {
+        'id': order_id,
+        'number': 1000 + order_id,
+        'customer': {'email': f'cliente{order_id}@example.com', 'name': 'Ana', 'lastname': 'Pérez'},
+        'created_at': '2024-03-01T10:00:00+0000',
+        'updated_at': updated_at,
+        'status': 'open',
+        'payment_status': 'paid',
+        'shipping_status': 'unpacked',
+        'currency': 'ARS',
+        'subtotal': '100.00',
+        'total': '110.00',
+        'discount': '0.00',
+        'shipping_cost': '10.00',
+        'shipping_address': {'city': 'CABA'},
+        'shipping_option_name': 'Correo Argentino',
+        'payment_details': {'method': 'credit_card', 'transaction_id': f'tx-{order_id}'},
+        'paid_at': '2024-03-01T11:00:00+0000',
+        'shipped_at': None,
+        'source': 'store',
+        'tracking_number': '',
+        'products': [
+            {'name': 'Remera', 'price': '50.00', 'quantity': 2, 'sku': 'REM-1'},
+        ],
+    }
+    if not with_products:
+        del order['products']
+    return order
+
+
+class FakeTiendanube:
+    """
+    Args:
+        orders: Pedidos de la tienda (dicts de make_order), en el orden del listado
+        delay: Segundos que tarda cada respuesta
+        list_without_products: Si True, el listado omite los productos
+        list_without: Otras claves que el listado omite (los detalles las traen)
+    """
+
+    def __init__(self, orders=(), delay=0.0, list_without_products=False, list_without=()):
+        self.orders = {order['id']: order for order in orders}
+        self.delay = delay
+        self.list_without = set(list_without)
+        if list_without_products:
+            self.list_without.add('products')
+        self.failing_order_ids = set()
+        self.failing_pages = set()
+        # (status, headers) con los que se responden las próximas solicitudes, en orden
+        self.queued_responses = []
+        # Se llaman con el número de página o el id del pedido antes de responder
+        self.on_list_page = None
+        self.on_detail = None
+        self.requests = []
+        # Puertos de origen: una conexión keep-alive reutilizada conserva el suyo
+        self.client_ports = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def list_requests(self):
+        return [params for kind, params in self.requests if kind == 'list']
+
+    def detail_requests(self):
+        return [params for kind, params in self.requests if kind == 'detail']
+
+    def handle(self, request):
+        parsed = urlparse(request.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        resource = parsed.path.rstrip('/').split('/')[-1]
+        kind = 'list' if resource == 'orders' else 'detail'
+
+        with self.lock:
+            self.requests.append((kind, {**params, 'id': resource} if kind == 'detail' else params))
+            self.client_ports.add(request.client_address[1])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            queued = self.queued_responses.pop(0) if self.queued_responses else None
+        headers = {}
+        try:
+            time.sleep(self.delay)
+            if queued is not None:
+                status, headers = queued
+                body = {'description': 'Respuesta programada'}
+            elif kind == 'list':
+                status, body = self.list_orders(params)
+            else:
+                status, body = self.order_detail(int(resource))
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+        data = json.dumps(body).encode()
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+    def list_orders(self, params):
+        page = int(params.get('page', 1))
+        per_page = int(params.get('per_page', 30))
+        if self.on_list_page is not None:
+            self.on_list_page(page)
+        if page in self.failing_pages:
+            return 500, {'description': 'Error interno'}
+
+        orders = list(self.orders.values())
+        if 'updated_at_min' in params:
+            updated_min = parse_api_datetime(params['updated_at_min'])
+            orders = [order for order in orders if parse_api_datetime(order['updated_at']) >= updated_min]
+        orders = orders[(page - 1) * per_page:page * per_page]
+        if self.list_without:
+            orders = [{key: value for key, value in order.items() if key not in self.list_without} for order in orders]
+        return 200, orders
+
+    def order_detail(self, order_id):
+        if self.on_detail is not None:
+            self.on_detail(order_id)
+        if order_id in self.failing_order_ids or order_id not in self.orders:
+            return 500, {'description': 'Error interno'}
+        return 200, self.orders[order_id]
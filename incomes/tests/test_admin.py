@@ -0,0 +1,140 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib import admin
+from django.urls import reverse
+from django.utils import timezone
+
+from incomes.admin import TOP_PRODUCTS_DAYS, IncomeAdmin
+from incomes.models import Income, IncomeDailyRollup, IncomeFacetValue, IncomeLine, TiendanubeWebhookEvent
+
+from .factories import create_income, income_data
+
+pytestmark = pytest.mark.django_db
+
+
+def search(term):
+    model_admin = IncomeAdmin(Income, admin.site)
+    queryset, _ = model_admin.get_search_results(None, Income.objects.all(), term)
+    return set(queryset.values_list('buyer_name', flat=True))
+
+
+def test_search_text_term():
+    create_income(buyer_name='Ana Pérez')
+    create_income(buyer_name='Juan Gómez')
+
+    assert search('gómez') == {'Juan Gómez'}
+
+
+def test_search_identifier_term():
+    create_income(buyer_name='Ana Pérez', order_number='5120', tax_id='20-12345678-9')
+    create_income(buyer_name='Juan Gómez', order_number='7310')
+
+    assert search('#512') == {'Ana Pérez'}
+    # El CUIT con guiones también encuentra el guardado sin ellos y viceversa
+    assert search('20-1234') == {'Ana Pérez'}
+
+
+def test_search_mixed_text_and_digit_terms():
+    create_income(buyer_name='Ana Pérez', product_name='Remera 2 colores', order_number='100')
+    create_income(buyer_name='Juan Gómez', product_name='Remera lisa', order_number='200')
+    create_income(buyer_name='cliente42', product_name='Gorra', order_number='300')
+
+    # El dígito se busca como identificador y también como texto libre
+    assert search('Remera 2') == {'Ana Pérez', 'Juan Gómez'}
+    assert search('"Remera 2"') == {'Ana Pérez'}
+    assert search('cliente42') == {'cliente42'}
+    assert search('Remera 200') == {'Juan Gómez'}
+
+
+@pytest.mark.parametrize('model', [IncomeDailyRollup, IncomeFacetValue])
+def test_derived_tables_are_read_only(rf, admin_user, model):
+    request = rf.get('/')
+    request.user = admin_user
+    model_admin = admin.site._registry[model]
+
+    assert not model_admin.has_add_permission(request)
+    assert not model_admin.has_change_permission(request)
+    assert not model_admin.has_delete_permission(request)
+
+
+def test_webhook_events_are_read_only_and_can_be_retried(admin_client, rf, admin_user):
+    request = rf.get('/')
+    request.user = admin_user
+    model_admin = admin.site._registry[TiendanubeWebhookEvent]
+    assert not model_admin.has_add_permission(request)
+    assert not model_admin.has_change_permission(request)
+
+    pending = TiendanubeWebhookEvent.objects.create(
+        store_id='123', event='order/paid', resource_id='1', payload={'id': 1},
+        attempts=5, leased_until=timezone.now(), last_error='500',
+    )
+    processed = TiendanubeWebhookEvent.objects.create(
+        store_id='123', event='order/paid', resource_id='2', payload={'id': 2},
+        attempts=1, processed_at=timezone.now(),
+    )
+
+    response = admin_client.post(reverse('admin:incomes_tiendanubewebhookevent_changelist'), {
+        'action': 'retry_events',
+        '_selected_action': [pending.pk, processed.pk],
+    })
+
+    assert response.status_code == 302
+    pending.refresh_from_db()
+    processed.refresh_from_db()
+    assert (pending.attempts, pending.leased_until) == (0, None)
+    assert processed.attempts == 1
+
+
+def test_top_products_groups_lines_by_sku_within_range(admin_client):
+    # Cada ingreso creado de a uno trae la línea de su producto
+    first = create_income(
+        date=datetime.date(2024, 1, 10), sku='REM-1', product_quantity=2, product_price=Decimal('50.00')
+    )
+    create_income(date=datetime.date(2024, 1, 20), sku='REM-1', product_price=Decimal('50.00'))
+    create_income(date=datetime.date(2024, 3, 1), sku='GOR-1', product_quantity=10, product_price=Decimal('300.00'))
+    IncomeLine.objects.create(
+        income=first, date=first.date, sku='GOR-1', name='Gorra', unit_price=Decimal('300.00'), quantity=1
+    )
+
+    response = admin_client.get(
+        reverse('admin:incomes_income_top_products'), {'desde': '2024-01-01', 'hasta': '2024-01-31'}
+    )
+
+    assert response.status_code == 200
+    assert [
+        (row['sku'], row['units'], row['revenue'], row['orders']) for row in response.context['products']
+    ] == [
+        ('GOR-1', 1, Decimal('300.00'), 1),
+        ('REM-1', 3, Decimal('150.00'), 2),
+    ]
+
+
+@pytest.mark.parametrize('params', [{'hasta': '2024-02-30'}, {'desde': '2024-13-01'}, {'desde': 'ayer'}])
+def test_top_products_ignores_invalid_dates(admin_client, params):
+    response = admin_client.get(reverse('admin:incomes_income_top_products'), params)
+
+    assert response.status_code == 200
+    today = timezone.localdate()
+    assert response.context['date_to'] == today
+    assert response.context['date_from'] == today - datetime.timedelta(days=TOP_PRODUCTS_DAYS)
+
+
+def test_admin_created_income_counts_in_rollup_and_top_products(admin_client, rf, admin_user, django_capture_on_commit_callbacks):
+    request = rf.get('/')
+    request.user = admin_user
+    form_fields = admin.site._registry[Income].get_form(request).base_fields
+    values = income_data(sku='BUZ-1', product_name='Buzo', product_quantity=3, product_price=Decimal('2000.00'))
+    data = {name: values.get(name, field.initial or '') for name, field in form_fields.items()}
+    data.update({'date': '15/01/2024', 'lines-TOTAL_FORMS': 0, 'lines-INITIAL_FORMS': 0})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(reverse('admin:incomes_income_add'), data)
+
+    assert response.status_code == 302
+    assert IncomeDailyRollup.objects.get(date=datetime.date(2024, 1, 15)).units == 3
+    response = admin_client.get(
+        reverse('admin:incomes_income_top_products'), {'desde': '2024-01-01', 'hasta': '2024-01-31'}
+    )
+    assert [(row['sku'], row['units']) for row in response.context['products']] == [('BUZ-1', 3)]
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+import pytest
+
+from incomes.models import Income, IncomeLine
+from incomes.services.bulk_upsert import upsert_csv_batch, upsert_incomes
+
+from .factories import create_income, income_data
+
+pytestmark = pytest.mark.django_db
+
+
+def test_upsert_creates_and_updates():
+    create_income(order_id='1', buyer_name='Antes')
+
+    created, updated, errors = upsert_incomes([
+        Income(**income_data(order_id='1', buyer_name='Después')),
+        Income(**income_data(order_id='2')),
+    ])
+
+    assert (created, updated, errors) == (1, 1, 0)
+    assert Income.objects.get(order_id='1').buyer_name == 'Después'
+
+
+def test_duplicate_order_ids_keep_first_row_and_are_not_counted():
+    duplicates = []
+
+    created, updated, errors = upsert_incomes([
+        Income(**income_data(order_id='1', product_name='Remera')),
+        Income(**income_data(order_id='1', product_name='Gorra')),
+        Income(**income_data(order_id='2')),
+        Income(**income_data(order_id='1', product_name='Buzo')),
+    ], duplicate_order_ids=duplicates)
+
+    assert (created, updated, errors) == (2, 0, 0)
+    assert duplicates == ['1', '1']
+    assert Income.objects.get(order_id='1').product_name == 'Remera'
+
+
+def test_rows_without_order_id_are_errors():
+    created, updated, errors = upsert_incomes([Income(**income_data(order_id=''))])
+
+    assert (created, updated, errors) == (0, 0, 1)
+
+
+def test_csv_batches_keep_first_row_and_add_every_line():
+    seen_order_ids = set()
+    first_batch = [
+        Income(**income_data(order_id='1', product_name='Remera', product_price=Decimal('50'), sku='REM')),
+        Income(**income_data(order_id='1', product_name='Gorra', product_price=Decimal('20'), sku='GOR')),
+    ]
+    second_batch = [
+        Income(**income_data(order_id='1', product_name='Buzo', product_price=Decimal('80'), sku='BUZ')),
+        Income(**income_data(order_id='2', product_name='Remera', product_price=Decimal('50'), sku='REM')),
+    ]
+
+    assert upsert_csv_batch(first_batch, seen_order_ids) == (1, 0, 0, 1)
+    assert upsert_csv_batch(second_batch, seen_order_ids) == (1, 0, 0, 1)
+
+    assert Income.objects.get(order_id='1').product_name == 'Remera'
+    assert sorted(IncomeLine.objects.filter(income__order_id='1').values_list('sku', flat=True)) == [
+        'BUZ', 'GOR', 'REM'
+    ]
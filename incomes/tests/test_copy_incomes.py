@@ -0,0 +1,86 @@
+import csv
+from decimal import Decimal
+
+import pytest
+
+from incomes.models import Income, IncomeLine
+from incomes.services.copy_incomes import import_csv_copy, normalize_fields
+from incomes.services.row_parser import IncomeRowParser
+
+from .factories import create_income
+
+pytestmark = pytest.mark.django_db
+
+HEADER = [
+    'Identificador de la orden', 'Número de orden', 'Email', 'Fecha', 'Moneda',
+    'Subtotal de productos', 'Descuento', 'Costo de envío', 'Total',
+    'Nombre del comprador', 'Nombre del producto', 'Precio del producto', 'Cantidad del producto', 'SKU',
+]
+
+
+def csv_row(order_id, product='Remera', price='50', quantity='1', sku='REM', subtotal='100'):
+    return [
+        order_id, f'N{order_id}', f'cliente{order_id}@example.com', '15/01/2024', 'ARS',
+        subtotal, '0', '10', '110', 'Ana Pérez', product, price, quantity, sku,
+    ]
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(rows):
+        path = tmp_path / 'ventas.csv'
+        with open(path, 'w', encoding='cp1252', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return str(path)
+    return write
+
+
+def test_copy_counts_created_updated_and_repeated_rows(write_csv):
+    create_income(order_id='1', product_name='Antes')
+    path = write_csv([
+        csv_row('1', product='Remera', sku='REM'),
+        csv_row('2', product='Gorra', sku='GOR'),
+        csv_row('2', product='Buzo', sku='BUZ'),
+        csv_row('3'),
+        csv_row('2', product='Media', sku='MED'),
+    ])
+
+    created, updated, errors, _ = import_csv_copy(path)
+
+    # Las dos filas repetidas de la orden 2 no cuentan como actualizaciones
+    assert (created, updated, errors) == (2, 1, 0)
+    assert Income.objects.get(order_id='1').product_name == 'Remera'
+    assert Income.objects.get(order_id='2').product_name == 'Gorra'
+    assert sorted(IncomeLine.objects.filter(income__order_id='2').values_list('sku', flat=True)) == [
+        'BUZ', 'GOR', 'MED'
+    ]
+
+
+def test_copy_reports_amounts_out_of_range_as_row_errors(write_csv):
+    path = write_csv([
+        csv_row('1'),
+        csv_row('2', price='12345678901.00'),
+        csv_row('3', subtotal='99999999999'),
+        # Precio y cantidad válidos, pero su producto no entra en line_total
+        csv_row('4', price='9999999999.00', quantity='10'),
+    ])
+
+    created, updated, errors, _ = import_csv_copy(path)
+
+    assert (created, updated, errors) == (1, 0, 3)
+    assert list(Income.objects.values_list('order_id', flat=True)) == ['1']
+
+
+def test_normalize_fields_validates_decimal_places():
+    parse = IncomeRowParser(HEADER)
+
+    assert normalize_fields(parse(csv_row('1', price='50.25')))['product_price'] == Decimal('50.25')
+    with pytest.raises(ValueError, match='product_price'):
+        normalize_fields(parse(csv_row('1', price='50.255')))
+    with pytest.raises(ValueError, match='total'):
+        # El subtotal entra en numeric(12, 2) pero el total recalculado no
+        normalize_fields(parse(csv_row('1', subtotal='9999999999.99')))
+    with pytest.raises(ValueError, match='total de la línea'):
+        normalize_fields(parse(csv_row('1', price='5000000000.00', quantity='2')))
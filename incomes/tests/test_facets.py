@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from incomes.models import Income, IncomeFacetValue
+from incomes.services.facets import (
+    FACET_FIELDS, add_income_facet_values, get_facet_values, refresh_income_facets,
+)
+
+from .factories import create_income, income_data
+
+pytestmark = pytest.mark.django_db
+
+
+def facet_counts(field):
+    return dict(IncomeFacetValue.objects.filter(field=field).values_list('value', 'count'))
+
+
+def test_refresh_counts_every_value():
+    create_income(currency='ARS', country='AR', channel='')
+    create_income(currency='ARS', country='UY', channel='')
+    create_income(currency='USD', country='AR', channel='')
+
+    refresh_income_facets()
+
+    assert facet_counts('currency') == {'ARS': 2, 'USD': 1}
+    assert facet_counts('country') == {'AR': 2, 'UY': 1}
+    assert facet_counts('channel') == {'': 3}
+
+
+def test_add_values_only_inserts_new_ones():
+    create_income(currency='ARS')
+    refresh_income_facets()
+
+    add_income_facet_values([Income(**income_data(currency='ARS')), Income(**income_data(currency='BRL'))])
+
+    assert facet_counts('currency') == {'ARS': 1, 'BRL': None}
+
+
+def test_facet_values_sort_like_django_with_null_last():
+    IncomeFacetValue.objects.bulk_create([
+        IncomeFacetValue(field='country', value=value) for value in ['UY', None, 'AR', '']
+    ])
+
+    assert get_facet_values('country') == ['', 'AR', 'UY', None]
+
+
+def test_changelist_filters_read_cached_values(admin_client):
+    create_income(currency='ARS')
+    refresh_income_facets()
+    # Un valor que ya no está en la tabla de ingresos sigue como opción hasta la próxima recarga
+    IncomeFacetValue.objects.create(field='currency', value='USD')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse('admin:incomes_income_changelist'))
+
+    currency_filter = next(
+        spec for spec in response.context['cl'].filter_specs if spec.field_path == 'currency'
+    )
+    assert currency_filter.lookup_choices == ['ARS', 'USD']
+    # Las opciones no salen de un SELECT DISTINCT sobre los ingresos
+    assert not [
+        query for query in queries
+        if 'DISTINCT' in query['sql']
+        and any(f'"incomes_income"."{field}"' in query['sql'] for field in FACET_FIELDS)
+    ]
@@ -0,0 +1,106 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from incomes.constants import OrderStatus, PaymentStatus
+from incomes.management.commands.audit_indexes import Command
+from incomes.models import Income
+
+from .factories import create_income
+
+pytestmark = pytest.mark.django_db
+
+
+def index(name, columns, unique=False, opclasses=None, expressions=None, predicate=None):
+    return {
+        'table': 'incomes_income',
+        'name': name,
+        'bytes': 8192,
+        'size': '8192 bytes',
+        'scans': 0,
+        'unique': unique,
+        'columns': columns,
+        'opclasses': opclasses or ['1'] * len(columns),
+        'expressions': expressions,
+        'predicate': predicate,
+    }
+
+
+def redundant_names(indexes):
+    return [(index['name'], covering['name']) for index, covering in Command().find_redundant(indexes)]
+
+
+def test_prefix_of_another_index_is_redundant():
+    indexes = [index('fecha', ['2']), index('fecha_id', ['2', '1']), index('canal_fecha', ['5', '2'])]
+
+    assert redundant_names(indexes) == [('fecha', 'fecha_id')]
+
+
+def test_only_one_of_two_identical_indexes_is_reported():
+    indexes = [index('b_idx', ['2', '1']), index('a_idx', ['2', '1'])]
+
+    assert redundant_names(indexes) == [('b_idx', 'a_idx')]
+
+
+def test_unique_partial_expression_and_other_opclass_indexes_are_kept():
+    indexes = [
+        index('clave', ['3'], unique=True),
+        index('clave_fecha', ['3', '2']),
+        index('abiertas', ['2'], predicate="(order_status)::text = 'abierta'"),
+        index('patron', ['4'], opclasses=['10']),
+        index('trigramas', ['0'], expressions='upper((buyer_name)::text)'),
+        index('patron_fecha', ['4', '2']),
+        index('expresion_fecha', ['0', '2'], expressions='upper((email)::text)'),
+    ]
+
+    assert redundant_names(indexes) == []
+
+
+def test_audit_reports_unused_and_duplicate_indexes():
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE INDEX incomes_test_channel_idx ON incomes_income (channel)')
+    out = StringIO()
+
+    call_command('audit_indexes', tabla='incomes_income', stdout=out)
+
+    report = out.getvalue()
+    assert 'incomes_date_status_idx' in report
+    assert 'incomes_income.incomes_test_channel_idx (8192 bytes) -> incomes_channel_date_idx' in report
+    assert 'expenses_' not in report
+
+
+def explain(queryset):
+    with connection.cursor() as cursor:
+        # Con pocas filas el planificador prefiere recorrer la tabla: se fuerza el uso de índices
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+@pytest.mark.parametrize('queryset, index_name', [
+    (
+        lambda: Income.objects.filter(
+            date__range=(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)),
+            order_status=OrderStatus.CLOSED,
+        ),
+        'incomes_date_status_idx',
+    ),
+    (lambda: Income.objects.filter(channel='web', date__gte=datetime.date(2024, 1, 1)), 'incomes_channel_date_idx'),
+    (lambda: Income.objects.filter(order_status=OrderStatus.OPEN).order_by('-date')[:20], 'incomes_open_date_idx'),
+    (
+        lambda: Income.objects.filter(payment_status=PaymentStatus.PENDING).order_by('-date')[:20],
+        'incomes_unpaid_date_idx',
+    ),
+    (lambda: Income.objects.filter(sku='REM-1'), 'incomes_sku_idx'),
+    (lambda: Income.objects.filter(order_number__startswith='51'), 'incomes_order_number_like'),
+    (lambda: Income.objects.order_by('-date', '-id')[:20], 'incomes_date_id_idx'),
+])
+def test_workload_queries_can_use_their_index(queryset, index_name):
+    for _ in range(5):
+        create_income()
+
+    assert index_name in explain(queryset())
@@ -0,0 +1,102 @@
+import csv
+from functools import partial
+
+import pytest
+
+from incomes.models import Income
+from incomes.services import bulk_upsert, import_incomes, parallel_import
+from incomes.services.import_incomes import import_csv_batched
+from incomes.services.parallel_import import import_csv_parallel, split_file
+
+HEADER = [
+    'Identificador de la orden', 'Número de orden', 'Email', 'Fecha', 'Total',
+    'Nombre del producto', 'Precio del producto', 'Cantidad del producto', 'Notas del comprador',
+]
+
+
+def csv_row(number):
+    # Cada tanto una nota entre comillas con saltos de línea y comillas escapadas
+    notes = f'Entregar "después"\nde las 18\r\nPiso {number}' if number % 3 == 0 else ''
+    return [
+        str(number), f'N{number}', f'cliente{number}@example.com', '15/01/2024', '110',
+        f'Remera {number}', '50', '1', notes,
+    ]
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    def write(rows):
+        path = tmp_path / 'ventas.csv'
+        with open(path, 'w', encoding='cp1252', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return str(path)
+    return write
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start).decode('cp1252')
+    return list(csv.reader(data.splitlines(keepends=True)))
+
+
+@pytest.mark.parametrize('range_size, block_size', [(1, 7), (64, 16), (100, 1024), (10 ** 6, 64)])
+def test_split_file_ranges_end_on_record_boundaries(monkeypatch, sales_csv, range_size, block_size):
+    monkeypatch.setattr(parallel_import, 'READ_BLOCK_SIZE', block_size)
+    rows = [csv_row(number) for number in range(1, 41)]
+    path = sales_csv(rows)
+
+    header, ranges = split_file(path, range_size=range_size)
+
+    assert header == HEADER
+    # Los rangos son contiguos y cubren todo el archivo salvo el encabezado
+    with open(path, 'rb') as csv_file:
+        header_end = len(csv_file.readline())
+        size = len(csv_file.read()) + header_end
+    assert ranges[0][0] == header_end
+    assert ranges[-1][1] == size
+    assert all(previous[1] == current[0] for previous, current in zip(ranges, ranges[1:]))
+    # Ningún registro queda partido: parsear rango por rango da las mismas filas
+    assert [row for start, end in ranges for row in read_range(path, start, end)] == rows
+    if range_size < 100:
+        assert len(ranges) > 1
+
+
+def test_split_file_with_only_header(sales_csv):
+    header, ranges = split_file(sales_csv([]))
+
+    assert header == HEADER
+    assert ranges == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_csv_parallel(monkeypatch, sales_csv):
+    # Rangos chicos para que cada proceso parsee varios
+    monkeypatch.setattr(parallel_import, 'split_file', partial(split_file, range_size=256))
+    path = sales_csv([csv_row(number) for number in range(1, 31)] + [csv_row(5)])
+
+    created, updated, errors, _ = import_csv_parallel(path, workers=2, batch_size=7)
+
+    assert (created, updated, errors) == (30, 0, 0)
+    assert Income.objects.get(order_id='9').buyer_notes == 'Entregar "después"\nde las 18\r\nPiso 9'
+    # La fila repetida de la orden 5 solo aporta su línea
+    assert Income.objects.get(order_id='5').lines.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('import_csv', [import_csv_batched, partial(import_csv_parallel, workers=2)])
+def test_parse_errors_are_recorded_in_metrics(monkeypatch, sales_csv, import_csv):
+    recorded = []
+    for module in (bulk_upsert, import_incomes, parallel_import):
+        monkeypatch.setattr(module, 'record_import_rows', lambda *counts: recorded.append(counts))
+    unparseable = csv_row(3)
+    unparseable[7] = 'dos'
+    path = sales_csv([csv_row(1), csv_row(2), unparseable])
+
+    created, updated, errors, _ = import_csv(path)
+
+    assert (created, updated, errors) == (2, 0, 1)
+    # Los totales de la métrica coinciden con los que devuelve la importación
+    assert tuple(map(sum, zip(*recorded))) == (2, 0, 1)
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from incomes.services.rate_limiter import TokenBucket
+
+
+def test_acquire_waits_for_refill():
+    bucket = TokenBucket(capacity=2, rate=20)
+    started = time.monotonic()
+
+    for _ in range(4):
+        bucket.acquire()
+
+    # Dos solicitudes en ráfaga y dos más a 20 por segundo
+    assert time.monotonic() - started >= 0.09
+
+
+def test_pause_blocks_until_it_expires():
+    bucket = TokenBucket(capacity=10, rate=1000)
+    bucket.pause(0.1)
+    started = time.monotonic()
+
+    bucket.acquire()
+
+    assert time.monotonic() - started >= 0.09
+
+
+def test_headers_resize_bucket_and_rate():
+    bucket = TokenBucket(capacity=10, rate=1)
+
+    bucket.update_from_headers({
+        'x-rate-limit-limit': '40', 'x-rate-limit-remaining': '5', 'x-rate-limit-reset': '2000',
+    })
+
+    assert bucket.capacity == 40
+    assert bucket.tokens <= 5
+    assert bucket.rate == pytest.approx(17.5)
+
+
+def test_headers_keep_most_restrictive_remaining():
+    bucket = TokenBucket(capacity=40, rate=2)
+    bucket.update_from_headers({'x-rate-limit-limit': '40', 'x-rate-limit-remaining': '3'})
+
+    # Una respuesta más vieja que llega después no devuelve tokens
+    bucket.update_from_headers({'x-rate-limit-limit': '40', 'x-rate-limit-remaining': '30'})
+
+    assert bucket.tokens < 4
+
+
+def test_headers_without_limits_are_ignored():
+    bucket = TokenBucket(capacity=10, rate=2)
+
+    bucket.update_from_headers({'x-rate-limit-limit': 'abc'})
+    bucket.update_from_headers({})
+
+    assert (bucket.capacity, bucket.rate) == (10, 2)
@@ -0,0 +1,110 @@
+import csv
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+
+from incomes.services.import_incomes import parse_row
+from incomes.services.parsing import clean_decimal, parse_date_string
+from incomes.services.row_parser import INCOME_CSV_COLUMNS, IncomeRowParser, parse_decimal
+
+FULL_HEADER = [column for _, column, _, _ in INCOME_CSV_COLUMNS]
+
+VALUES = {
+    'Fecha': '15/01/2024',
+    'Fecha de pago': '2024-01-16',
+    'Fecha de envío': '',
+    'Subtotal de productos': '$ 1.000,50',
+    'Descuento': '',
+    'Costo de envío': '150',
+    'Total': 'no es un número',
+    'Precio del producto': '500,25',
+    'Cantidad del producto': '2',
+    'Producto Físico': 'No',
+}
+
+
+def parse_both(header, rows):
+    """Parsea el mismo CSV con parse_row (DictReader) y con IncomeRowParser (csv.reader)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+    expected = [parse_row(row) for row in csv.DictReader(io.StringIO(buffer.getvalue()))]
+    reader = csv.reader(io.StringIO(buffer.getvalue()))
+    parse = IncomeRowParser(next(reader))
+    return expected, [parse(row) for row in reader]
+
+
+def test_parser_matches_parse_row_with_every_column():
+    row = [VALUES.get(column, f'valor {column}') for column in FULL_HEADER]
+
+    expected, parsed = parse_both(FULL_HEADER, [row])
+
+    assert parsed == expected
+    fields = parsed[0]
+    assert fields['date'] == datetime.date(2024, 1, 15)
+    assert fields['payment_date'] == datetime.date(2024, 1, 16)
+    assert fields['shipping_date'] is None
+    assert fields['product_price'] == Decimal('500.25')
+    assert fields['total'] == Decimal('0')
+    assert fields['product_quantity'] == 2
+    assert fields['is_physical_product'] is False
+
+
+def test_parser_matches_parse_row_with_missing_columns():
+    header = ['Identificador de la orden', 'Fecha', 'Total', 'Nombre del producto']
+
+    expected, parsed = parse_both(header, [['1', '2024-01-15', '100', 'Remera']])
+
+    assert parsed == expected
+    assert parsed[0]['order_status'] == 'abierta'
+    assert parsed[0]['product_quantity'] == 0
+    assert parsed[0]['is_physical_product'] is True
+
+
+def test_parser_matches_parse_row_with_short_rows():
+    header = ['Identificador de la orden', 'Fecha', 'Total', 'Nombre del producto', 'Cantidad del producto']
+
+    expected, parsed = parse_both(header, [['1', '15/01/2024']])
+
+    assert parsed == expected
+    assert parsed[0]['product_name'] is None
+    assert parsed[0]['total'] == Decimal('0')
+    assert parsed[0]['product_quantity'] == 0
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('15/01/2024', datetime.date(2024, 1, 15)),
+    ('5/1/2024', datetime.date(2024, 1, 5)),
+    ('2024-01-15', datetime.date(2024, 1, 15)),
+    ('31/02/2024', None),
+    ('15.01.2024', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_date_string(value, expected):
+    assert parse_date_string(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1500', Decimal('1500')),
+    ('$ 1500,50', Decimal('1500.50')),
+    ('-20.5', Decimal('-20.5')),
+    ('', Decimal('0')),
+    (None, Decimal('0')),
+    ('abc', Decimal('0')),
+])
+def test_clean_decimal(value, expected):
+    assert clean_decimal(value) == expected
+
+
+@pytest.mark.parametrize('value', [
+    '1500', '1500,50', '1500.50', '0,05', '007', '$ 1500,50', '-20.5', '1.000,50', ',5', '5,', '1,2,3',
+    '١٢٣', '²', 'abc', '', None,
+])
+def test_parse_decimal_matches_clean_decimal(value):
+    # Mismo valor y misma representación (cantidad de decimales) por el camino rápido o no
+    assert str(parse_decimal(value)) == str(clean_decimal(value))
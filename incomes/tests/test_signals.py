@@ -0,0 +1,76 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from incomes.models import IncomeDailyRollup, IncomeLine
+
+from .factories import create_income
+
+pytestmark = pytest.mark.django_db
+
+
+def add_line(income, name, quantity=1, price=Decimal('1000.00')):
+    return IncomeLine.objects.create(
+        income=income, date=income.date, name=name, unit_price=price, quantity=quantity
+    )
+
+
+def test_new_income_gets_its_line(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        income = create_income(sku='REM-1', product_quantity=2, product_price=Decimal('500.00'))
+
+    line = income.lines.get()
+    assert (line.date, line.sku, line.name, line.quantity, line.line_total) == (
+        income.date, 'REM-1', 'Remera lisa', 2, Decimal('1000.00')
+    )
+    assert IncomeDailyRollup.objects.get(date=income.date).units == 2
+
+
+def test_product_edit_updates_single_line_and_rollup(django_capture_on_commit_callbacks):
+    income = create_income(sku='REM-1')
+    line = income.lines.get()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        income.product_name = 'Remera estampada'
+        income.product_quantity = 3
+        income.product_price = Decimal('500.00')
+        income.sku = 'REM-2'
+        income.save()
+
+    line.refresh_from_db()
+    assert (line.name, line.quantity, line.unit_price, line.line_total, line.sku) == (
+        'Remera estampada', 3, Decimal('500.00'), Decimal('1500.00'), 'REM-2'
+    )
+    rollup = IncomeDailyRollup.objects.get(date=income.date)
+    assert rollup.units == 3
+
+
+def test_product_edit_keeps_lines_of_multi_product_orders():
+    income = create_income(product_name='Remera, Gorra')
+    income.lines.update(name='Remera')
+    add_line(income, 'Gorra')
+
+    income.product_name = 'Remera, Gorra, Media'
+    income.save()
+
+    assert sorted(income.lines.values_list('name', flat=True)) == ['Gorra', 'Remera']
+
+
+def test_date_edit_moves_lines():
+    income = create_income()
+    line = income.lines.get()
+
+    income.date = datetime.date(2024, 2, 1)
+    income.save()
+
+    line.refresh_from_db()
+    assert line.date == datetime.date(2024, 2, 1)
+    assert line.name == 'Remera lisa'
+
+
+@pytest.mark.parametrize('value', ['2024-02-30', '15/01/2024'])
+def test_rebuild_rollup_rejects_invalid_dates(value):
+    with pytest.raises(CommandError, match='--desde debe tener el formato AAAA-MM-DD'):
+        call_command('rebuild_income_rollup', desde=value)
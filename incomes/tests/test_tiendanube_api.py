@@ -0,0 +1,180 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from incomes.models import Income, IncomeLine, TiendanubeSyncState
+from incomes.services import tiendanube_api
+from incomes.services.tiendanube_api import ORDERS_PER_PAGE, TiendanubeAPI, parse_api_datetime
+
+from .fake_tiendanube import make_order
+
+pytestmark = pytest.mark.django_db
+
+
+def test_session_reuses_connections(fake_tiendanube):
+    fake = fake_tiendanube([make_order(1)])
+    api = TiendanubeAPI()
+
+    for _ in range(10):
+        api.get_order_details(1)
+
+    assert len(fake.client_ports) == 1
+
+
+def test_server_errors_are_retried_with_backoff(fake_tiendanube, settings, monkeypatch):
+    settings.TIENDANUBE_MAX_RETRIES = 3
+    sleeps = []
+    monkeypatch.setattr(tiendanube_api.time, 'sleep', sleeps.append)
+    fake = fake_tiendanube([make_order(1)])
+    fake.queued_responses = [(503, {}), (502, {})]
+
+    order = TiendanubeAPI().get_order_details(1)
+
+    assert order['id'] == 1
+    assert len(fake.detail_requests()) == 3
+    # Backoff exponencial con jitter: entre la mitad y el total de 1 s y 2 s
+    # (el servidor de prueba también llama a sleep(0) en sus hilos)
+    first, second = [seconds for seconds in sleeps if seconds > 0]
+    assert 0.5 <= first <= 1 and 1 <= second <= 2
+
+
+def test_rate_limited_requests_pause_until_reset(fake_tiendanube, settings):
+    settings.TIENDANUBE_MAX_RETRIES = 1
+    fake = fake_tiendanube([make_order(1)])
+    fake.queued_responses = [(429, {
+        'x-rate-limit-limit': '40', 'x-rate-limit-remaining': '0', 'x-rate-limit-reset': '200',
+    })]
+    started = time.monotonic()
+
+    order = TiendanubeAPI().get_order_details(1)
+
+    assert order['id'] == 1
+    assert time.monotonic() - started >= 0.19
+
+
+def test_last_error_is_raised_when_retries_run_out(fake_tiendanube):
+    fake = fake_tiendanube([make_order(1)])
+    fake.queued_responses = [(500, {})]
+
+    with pytest.raises(Exception, match='500'):
+        TiendanubeAPI().get_order_details(1)
+
+
+def test_order_details_are_fetched_concurrently(fake_tiendanube):
+    fake = fake_tiendanube([make_order(i) for i in range(1, 21)], delay=0.05, list_without_products=True)
+
+    created, updated, errors, _ = TiendanubeAPI._import_orders({}, concurrency=4)
+
+    assert (created, updated, errors) == (20, 0, 0)
+    assert len(fake.detail_requests()) == 20
+    assert 1 < fake.max_in_flight <= 4
+    assert IncomeLine.objects.count() == 20
+
+
+def test_list_payload_is_reused_without_detail_requests(fake_tiendanube):
+    fake = fake_tiendanube([make_order(i) for i in range(1, 11)])
+
+    created, _, errors, _ = TiendanubeAPI._import_orders({}, concurrency=4)
+
+    assert (created, errors) == (10, 0)
+    assert fake.detail_requests() == []
+    assert Income.objects.get(order_id='3').product_name == 'Remera'
+
+
+def test_list_payload_missing_optional_fields_fetches_details(fake_tiendanube):
+    # map_order_to_income tiene un valor por defecto para payment_details, pero
+    # el listado sin esa clave no alcanza: se piden los detalles
+    fake = fake_tiendanube([make_order(1)], list_without=['payment_details'])
+
+    created, _, errors, _ = TiendanubeAPI._import_orders({}, concurrency=1)
+
+    assert (created, errors) == (1, 0)
+    assert [params['id'] for params in fake.detail_requests()] == ['1']
+    income = Income.objects.get(order_id='1')
+    assert (income.payment_method, income.payment_transaction_id) == ('credit_card', 'tx-1')
+
+
+def test_page_prefetch_stops_at_last_page(fake_tiendanube):
+    fake = fake_tiendanube([make_order(i) for i in range(1, 2 * ORDERS_PER_PAGE + 6)])
+
+    created, _, _, _ = TiendanubeAPI._import_orders({}, concurrency=2)
+
+    assert created == 2 * ORDERS_PER_PAGE + 5
+    # La tercera página viene incompleta: no se pide una cuarta
+    assert [params['page'] for params in fake.list_requests()] == ['1', '2', '3']
+
+
+def at(day, hour=10):
+    return f'2024-03-{day:02d}T{hour:02d}:00:00+0000'
+
+
+def watermark():
+    return TiendanubeSyncState.objects.get(store_id='123').last_updated_at
+
+
+def test_sync_resumes_from_watermark(fake_tiendanube):
+    TiendanubeSyncState.objects.create(store_id='123', last_updated_at=parse_api_datetime(at(5)))
+    fake = fake_tiendanube([make_order(1, at(1)), make_order(2, at(6)), make_order(3, at(8))])
+
+    created, updated, errors = TiendanubeAPI.sync_orders_incrementally()
+
+    assert (created, updated, errors) == (2, 0, 0)
+    assert fake.list_requests()[0]['updated_at_min'].startswith('2024-03-05T10:00:00')
+    assert not Income.objects.filter(order_id='1').exists()
+    assert watermark() == parse_api_datetime(at(8))
+
+
+def test_first_sync_uses_initial_window(fake_tiendanube):
+    fake = fake_tiendanube([make_order(1, at(1))])
+
+    TiendanubeAPI.sync_orders_incrementally(initial_days=30)
+
+    params = fake.list_requests()[0]
+    assert 'updated_at_min' not in params
+    assert 'created_at_min' in params
+    assert watermark() == parse_api_datetime(at(1))
+
+
+def test_failed_page_keeps_watermark(fake_tiendanube):
+    previous = parse_api_datetime(at(1))
+    TiendanubeSyncState.objects.create(store_id='123', last_updated_at=previous)
+    fake = fake_tiendanube([make_order(i, at(2)) for i in range(1, ORDERS_PER_PAGE + 6)])
+    fake.failing_pages.add(2)
+
+    created, _, errors = TiendanubeAPI.sync_orders_incrementally()
+
+    assert (created, errors) == (ORDERS_PER_PAGE, 1)
+    assert watermark() == previous
+
+
+def test_failed_order_holds_watermark_at_its_updated_at(fake_tiendanube):
+    TiendanubeSyncState.objects.create(store_id='123', last_updated_at=parse_api_datetime(at(1)))
+    orders = [make_order(1, at(2)), make_order(2, at(3)), make_order(3, at(4))]
+    fake = fake_tiendanube(orders, list_without_products=True)
+    fake.failing_order_ids.add(2)
+
+    created, _, errors = TiendanubeAPI.sync_orders_incrementally()
+
+    assert (created, errors) == (2, 1)
+    # updated_at_min es inclusivo: la próxima corrida vuelve a pedir el pedido 2
+    assert watermark() == parse_api_datetime(at(3))
+
+
+def test_watermark_does_not_pass_run_start(fake_tiendanube):
+    TiendanubeSyncState.objects.create(store_id='123', last_updated_at=parse_api_datetime(at(1)))
+    fake = fake_tiendanube([make_order(1, at(2)), make_order(2, at(3))])
+    modified_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    def modify_order(page):
+        # El pedido cambia mientras se recorren las páginas
+        fake.orders[2]['updated_at'] = modified_at.strftime('%Y-%m-%dT%H:%M:%S%z')
+
+    fake.on_list_page = modify_order
+    before = datetime.now(timezone.utc)
+
+    TiendanubeAPI.sync_orders_incrementally()
+
+    assert before <= watermark() < modified_at
+    state = TiendanubeSyncState.objects.get(store_id='123')
+    assert watermark() == state.last_run_at
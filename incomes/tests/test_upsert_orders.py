@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+import pytest
+
+from incomes.models import Income, IncomeLine
+from incomes.services.tiendanube_api import map_order_to_income, upsert_orders
+
+from .factories import create_income
+from .fake_tiendanube import make_order
+
+pytestmark = pytest.mark.django_db
+
+
+def test_upsert_keeps_csv_only_fields():
+    create_income(
+        order_id='1', product_name='Antes', seller='Laura', sales_branch='Centro', seller_notes='Regalo'
+    )
+
+    created, updated, failed = upsert_orders([map_order_to_income(make_order(1))])
+
+    assert (created, updated, failed) == (0, 1, set())
+    income = Income.objects.get(order_id='1')
+    assert income.product_name == 'Remera'
+    assert income.total == Decimal('110.00')
+    assert (income.seller, income.sales_branch, income.seller_notes) == ('Laura', 'Centro', 'Regalo')
+
+
+def test_upsert_replaces_lines():
+    order = make_order(1)
+    upsert_orders([map_order_to_income(order)])
+    order['products'] = [
+        {'name': 'Gorra', 'price': '30.00', 'quantity': 1, 'sku': 'GOR-1'},
+        {'name': 'Media', 'price': '10.00', 'quantity': 3, 'sku': None},
+    ]
+
+    upsert_orders([map_order_to_income(order)])
+
+    lines = IncomeLine.objects.filter(income__order_id='1').order_by('name')
+    assert [(line.name, line.sku, line.quantity, line.line_total) for line in lines] == [
+        ('Gorra', 'GOR-1', 1, Decimal('30.00')),
+        ('Media', '', 3, Decimal('30.00')),
+    ]
+
+
+def test_upsert_isolates_orders_the_database_rejects():
+    orders = [make_order(order_id) for order_id in range(1, 8)]
+    orders[4]['currency'] = 'ARSX'
+
+    created, updated, failed = upsert_orders([map_order_to_income(order) for order in orders])
+
+    assert (created, updated, failed) == (6, 0, {'5'})
+    assert not Income.objects.filter(order_id='5').exists()
+    assert not IncomeLine.objects.filter(income__order_id='5').exists()
+    assert IncomeLine.objects.count() == 6
@@ -0,0 +1,147 @@
+import datetime
+import hashlib
+import hmac
+import json
+
+import pytest
+from django.db import DatabaseError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from incomes.models import Income, TiendanubeWebhookEvent
+from incomes.services.webhooks import claim_pending_events, process_pending_events
+
+from .fake_tiendanube import make_order
+
+pytestmark = pytest.mark.django_db
+
+SECRET = 'secreto'
+
+
+@pytest.fixture
+def post_webhook(client, settings):
+    settings.TIENDANUBE_APP_SECRET = SECRET
+
+    def post(payload, secret=SECRET):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return client.post(
+            reverse('tiendanube-webhook'), body, content_type='application/json',
+            headers={'x-linkedstore-hmac-sha256': signature},
+        )
+    return post
+
+
+def create_event(resource_id, event='order/updated'):
+    return TiendanubeWebhookEvent.objects.create(
+        store_id='123', event=event, resource_id=str(resource_id), payload={'id': resource_id}
+    )
+
+
+def test_webhook_with_valid_signature_is_queued(post_webhook):
+    response = post_webhook({'store_id': 123, 'event': 'order/paid', 'id': 42})
+
+    assert response.status_code == 200
+    event = TiendanubeWebhookEvent.objects.get()
+    assert (event.event, event.resource_id, event.store_id) == ('order/paid', '42', '123')
+
+
+def test_webhook_with_invalid_signature_is_rejected(post_webhook):
+    response = post_webhook({'store_id': 123, 'event': 'order/paid', 'id': 42}, secret='otro')
+
+    assert response.status_code == 403
+    assert not TiendanubeWebhookEvent.objects.exists()
+
+
+def test_webhook_without_secret_is_rejected(post_webhook, settings):
+    settings.TIENDANUBE_APP_SECRET = ''
+
+    assert post_webhook({'event': 'order/paid', 'id': 42}, secret='').status_code == 403
+
+
+def test_webhook_ignores_other_events_and_rejects_bad_payloads(post_webhook):
+    assert post_webhook({'event': 'product/created', 'id': 7}).status_code == 200
+    assert post_webhook({'event': 'order/paid'}).status_code == 400
+    assert not TiendanubeWebhookEvent.objects.exists()
+
+
+def test_claimed_events_are_leased_until_they_expire(settings):
+    settings.TIENDANUBE_WEBHOOK_LEASE_SECONDS = 60
+    event = create_event(1)
+
+    assert claim_pending_events(10) == [event]
+    # Otro proceso no los toma mientras dure la reserva
+    assert claim_pending_events(10) == []
+
+    TiendanubeWebhookEvent.objects.update(leased_until=timezone.now() - datetime.timedelta(seconds=1))
+    assert claim_pending_events(10) == [event]
+    event.refresh_from_db()
+    assert event.attempts == 2
+
+
+def test_processor_applies_events_and_records_errors(fake_tiendanube):
+    fake = fake_tiendanube([make_order(1), make_order(2), make_order(3)])
+    fake.failing_order_ids.add(3)
+    for resource_id in (1, 1, 2, 3):
+        create_event(resource_id)
+
+    processed, errors = process_pending_events(batch_size=10, concurrency=2)
+
+    assert (processed, errors) == (3, 1)
+    # Los dos eventos del pedido 1 se resuelven con una sola consulta
+    assert sorted(params['id'] for params in fake.detail_requests()) == ['1', '2', '3']
+    assert sorted(Income.objects.values_list('order_id', flat=True)) == ['1', '2']
+
+    failed = TiendanubeWebhookEvent.objects.get(resource_id='3')
+    assert failed.processed_at is None
+    assert failed.leased_until > timezone.now()
+    assert failed.attempts == 1
+    assert '500' in failed.last_error
+    assert not TiendanubeWebhookEvent.objects.filter(resource_id__in=['1', '2'], processed_at__isnull=True).exists()
+
+
+def test_failed_events_wait_before_being_retried(fake_tiendanube, settings):
+    settings.TIENDANUBE_WEBHOOK_RETRY_SECONDS = 60
+    fake = fake_tiendanube([make_order(1)])
+    fake.failing_order_ids.add(1)
+    create_event(1)
+
+    assert process_pending_events(batch_size=10) == (0, 1)
+    # El evento que acaba de fallar no se reserva en el lote siguiente
+    assert claim_pending_events(10) == []
+    assert process_pending_events(batch_size=10) == (0, 0)
+
+    event = TiendanubeWebhookEvent.objects.get()
+    assert event.attempts == 1
+    assert event.leased_until >= timezone.now() + datetime.timedelta(seconds=50)
+
+    # La espera se duplica con cada intento
+    TiendanubeWebhookEvent.objects.update(leased_until=timezone.now() - datetime.timedelta(seconds=1))
+    assert process_pending_events(batch_size=10) == (0, 1)
+    event.refresh_from_db()
+    assert event.attempts == 2
+    assert event.leased_until >= timezone.now() + datetime.timedelta(seconds=110)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_processor_holds_no_locks_while_fetching(fake_tiendanube):
+    fake = fake_tiendanube([make_order(1)])
+    create_event(1)
+    seen = {}
+
+    def check_locks(order_id):
+        # Corre en el hilo del servidor, con su propia conexión a la base
+        try:
+            with transaction.atomic():
+                event = TiendanubeWebhookEvent.objects.select_for_update(nowait=True).get(resource_id='1')
+                seen['leased'] = event.leased_until is not None
+                seen['locked'] = False
+        except DatabaseError:
+            seen['locked'] = True
+        finally:
+            connection.close()
+
+    fake.on_detail = check_locks
+
+    assert process_pending_events(batch_size=10) == (1, 0)
+    assert seen == {'leased': True, 'locked': False}
@@ -1,3 +1,54 @@
-from django.shortcuts import render
+import hashlib
+import hmac
+import json
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .constants import WebhookEvent
+from .models import TiendanubeWebhookEvent
+
+
+def is_valid_webhook_signature(body, signature):
+    """Verifica la firma HMAC-SHA256 que Tiendanube envía en x-linkedstore-hmac-sha256"""
+    secret = settings.TIENDANUBE_APP_SECRET
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+@csrf_exempt
+@require_POST
+def tiendanube_webhook(request):
+    """
+    Recibe los webhooks de pedidos de Tiendanube
+
+    Solo valida la firma y encola el evento para responder de inmediato; el
+    procesamiento lo hace el comando process_tiendanube_webhooks.
+    """
+    if not settings.TIENDANUBE_WEBHOOKS_ENABLED:
+        raise Http404
+
+    if not is_valid_webhook_signature(request.body, request.headers.get('x-linkedstore-hmac-sha256', '')):
+        return HttpResponseForbidden('Firma inválida')
+
+    try:
+        payload = json.loads(request.body)
+        event = payload['event']
+        resource_id = str(payload['id'])
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest('Contenido inválido')
+
+    # Se confirma cualquier otro evento para que Tiendanube no lo reintente
+    if event in WebhookEvent.values:
+        TiendanubeWebhookEvent.objects.create(
+            store_id=str(payload.get('store_id', '')),
+            event=event,
+            resource_id=resource_id,
+            payload=payload
+        )
+
+    return HttpResponse(status=200)
@@ -2,11 +2,13 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from vlore_back.admin import TrigramSearchMixin
+
 from .models import Supplier
 
 
 @admin.register(Supplier)
-class SupplierAdmin(admin.ModelAdmin):
+class SupplierAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = [
         'business_name',
         'tax_id',
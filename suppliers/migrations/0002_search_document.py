@@ -0,0 +1,44 @@
+# Generated by Django 5.0 on 2026-10-18 11:37
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from vlore_back.search import normalize_search_text
+
+
+def build_search_documents(apps, schema_editor):
+    """Arma el documento de búsqueda de los proveedores existentes"""
+    Supplier = apps.get_model('suppliers', 'Supplier')
+    db_alias = schema_editor.connection.alias
+    suppliers = list(Supplier.objects.using(db_alias))
+    for supplier in suppliers:
+        supplier.search_document = normalize_search_text(
+            supplier.business_name,
+            supplier.commercial_name,
+            supplier.tax_id,
+            supplier.contact_person,
+            supplier.email,
+        )
+    Supplier.objects.using(db_alias).bulk_update(suppliers, ['search_document'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='supplier',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='suppliers_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,10 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from vlore_back.models import TimestampsMixin
+from vlore_back.models import SearchDocumentMixin, TimestampsMixin
 
 
-class Supplier(TimestampsMixin):
+class Supplier(TimestampsMixin, SearchDocumentMixin):
 
     business_name = models.CharField(
         max_length=200,
@@ -91,11 +92,15 @@ class Supplier(TimestampsMixin):
         indexes = [
             models.Index(fields=['business_name']),
             models.Index(fields=['tax_id']),
+            GinIndex(fields=['search_document'], opclasses=['gin_trgm_ops'], name='suppliers_search_trgm'),
         ]
 
     def __str__(self):
         return f"{self.business_name} ({self.tax_id})"
 
+    def get_search_document_values(self):
+        return [self.business_name, self.commercial_name, self.tax_id, self.contact_person, self.email]
+
     def get_full_address(self):
         """
         Método que retorna la dirección completa formateada
@@ -0,0 +1,71 @@
+import pytest
+from django.contrib import admin
+
+from suppliers.models import Supplier
+
+pytestmark = pytest.mark.django_db
+
+
+def create_supplier(business_name, **overrides):
+    data = {
+        'business_name': business_name,
+        'tax_id': f'30-{Supplier.objects.count():08d}-1',
+        'contact_person': 'Contacto',
+        'email': 'proveedor@example.com',
+        'phone': '1100000000',
+        'address': 'Calle 123',
+        'city': 'CABA',
+        'country': 'Argentina',
+    }
+    data.update(overrides)
+    return Supplier.objects.create(**data)
+
+
+def search(term, request=None):
+    model_admin = admin.site._registry[Supplier]
+    queryset, may_have_duplicates = model_admin.get_search_results(request, Supplier.objects.order_by('pk'), term)
+    assert not may_have_duplicates
+    return list(queryset.values_list('business_name', flat=True))
+
+
+def test_search_ignores_accents_and_case():
+    create_supplier('Textiles Pérez', contact_person='José Núñez')
+    create_supplier('Distribuidora Norte')
+
+    assert search('PEREZ') == ['Textiles Pérez']
+    assert search('jose nuñez') == ['Textiles Pérez']
+
+
+def test_search_ranks_rows_with_every_word_first():
+    create_supplier('Textiles Pérez')
+    create_supplier('Textiles del Sur')
+    create_supplier('Ferretería Central')
+
+    # Las que solo se parecen al término también aparecen, pero después
+    assert search('textiles sur') == ['Textiles del Sur', 'Textiles Pérez']
+
+
+def test_search_tolerates_typos_and_ranks_by_similarity():
+    create_supplier('Distribuidora Oeste')
+    create_supplier('Distribuidora Norte')
+    create_supplier('Logística Central')
+
+    assert search('distribuidora nrte') == ['Distribuidora Norte', 'Distribuidora Oeste']
+
+
+def test_search_keeps_user_ordering(rf):
+    create_supplier('Distribuidora Norte')
+    create_supplier('Distribuidora Oeste')
+
+    # Con una columna elegida por el usuario el orden del changelist no se altera
+    request = rf.get('/', {'o': '1', 'q': 'distribuidora nrte'})
+    assert search('distribuidora nrte', request) == ['Distribuidora Norte', 'Distribuidora Oeste']
+
+
+def test_search_document_tracks_changes():
+    supplier = create_supplier('Textiles Pérez')
+
+    supplier.commercial_name = 'La Hilandería'
+    supplier.save()
+
+    assert search('hilanderia') == ['Textiles Pérez']
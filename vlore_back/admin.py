@@ -0,0 +1,254 @@
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ALL_VAR, IS_FACETS_VAR, ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+from .pagination import EstimatedCountPaginator
+from .search import normalize_search_text
+
+
+class TrigramSearchMixin:
+    """
+    Búsqueda del admin sobre el documento normalizado de SearchDocumentMixin
+
+    Reemplaza el OR de icontains sobre search_fields por una búsqueda en
+    search_document (índice GIN de trigramas): una fila coincide si contiene
+    todas las palabras del término, o si se parece lo suficiente a él (para
+    tolerar errores de tipeo). Sin un orden elegido por el usuario, los
+    resultados se ordenan por similitud.
+    """
+
+    search_document_field = 'search_document'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = normalize_search_text(search_term)
+        if not term:
+            return queryset, False
+
+        field = self.search_document_field
+        contains_all = Q()
+        for word in term.split():
+            contains_all &= Q(**{f'{field}__contains': word})
+
+        queryset = queryset.filter(
+            contains_all | Q(**{f'{field}__trigram_word_similar': term})
+        ).annotate(
+            search_rank=TrigramWordSimilarity(term, field)
+        )
+        if request is None or ORDER_VAR not in request.GET:
+            # El changelist ya aplicó su orden: la similitud va primero y el resto desempata
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset, False
+
+
+# Parámetros del cursor de la paginación por keyset
+CURSOR_AFTER_VAR = 'despues'
+CURSOR_BEFORE_VAR = 'antes'
+CURSOR_SEPARATOR = ','
+
+
+class EstimatedCountChangeList(ChangeList):
+    """
+    Changelist que resuelve también el total sin filtros con el paginador del admin
+
+    El ChangeList de Django cuenta el total sin filtros (show_full_result_count)
+    con un COUNT(*) directo; acá pasa por get_paginator, de modo que con
+    EstimatedCountPaginator ambos totales pueden ser estimaciones. Los
+    atributos result_count_estimated y full_result_count_estimated indican
+    a las plantillas qué totales son aproximados.
+    """
+
+    result_count_estimated = False
+    full_result_count_estimated = False
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        result_count = paginator.count
+        self.result_count_estimated = getattr(paginator, 'estimated', False)
+        full_result_count = self.get_full_result_count(request)
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def get_full_result_count(self, request):
+        """Total de filas sin los filtros del admin, o None si el admin no lo muestra"""
+        if not self.model_admin.show_full_result_count:
+            return None
+        paginator = self.model_admin.get_paginator(request, self.root_queryset, self.list_per_page)
+        full_result_count = paginator.count
+        self.full_result_count_estimated = getattr(paginator, 'estimated', False)
+        return full_result_count
+
+
+class KeysetChangeList(EstimatedCountChangeList):
+    """
+    Changelist paginado por keyset (seek) en lugar de LIMIT/OFFSET
+
+    Con el orden por defecto del listado (keyset_ordering del ModelAdmin),
+    cada página se pide a partir de los valores de la última fila de la
+    anterior (?despues=...) o de la primera de la siguiente (?antes=...), de
+    modo que el índice compuesto sobre esos campos resuelve la página 10.000
+    con el mismo costo que la primera. Si el usuario ordena por otra columna
+    o pide "mostrar todo", se usa la paginación numerada de siempre.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # Como PAGE_VAR, el cursor no se arrastra a los links de filtros, orden y facetas
+        for var in (CURSOR_AFTER_VAR, CURSOR_BEFORE_VAR):
+            self.params.pop(var, None)
+            self.filter_params.pop(var, None)
+        # ChangeList.__init__ arma los links de facetas antes de llamar a get_queryset
+        self.remove_facet_link = self.get_query_string(remove=[IS_FACETS_VAR])
+        self.add_facet_link = self.get_query_string({IS_FACETS_VAR: True})
+        return super().get_queryset(request, exclude_parameters)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for var in (CURSOR_AFTER_VAR, CURSOR_BEFORE_VAR):
+            lookup_params.pop(var, None)
+        return lookup_params
+
+    def get_results(self, request):
+        ordering = tuple(self.model_admin.keyset_ordering)
+        self.keyset_active = (
+            ALL_VAR not in request.GET
+            and PAGE_VAR not in request.GET
+            and tuple(self.queryset.query.order_by) == ordering
+        )
+        if not self.keyset_active:
+            return super().get_results(request)
+
+        self.keyset_descending = ordering[0].startswith('-')
+        self.keyset_fields = [field.lstrip('-') for field in ordering]
+        after = request.GET.get(CURSOR_AFTER_VAR)
+        before = request.GET.get(CURSOR_BEFORE_VAR)
+        per_page = self.list_per_page
+
+        queryset = self.queryset
+        has_previous = False
+        if before:
+            # Filas anteriores al cursor, de la más cercana a la más lejana
+            previous_keys = list(
+                queryset.filter(self.keyset_condition(self.parse_cursor(before), forward=False))
+                .reverse()
+                .values_list(*self.keyset_fields)[:per_page + 1]
+            )
+            if len(previous_keys) > per_page:
+                has_previous = True
+                queryset = queryset.filter(self.keyset_condition(previous_keys[per_page - 1], inclusive=True))
+        elif after:
+            has_previous = True
+            queryset = queryset.filter(self.keyset_condition(self.parse_cursor(after)))
+
+        # Una fila de más indica si hay página siguiente; solo se leen las claves
+        keys = list(queryset.values_list(*self.keyset_fields)[:per_page + 1])
+        has_next = len(keys) > per_page
+        keys = keys[:per_page]
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, per_page)
+        result_count = paginator.count
+        self.result_count_estimated = getattr(paginator, 'estimated', False)
+        full_result_count = self.get_full_result_count(request)
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = queryset[:per_page]
+        self.can_show_all = result_count <= self.list_max_show_all
+        self.multi_page = has_previous or has_next
+        self.paginator = paginator
+
+        self.keyset_first_url = self.get_query_string() if has_previous else None
+        self.keyset_previous_url = (
+            self.get_query_string({CURSOR_BEFORE_VAR: self.format_cursor(keys[0])})
+            if has_previous and keys else None
+        )
+        self.keyset_next_url = (
+            self.get_query_string({CURSOR_AFTER_VAR: self.format_cursor(keys[-1])})
+            if has_next else None
+        )
+
+    def keyset_condition(self, values, forward=True, inclusive=False):
+        """
+        Condición de las filas que siguen (o preceden) a `values` en el orden del listado
+
+        Para (date, id) descendente y forward=True equivale a
+        (date, id) < (v1, v2); además de las alternativas por campo incluye
+        date <= v1, que el planificador usa como límite del recorrido del índice.
+        """
+        before = self.keyset_descending == forward
+        strict = 'lt' if before else 'gt'
+        bound = 'lte' if before else 'gte'
+
+        condition = Q()
+        equal = Q()
+        last = len(self.keyset_fields) - 1
+        for index, (field, value) in enumerate(zip(self.keyset_fields, values)):
+            lookup = bound if inclusive and index == last else strict
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return Q(**{f'{self.keyset_fields[0]}__{bound}': values[0]}) & condition
+
+    def parse_cursor(self, cursor):
+        parts = cursor.split(CURSOR_SEPARATOR)
+        if len(parts) != len(self.keyset_fields):
+            raise IncorrectLookupParameters('Cursor de paginación inválido')
+        values = []
+        for name, part in zip(self.keyset_fields, parts):
+            field = self.lookup_opts.pk if name == 'pk' else self.lookup_opts.get_field(name)
+            try:
+                values.append(field.to_python(part))
+            except ValidationError as e:
+                raise IncorrectLookupParameters(e)
+        return values
+
+    def format_cursor(self, values):
+        return CURSOR_SEPARATOR.join(str(value) for value in values)
+
+
+class KeysetPaginationMixin:
+    """
+    Pagina el listado del admin con KeysetChangeList
+
+    keyset_ordering debe ser el orden por defecto del listado tal como lo
+    aplica el changelist (con el pk al final para que sea estable) y tener
+    un índice compuesto con esos campos.
+    """
+
+    keyset_ordering = ('-date', '-pk')
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class EstimatedCountMixin:
+    """
+    Usa totales estimados por PostgreSQL en el listado de tablas grandes
+
+    Ver EstimatedCountPaginator; las plantillas pagination.html y
+    search_form.html del modelo marcan los totales aproximados.
+    """
+
+    paginator = EstimatedCountPaginator
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
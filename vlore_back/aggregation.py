@@ -0,0 +1,124 @@
+from django.db import connections
+from django.db.models import F
+
+
+def grouping_sets_aggregate(queryset, grouping_sets, aggregates):
+    """
+    Calcula varias agrupaciones de un mismo queryset en una sola consulta
+
+    En PostgreSQL arma un único SELECT ... GROUP BY GROUPING SETS sobre las
+    filas filtradas, de modo que el total general y los subtotales por
+    distintos campos salen de una sola lectura de la tabla. En otras bases
+    de datos se resuelve con una consulta por agrupación.
+
+    Args:
+        queryset: Queryset ya filtrado (puede tener anotaciones, p. ej. TruncMonth)
+        grouping_sets: Dict {nombre: tupla de campos}; una tupla vacía es el total general
+        aggregates: Dict {alias: agregado} con agregados simples, p. ej. Sum('amount')
+
+    Returns:
+        Dict {nombre: lista de dicts} con los campos de la agrupación y los
+        alias de los agregados, en el mismo formato que values().annotate()
+
+    Ejemplo:
+        grouping_sets_aggregate(
+            queryset.annotate(month=TruncMonth('date')),
+            {'total': (), 'por_mes': ('month',), 'por_tipo': ('expense_type__name',)},
+            {'total': Sum('amount')},
+        )
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return _aggregate_separately(queryset, grouping_sets, aggregates)
+
+    fields = []
+    for group_fields in grouping_sets.values():
+        fields.extend(field for field in group_fields if field not in fields)
+
+    aggregate_sources = []
+    for alias, aggregate in aggregates.items():
+        expressions = aggregate.get_source_expressions()
+        if len(expressions) != 1 or not hasattr(expressions[0], 'name') or aggregate.filter is not None:
+            raise ValueError(f"El agregado '{alias}' debe ser de un solo campo y sin filter")
+        aggregate_sources.append(expressions[0].name)
+
+    # Las filas filtradas se leen una sola vez, con alias propios para cada columna
+    group_aliases = [f'_group_{index}' for index in range(len(fields))]
+    value_aliases = [f'_value_{index}' for index in range(len(aggregate_sources))]
+    rows = queryset.annotate(
+        **{alias: F(field) for alias, field in zip(group_aliases, fields)},
+        **{alias: F(field) for alias, field in zip(value_aliases, aggregate_sources)},
+    ).values(*group_aliases, *value_aliases).order_by()
+    compiler = rows.query.get_compiler(connection=connection)
+    inner_sql, params = compiler.as_sql()
+
+    # Los valores de grupo pasan por los mismos conversores que en values():
+    # p. ej. TruncMonth sobre una fecha devuelve date y no un datetime en UTC
+    select_by_alias = {alias: expression for expression, _, alias in compiler.select}
+    converters = compiler.get_converters([select_by_alias[alias] for alias in group_aliases])
+
+    quote = connection.ops.quote_name
+    columns = [quote(alias) for alias in group_aliases]
+    aggregate_columns = [
+        '{function}({distinct}{column}) AS {alias}'.format(
+            function=aggregate.function,
+            distinct='DISTINCT ' if getattr(aggregate, 'distinct', False) else '',
+            column=quote(value_alias),
+            alias=quote(alias),
+        )
+        for (alias, aggregate), value_alias in zip(aggregates.items(), value_aliases)
+    ]
+    # Cada conjunto de campos se agrupa una sola vez aunque lo pidan varios nombres:
+    # PostgreSQL repetiría las filas y cada nombre recibiría todas las copias
+    unique_sets = list(dict.fromkeys(frozenset(group_fields) for group_fields in grouping_sets.values()))
+    sets = ', '.join(
+        '({})'.format(', '.join(columns[fields.index(field)] for field in fields if field in group_fields))
+        for group_fields in unique_sets
+    )
+    select = columns + [f"GROUPING({', '.join(columns)}) AS _grouping"] if columns else []
+    sql = (
+        f"SELECT {', '.join(select + aggregate_columns)} "
+        f"FROM ({inner_sql}) AS _rows "
+        f"GROUP BY GROUPING SETS ({sets})"
+    )
+
+    # GROUPING(a, b, ...) devuelve un bit en 1 por cada columna que no agrupa la fila
+    masks = {}
+    for name, group_fields in grouping_sets.items():
+        mask = 0
+        for field in fields:
+            mask = (mask << 1) | (field not in group_fields)
+        masks.setdefault(mask, []).append(name)
+
+    results = {name: [] for name in grouping_sets}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            group_values = list(row[:len(fields)])
+            for index, (field_converters, expression) in converters.items():
+                for converter in field_converters:
+                    group_values[index] = converter(group_values[index], expression, connection)
+            mask = row[len(fields)] if fields else 0
+            values = row[len(fields) + (1 if fields else 0):]
+            for name in masks.get(mask, []):
+                result = {
+                    field: value
+                    for field, value in zip(fields, group_values)
+                    if field in grouping_sets[name]
+                }
+                result.update(zip(aggregates, values))
+                results[name].append(result)
+    return results
+
+
+def _aggregate_separately(queryset, grouping_sets, aggregates):
+    """Resuelve cada agrupación con su propia consulta (bases sin GROUPING SETS)"""
+    results = {}
+    for name, group_fields in grouping_sets.items():
+        if group_fields:
+            results[name] = list(
+                queryset.values(*group_fields).annotate(**aggregates).order_by()
+            )
+        else:
+            results[name] = [queryset.aggregate(**aggregates)]
+    return results
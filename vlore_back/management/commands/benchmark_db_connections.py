@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la latencia de requests simulados abriendo una conexión por request '
+        '(CONN_MAX_AGE=0) contra conexiones persistentes (CONN_MAX_AGE y CONN_HEALTH_CHECKS)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests simulados por modo')
+        parser.add_argument('--queries', type=int, default=5, help='Consultas por request')
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE del modo persistente')
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        original = (settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'])
+        try:
+            results = [
+                ('Una conexión por request', self.run(0, False, options)),
+                ('Persistente sin health check', self.run(options['max_age'], False, options)),
+                ('Persistente con health check', self.run(options['max_age'], True, options)),
+            ]
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = original
+            connection.close()
+
+        for name, timings in results:
+            timings.sort()
+            self.stdout.write(
+                f"{name:<30} media {statistics.mean(timings):6.2f} ms  "
+                f"p50 {timings[len(timings) // 2]:6.2f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95)]:6.2f} ms"
+            )
+
+        speedup = statistics.mean(results[0][1]) / statistics.mean(results[2][1])
+        self.stdout.write(self.style.SUCCESS(f"Persistente con health check: x{speedup:.1f} más rápido"))
+
+    def run(self, max_age, health_checks, options):
+        """
+        Simula requests con las señales que usa el handler de Django: al empezar
+        y al terminar cada request se cierran las conexiones vencidas o rotas
+        """
+        settings_dict = connection.settings_dict
+        settings_dict['CONN_MAX_AGE'] = max_age
+        settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+        connection.close()
+
+        timings = []
+        for _ in range(options['requests']):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                for _ in range(options['queries']):
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
@@ -0,0 +1,244 @@
+"""
+Métricas compartidas entre los workers de uWSGI
+
+Cada métrica ocupa una posición fija dentro de un archivo mapeado en memoria
+(METRICS_DIR). El archivo tiene una franja por worker de uWSGI, indexada por
+uwsgi.worker_id(): cada worker escribe solo en la suya, sin bloqueos entre
+procesos. Los procesos que no son workers (comandos de importación, el
+procesador de webhooks) comparten la franja 0 y la escriben con un lock de
+archivo. El endpoint /metrics suma las franjas y las expone en el formato de
+texto de Prometheus.
+
+Las métricas se declaran una sola vez al importar este módulo, de modo que
+todos los procesos calculan las mismas posiciones. El nombre del archivo
+incluye un hash del esquema: si cambia el conjunto de métricas se empieza
+con un archivo nuevo.
+"""
+import bisect
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+logger = logging.getLogger(__name__)
+
+VALUE = struct.Struct('d')
+
+# Límites de los histogramas de latencia, en segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, label=None):
+        """
+        Args:
+            name: Nombre de la métrica
+            documentation: Descripción (línea # HELP)
+            label: Tupla opcional (nombre, valores posibles); los valores se fijan
+                de antemano porque cada uno ocupa su propia posición en el archivo
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_name, self.label_values = label or (None, (None,))
+        self.offset = sum(metric.size for metric in _registry)
+        _registry.append(self)
+
+    @property
+    def size(self):
+        return self.width * len(self.label_values)
+
+    def series_offset(self, label):
+        try:
+            return self.offset + self.label_values.index(label) * self.width
+        except ValueError:
+            raise ValueError(f"'{label}' no es un valor válido de {self.name}")
+
+    def labels(self, label, extra=''):
+        if self.label_name is None:
+            return f'{{{extra}}}' if extra else ''
+        pairs = f'{self.label_name}="{label}"'
+        return f'{{{pairs},{extra}}}' if extra else f'{{{pairs}}}'
+
+
+class Counter(Metric):
+    kind = 'counter'
+    width = 1
+
+    def inc(self, amount=1, label=None):
+        if amount:
+            _store.add([(self.series_offset(label), amount)])
+
+    def render(self, values):
+        for label in self.label_values:
+            yield f'{self.name}{self.labels(label)} {_format(values[self.series_offset(label)])}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label=None, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # Una posición por límite, otra para +Inf y otra para la suma
+        self.width = len(self.buckets) + 2
+        super().__init__(name, documentation, label)
+
+    def observe(self, value, label=None):
+        offset = self.series_offset(label)
+        bucket = bisect.bisect_left(self.buckets, value)
+        _store.add([(offset + bucket, 1), (offset + len(self.buckets) + 1, value)])
+
+    def render(self, values):
+        for label in self.label_values:
+            offset = self.series_offset(label)
+            cumulative = 0
+            for index, bound in enumerate(self.buckets + ('+Inf',)):
+                cumulative += values[offset + index]
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{self.labels(label, le)} {_format(cumulative)}'
+            yield f'{self.name}_sum{self.labels(label)} {_format(values[offset + len(self.buckets) + 1])}'
+            yield f'{self.name}_count{self.labels(label)} {_format(cumulative)}'
+
+
+def _format(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class SharedStore:
+    """Archivo mapeado en memoria con una franja de valores por worker"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fd = None
+        self.buffer = None
+        self.disabled = False
+
+    @property
+    def slot_size(self):
+        return sum(metric.size for metric in _registry) * VALUE.size
+
+    @property
+    def path(self):
+        schema = ','.join(f'{metric.name}:{metric.size}' for metric in _registry)
+        digest = hashlib.md5(schema.encode()).hexdigest()[:8]
+        return os.path.join(settings.METRICS_DIR, f'metrics-{digest}.mmap')
+
+    def _open(self):
+        size = self.slot_size * settings.METRICS_SLOTS
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o660)
+        # Extender el archivo es idempotente si varios workers lo crean a la vez
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self.buffer = mmap.mmap(fd, size)
+        self.fd = fd
+
+    def _ensure_open(self):
+        if self.buffer is None and not self.disabled:
+            try:
+                self._open()
+            except OSError as e:
+                # Las métricas nunca deben interrumpir un request o una importación
+                self.disabled = True
+                logger.warning(f"Métricas desactivadas: no se pudo abrir {self.path}: {e}")
+        return self.buffer is not None
+
+    def add(self, increments):
+        """Suma cada (posición, cantidad) de `increments` en la franja de este proceso"""
+        if not settings.METRICS_ENABLED:
+            return
+        slot = _worker_slot()
+        base = slot * self.slot_size
+        with self.lock:
+            if not self._ensure_open():
+                return
+            # La franja 0 la comparten los procesos que no son workers de uWSGI
+            if slot == 0:
+                fcntl.lockf(self.fd, fcntl.LOCK_EX, self.slot_size, base)
+            try:
+                for offset, amount in increments:
+                    position = base + offset * VALUE.size
+                    VALUE.pack_into(self.buffer, position, VALUE.unpack_from(self.buffer, position)[0] + amount)
+            finally:
+                if slot == 0:
+                    fcntl.lockf(self.fd, fcntl.LOCK_UN, self.slot_size, base)
+
+    def totals(self):
+        """Valores de todas las métricas sumados entre las franjas"""
+        count = self.slot_size // VALUE.size
+        totals = [0.0] * count
+        with self.lock:
+            if not self._ensure_open():
+                return totals
+            values = struct.Struct(f'{count}d')
+            for slot in range(settings.METRICS_SLOTS):
+                for index, value in enumerate(values.unpack_from(self.buffer, slot * self.slot_size)):
+                    totals[index] += value
+        return totals
+
+
+def _worker_slot():
+    worker_id = uwsgi.worker_id() if uwsgi is not None else 0
+    return worker_id if 0 < worker_id < settings.METRICS_SLOTS else 0
+
+
+def render_metrics():
+    """Texto con todas las métricas en el formato de exposición de Prometheus"""
+    values = _store.totals()
+    lines = []
+    for metric in _registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.render(values))
+    return '\n'.join(lines) + '\n'
+
+
+_store = SharedStore()
+
+HTTP_REQUESTS = Counter(
+    'vlore_http_requests_total',
+    'Requests atendidos, por clase de código de estado',
+    label=('status', ('2xx', '3xx', '4xx', '5xx')),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'vlore_http_request_duration_seconds',
+    'Duración de los requests',
+)
+DB_QUERIES = Counter(
+    'vlore_db_queries_total',
+    'Consultas SQL ejecutadas durante los requests',
+)
+DB_REQUEST_DURATION = Histogram(
+    'vlore_db_request_duration_seconds',
+    'Tiempo de SQL por request',
+)
+IMPORT_ROWS = Counter(
+    'vlore_import_rows_total',
+    'Filas de ingresos importadas (CSV, API y webhooks), por resultado',
+    label=('result', ('created', 'updated', 'error')),
+)
+TIENDANUBE_REQUEST_DURATION = Histogram(
+    'vlore_tiendanube_request_duration_seconds',
+    'Duración de las solicitudes a la API de Tiendanube, por resultado',
+    label=('result', ('ok', 'rate_limited', 'server_error', 'connection_error')),
+)
+
+
+def record_import_rows(created, updated, errors):
+    """Registra el resultado de un lote importado"""
+    IMPORT_ROWS.inc(created, 'created')
+    IMPORT_ROWS.inc(updated, 'updated')
+    IMPORT_ROWS.inc(errors, 'error')
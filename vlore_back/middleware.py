@@ -0,0 +1,195 @@
+import cProfile
+import heapq
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from contextlib import ExitStack
+from itertools import count
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('vlore_back.requests')
+
+
+class QueryStats:
+    """
+    Wrapper de ejecución (connection.execute_wrapper) que mide las consultas SQL
+
+    Acumula la cantidad de consultas y el tiempo total, y conserva las
+    `slowest` más lentas con su SQL.
+    """
+
+    def __init__(self, slowest=3):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = slowest
+        self._statements = []
+        self._order = count()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.slowest:
+                statement = (elapsed, next(self._order), sql)
+                if len(self._statements) < self.slowest:
+                    heapq.heappush(self._statements, statement)
+                else:
+                    heapq.heappushpop(self._statements, statement)
+
+    def slowest_statements(self):
+        """Lista de (segundos, sql) de la consulta más lenta a la más rápida"""
+        return [(elapsed, sql) for elapsed, _, sql in sorted(self._statements, reverse=True)]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Mide las consultas SQL de cada request
+
+    Agrega un encabezado Server-Timing (visible en la pestaña de red del
+    navegador) con el tiempo total y el de base de datos, y escribe una línea
+    JSON en el logger 'vlore_back.requests' con la cantidad de consultas, el
+    tiempo de SQL y las consultas más lentas. Se desactiva con
+    QUERY_INSTRUMENTATION_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats(settings.QUERY_INSTRUMENTATION_SLOWEST)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        server_timing = (
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} consultas", '
+            f'total;dur={duration * 1000:.1f}'
+        )
+        if response.has_header('Server-Timing'):
+            server_timing = f"{response['Server-Timing']}, {server_timing}"
+        response['Server-Timing'] = server_timing
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'db_queries': stats.count,
+            'db_ms': round(stats.duration * 1000, 1),
+            'slowest': [
+                {'ms': round(elapsed * 1000, 1), 'sql': sql[:settings.QUERY_INSTRUMENTATION_SQL_LENGTH]}
+                for elapsed, sql in stats.slowest_statements()
+            ],
+        }))
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Registra en vlore_back.metrics la duración, el código de estado y las
+    consultas SQL de cada request
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats(slowest=0)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - start)
+        metrics.HTTP_REQUESTS.inc(label=f'{min(max(response.status_code // 100, 2), 5)}xx')
+        metrics.DB_QUERIES.inc(stats.count)
+        metrics.DB_REQUEST_DURATION.observe(stats.duration)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Perfila con cProfile los requests lentos o una muestra de ellos
+
+    Solo actúa sobre las rutas que empiezan con algún prefijo de
+    PROFILING_PATH_PREFIXES. Guarda el perfil de un request si entró en la
+    muestra (PROFILING_SAMPLE_RATE) o si tardó más de PROFILING_SLOW_MS; con
+    un umbral configurado todos los requests de esas rutas corren bajo el
+    profiler (y pagan su costo) para poder decidir al final. Por cada perfil
+    se escriben en PROFILING_DIR el .prof (para snakeviz o pstats) y un .txt
+    con las PROFILING_TOP_N funciones de mayor tiempo acumulado.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED or not settings.PROFILING_PATH_PREFIXES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+
+    def __call__(self, request):
+        if not request.path.startswith(tuple(settings.PROFILING_PATH_PREFIXES)):
+            return self.get_response(request)
+
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not sampled and not settings.PROFILING_SLOW_MS:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Ya hay otro profiler activo en este hilo
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if sampled or duration_ms >= settings.PROFILING_SLOW_MS:
+            try:
+                self.save_profile(request, profiler, duration_ms)
+            except OSError as e:
+                logger.warning(f"No se pudo guardar el perfil de {request.path}: {e}")
+        return response
+
+    def save_profile(self, request, profiler, duration_ms):
+        slug = re.sub(r'[^\w-]+', '_', request.path.strip('/'))[:80] or 'root'
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{request.method}-{slug}-{duration_ms:.0f}ms"
+        path = os.path.join(settings.PROFILING_DIR, name)
+
+        profiler.dump_stats(f'{path}.prof')
+        summary = io.StringIO()
+        summary.write(f"{request.method} {request.get_full_path()} {duration_ms:.0f} ms\n\n")
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(settings.PROFILING_TOP_N)
+        with open(f'{path}.txt', 'w') as summary_file:
+            summary_file.write(summary.getvalue())
+        logger.info(json.dumps({
+            'profile': f'{path}.prof',
+            'path': request.path,
+            'duration_ms': round(duration_ms, 1),
+        }))
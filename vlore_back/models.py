@@ -1,5 +1,7 @@
 from django.db import models
 
+from .search import normalize_search_text
+
 
 class TimestampsMixin(models.Model):
     """
@@ -23,3 +25,41 @@ class TimestampsMixin(models.Model):
         Method that checks if deleted_at is not None.
         """
         return self.deleted_at is not None
+
+
+class SearchDocumentMixin(models.Model):
+    """
+    Abstract model que mantiene un documento de búsqueda normalizado
+
+    Cada modelo define get_search_document_values() con los textos a indexar;
+    el documento se recalcula en cada save() y se busca con índices de
+    trigramas (ver vlore_back.admin.TrigramSearchMixin).
+    """
+
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        """
+        Meta class for SearchDocumentMixin
+        """
+
+        abstract = True
+
+    def get_search_document_values(self):
+        """
+        Method that returns the texts to include in the search document.
+        """
+        raise NotImplementedError
+
+    def update_search_document(self):
+        """
+        Method that rebuilds search_document from get_search_document_values().
+        """
+        self.search_document = normalize_search_text(*self.get_search_document_values())
+
+    def save(self, *args, **kwargs):
+        self.update_search_document()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,58 @@
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador que evita el COUNT(*) exacto en tablas grandes
+
+    En PostgreSQL primero pide una estimación al planificador: reltuples de
+    pg_class si el queryset no tiene filtros, o las filas estimadas por
+    EXPLAIN si los tiene. Si la estimación no llega a
+    ADMIN_EXACT_COUNT_THRESHOLD se cuenta de forma exacta; si no, se usa la
+    estimación y `estimated` queda en True para que el listado la marque
+    como aproximada. En otras bases de datos siempre cuenta de forma exacta.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        self.estimated = True
+        return estimate
+
+    def estimate_count(self):
+        """Cantidad de filas estimada por PostgreSQL, o None si no se puede estimar"""
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            if not query.where and not query.distinct and not query.is_sliced:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [connection.ops.quote_name(queryset.model._meta.db_table)]
+                )
+                row = cursor.fetchone()
+                # reltuples es -1 (o 0) mientras la tabla no fue analizada
+                if row and row[0] > 0:
+                    return int(row[0])
+                return None
+
+            sql, params = queryset.order_by().query.get_compiler(connection=connection).as_sql()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
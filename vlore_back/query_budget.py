@@ -0,0 +1,79 @@
+"""
+Presupuestos de consultas SQL para las vistas del admin
+
+Pensado para usarse desde pytest con pytest-django, p. ej.:
+
+    from vlore_back.query_budget import ADMIN_QUERY_BUDGETS, assert_admin_query_budgets
+
+    def test_admin_query_budgets(admin_client):
+        assert_admin_query_budgets(admin_client, ADMIN_QUERY_BUDGETS)
+
+Con datos de prueba en cada modelo (más filas que las de una página no
+cambian la cantidad de consultas salvo que haya un N+1), cualquier vista que
+supere su presupuesto hace fallar el test.
+"""
+from contextlib import ExitStack
+
+from django.contrib import admin
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# Presupuesto de las vistas que no figuran en ADMIN_QUERY_BUDGETS
+DEFAULT_QUERY_BUDGET = 12
+
+# Presupuestos por modelo ('app_label.model_name') y vista ('changelist' o 'change')
+ADMIN_QUERY_BUDGETS = {
+    # Un filtro lateral por campo de IncomeFacetValue más fechas y date_hierarchy
+    'incomes.income': {'changelist': 16, 'change': 10},
+    # Totales del pie (cacheados), filtro por tipo de gasto y tipos del formulario
+    'expenses.expenses': {'changelist': 10, 'change': 10},
+}
+
+
+def admin_views(site=admin.site):
+    """
+    Vistas del admin a medir: el changelist de cada ModelAdmin registrado y
+    el formulario de cambio de su primer objeto, si existe
+
+    Returns:
+        Lista de (modelo, vista, url)
+    """
+    views = []
+    for model in site._registry:
+        info = (site.name, model._meta.app_label, model._meta.model_name)
+        label = model._meta.label_lower
+        views.append((label, 'changelist', reverse('%s:%s_%s_changelist' % info)))
+        obj = model._default_manager.order_by('pk').first()
+        if obj is not None:
+            views.append((label, 'change', reverse('%s:%s_%s_change' % info, args=[obj.pk])))
+    return views
+
+
+def assert_admin_query_budgets(client, budgets=None, site=admin.site, default=DEFAULT_QUERY_BUDGET):
+    """
+    Recorre las vistas de admin_views() y falla si alguna supera su presupuesto
+
+    Args:
+        client: Cliente de pruebas logueado como superusuario (fixture admin_client)
+        budgets: Dict {modelo: {vista: consultas}}; por defecto ADMIN_QUERY_BUDGETS
+        default: Presupuesto de las vistas que no figuran en `budgets`
+    """
+    budgets = ADMIN_QUERY_BUDGETS if budgets is None else budgets
+    failures = []
+    for label, view, url in admin_views(site):
+        budget = budgets.get(label, {}).get(view, default)
+        # Se cuentan las consultas de todas las bases (la réplica incluida)
+        with ExitStack() as stack:
+            contexts = [
+                stack.enter_context(CaptureQueriesContext(connection))
+                for connection in connections.all()
+            ]
+            response = client.get(url)
+        captured = [query for context in contexts for query in context.captured_queries]
+        if response.status_code != 200:
+            failures.append(f"{label} {view}: respuesta {response.status_code} en {url}")
+        elif len(captured) > budget:
+            queries = '\n'.join(f"    {query['sql'][:200]}" for query in captured)
+            failures.append(f"{label} {view}: {len(captured)} consultas (presupuesto {budget})\n{queries}")
+    assert not failures, 'Vistas del admin fuera de presupuesto:\n' + '\n'.join(failures)
@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA_DB = 'replica'
+
+# Cookie que mantiene las lecturas en la base principal después de una escritura
+REPLICA_PIN_COOKIE = 'vlore_primary'
+
+# Apps que se leen siempre de la base principal: la sesión y el usuario se
+# escriben al iniciar sesión y deben verse en el request siguiente
+PRIMARY_ONLY_APPS = {'sessions', 'auth'}
+
+# Vistas del admin que leen de la réplica: listados y reportes. Los
+# formularios de edición leen de la principal para no editar (y volver a
+# guardar) datos atrasados de otro usuario
+REPLICA_VIEW_SUFFIXES = ('_changelist', '_top_products', '_revenue')
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+class ReplicaRouter:
+    """
+    Envía a la réplica las lecturas de los requests marcados por ReplicaRoutingMiddleware
+
+    Las escrituras, la sesión y los usuarios, y cualquier lectura fuera de
+    un request de solo lectura (comandos, importaciones, webhooks,
+    transacciones abiertas en la base principal) van siempre a 'default'.
+    Las migraciones no se restringen: migrate solo corre sobre 'default' salvo
+    que se indique --database, y la base de tests de la réplica necesita el
+    mismo esquema que la principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or not replica_configured():
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        # Dentro de una transacción se lee lo que la misma transacción escribió
+        if connections['default'].in_atomic_block:
+            return None
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', REPLICA_DB}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide por request si las lecturas pueden ir a la réplica
+
+    Solo los GET y HEAD de los listados y reportes del admin
+    (REPLICA_VIEW_SUFFIXES) leen de la réplica. Después de un request que escribe
+    (POST en el admin, p. ej. guardar un gasto) se deja una cookie por
+    DATABASE_REPLICA_PIN_SECONDS para que la redirección y los requests
+    siguientes del mismo usuario lean de la base principal y vean su cambio
+    aunque la réplica venga atrasada.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        read_only = request.method in READ_ONLY_METHODS
+        token = _read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+
+        if not read_only:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # resolver_match recién existe al resolver la vista, después de __call__
+        match = request.resolver_match
+        if (
+            replica_configured()
+            and request.method in READ_ONLY_METHODS
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+            and match.namespace == 'admin'
+            and (match.url_name or '').endswith(REPLICA_VIEW_SUFFIXES)
+        ):
+            _read_from_replica.set(True)
@@ -0,0 +1,18 @@
+import re
+import unicodedata
+
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_search_text(*values):
+    """
+    Normaliza textos para búsqueda: sin acentos, en minúsculas y con espacios simples
+
+    Se usa tanto para armar el documento de búsqueda de cada fila como para
+    el término que escribe el usuario, de modo que "Pérez", "PEREZ" y "perez"
+    coincidan.
+    """
+    text = ' '.join(str(value) for value in values if value)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _SPACES.sub(' ', text).strip().lower()
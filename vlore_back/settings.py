@@ -52,10 +52,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party apps
     'rest_framework',
     'rangefilter',
     # Local apps
+    'vlore_back',
     'expenses',
     'incomes',
     'products',
@@ -63,6 +65,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'vlore_back.middleware.ProfilingMiddleware',
+    'vlore_back.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +75,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'vlore_back.middleware.QueryInstrumentationMiddleware',
+    'vlore_back.middleware.MetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'vlore_back.urls'
@@ -128,6 +134,90 @@ else:
         },
     }
 
+# Réplica de solo lectura opcional: con DB_REPLICA_HOST, los GET del admin
+# (listados, totales y reportes) leen de ella mediante vlore_back.routers. El
+# resto de los datos de conexión se toman de la base principal si no se indican.
+# En los tests la réplica es una base aparte (test_<nombre>_replica), de modo
+# que los tests de vlore_back.routers distinguen de qué base leyó cada request
+DB_REPLICA_HOST = env("DB_REPLICA_HOST", "")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": env("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "NAME": env("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "USER": env("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": env("DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]),
+    }
+    DATABASES["replica"]["TEST"] = {"NAME": f"test_{DATABASES['replica']['NAME']}_replica"}
+DATABASE_ROUTERS = ["vlore_back.routers.ReplicaRouter"]
+# Segundos que un usuario sigue leyendo de la base principal después de escribir
+DATABASE_REPLICA_PIN_SECONDS = int(env("DATABASE_REPLICA_PIN_SECONDS", 10))
+
+# Conexiones persistentes: cada worker de uWSGI conserva su conexión entre
+# requests durante DB_CONN_MAX_AGE segundos (0 abre una por request, "None" no
+# la vence) y CONN_HEALTH_CHECKS la verifica antes de reutilizarla. Django 5.0
+# con psycopg2 no tiene el pool de psycopg 3 (OPTIONS["pool"], Django 5.1+): el
+# "pool" queda en una conexión por hilo de uWSGI. El tamaño se fija en vlore.ini
+# (processes x threads) contra max_connections de Postgres.
+DB_CONN_MAX_AGE = str(env("DB_CONN_MAX_AGE", 600))
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = None if DB_CONN_MAX_AGE.lower() == "none" else int(DB_CONN_MAX_AGE)
+    database["CONN_HEALTH_CHECKS"] = str(env("DB_CONN_HEALTH_CHECKS", True)).lower() in ["true"]
+
+# Caché en disco: la comparten todos los procesos de uWSGI del mismo servidor
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env("CACHE_DIR", os.path.join(BASE_DIR, ".cache")),
+    },
+}
+
+# Segundos que se conservan los totales cacheados del listado de gastos
+EXPENSES_STATS_CACHE_TIMEOUT = int(env("EXPENSES_STATS_CACHE_TIMEOUT", 3600))
+
+# Desde esta cantidad estimada de filas los listados del admin muestran el
+# total estimado por PostgreSQL en lugar de hacer un COUNT(*) exacto
+ADMIN_EXACT_COUNT_THRESHOLD = int(env("ADMIN_EXACT_COUNT_THRESHOLD", 50000))
+
+# Medición de consultas SQL por request (encabezado Server-Timing y log JSON
+# en 'vlore_back.requests'): consultas más lentas a informar y largo de su SQL
+QUERY_INSTRUMENTATION_ENABLED = str(env("QUERY_INSTRUMENTATION_ENABLED", True)).lower() in ["true"]
+QUERY_INSTRUMENTATION_SLOWEST = int(env("QUERY_INSTRUMENTATION_SLOWEST", 3))
+QUERY_INSTRUMENTATION_SQL_LENGTH = int(env("QUERY_INSTRUMENTATION_SQL_LENGTH", 500))
+
+# Perfiles de cProfile de requests lentos o de una muestra (desactivado por
+# defecto). Prefijos separados por coma, p. ej. "/panel/,/webhooks/"
+PROFILING_ENABLED = str(env("PROFILING_ENABLED", False)).lower() in ["true"]
+PROFILING_PATH_PREFIXES = [prefix for prefix in env("PROFILING_PATH_PREFIXES", "/panel/").split(",") if prefix]
+PROFILING_SAMPLE_RATE = float(env("PROFILING_SAMPLE_RATE", 0))  # Fracción de requests, 0 a 1
+PROFILING_SLOW_MS = int(env("PROFILING_SLOW_MS", 0))  # 0 desactiva el umbral
+PROFILING_TOP_N = int(env("PROFILING_TOP_N", 40))
+PROFILING_DIR = env("PROFILING_DIR", os.path.join(BASE_DIR, ".profiles"))
+
+# Métricas compartidas entre los workers de uWSGI (archivo mapeado en memoria).
+# METRICS_SLOTS debe superar el máximo de workers (processes en vlore.ini);
+# /metrics solo responde con "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = str(env("METRICS_ENABLED", True)).lower() in ["true"]
+METRICS_DIR = env("METRICS_DIR", os.path.join(BASE_DIR, ".metrics"))
+METRICS_SLOTS = int(env("METRICS_SLOTS", 32))
+METRICS_TOKEN = env("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "vlore_back.requests": {
+            "handlers": ["console"],
+            "level": env("REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -182,7 +272,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TIENDANUBE_STORE_ID = 'tu_store_id'  # Reemplazar con tu ID de tienda
 TIENDANUBE_ACCESS_TOKEN = 'tu_access_token'  # Reemplazar con tu token de acceso
+# URL base de la API (se puede apuntar a un servidor falso local para pruebas)
+TIENDANUBE_API_URL = env('TIENDANUBE_API_URL', 'https://api.tiendanube.com/v1')
+# Solicitudes simultáneas a la API al importar pedidos
+TIENDANUBE_CONCURRENCY = int(env('TIENDANUBE_CONCURRENCY', 8))
+# Pedidos que se acumulan antes de escribirlos con un único upsert
+TIENDANUBE_UPSERT_BATCH_SIZE = int(env('TIENDANUBE_UPSERT_BATCH_SIZE', 200))
+# Conexiones keep-alive del pool HTTP (al menos una por solicitud simultánea)
+TIENDANUBE_POOL_SIZE = int(env('TIENDANUBE_POOL_SIZE', TIENDANUBE_CONCURRENCY + 2))
+# Límite de la API (leaky bucket): ráfaga y solicitudes por segundo; se ajusta
+# con los encabezados x-rate-limit-* de cada respuesta
+TIENDANUBE_RATE_LIMIT_BURST = int(env('TIENDANUBE_RATE_LIMIT_BURST', 40))
+TIENDANUBE_RATE_LIMIT_PER_SECOND = float(env('TIENDANUBE_RATE_LIMIT_PER_SECOND', 2))
+TIENDANUBE_MAX_RETRIES = int(env('TIENDANUBE_MAX_RETRIES', 5))
+TIENDANUBE_TIMEOUT = int(env('TIENDANUBE_TIMEOUT', 30))  # Segundos por solicitud
 
 # Configuraciones adicionales para la integración
 TIENDANUBE_SYNC_INTERVAL = 30  # Intervalo en minutos para sincronización automática
-TIENDANUBE_WEBHOOKS_ENABLED = True  # Habilitar webhooks para actualizaciones en tiempo real
\ No newline at end of file
+TIENDANUBE_WEBHOOKS_ENABLED = True  # Habilitar webhooks para actualizaciones en tiempo real
+# Secreto de la aplicación con el que Tiendanube firma los webhooks (HMAC-SHA256)
+TIENDANUBE_APP_SECRET = env('TIENDANUBE_APP_SECRET', '')
+# Eventos de webhook que se procesan por lote y reintentos antes de descartarlos
+TIENDANUBE_WEBHOOK_BATCH_SIZE = int(env('TIENDANUBE_WEBHOOK_BATCH_SIZE', 100))
+TIENDANUBE_WEBHOOK_MAX_ATTEMPTS = int(env('TIENDANUBE_WEBHOOK_MAX_ATTEMPTS', 5))
+# Segundos que un lote queda reservado para el proceso que lo tomó: si el
+# proceso muere sin terminarlo, otro lo retoma al vencer la reserva
+TIENDANUBE_WEBHOOK_LEASE_SECONDS = int(env('TIENDANUBE_WEBHOOK_LEASE_SECONDS', 300))
+# Espera inicial antes de reintentar un evento que falló; se duplica en cada intento
+TIENDANUBE_WEBHOOK_RETRY_SECONDS = int(env('TIENDANUBE_WEBHOOK_RETRY_SECONDS', 60))
\ No newline at end of file
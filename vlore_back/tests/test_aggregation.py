@@ -0,0 +1,83 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from expenses.models import Expenses, ExpenseType
+from vlore_back.aggregation import _aggregate_separately, grouping_sets_aggregate
+
+pytestmark = pytest.mark.django_db
+
+GROUPING_SETS = {
+    'total': (),
+    'por_mes': ('month',),
+    'por_tipo': ('expense_type__name',),
+    'por_mes_y_fijo': ('month', 'is_fixed'),
+    # Dos nombres con los mismos campos reciben las mismas filas
+    'por_tipo_otra_vez': ('expense_type__name',),
+}
+
+
+@pytest.fixture
+def expenses():
+    types = [
+        ExpenseType.objects.get_or_create(code=code, defaults={'name': name})[0]
+        for code, name in [('ALQ', 'Alquiler'), ('LUZ', 'Luz'), ('PUB', 'Publicidad')]
+    ]
+    for index in range(24):
+        Expenses.objects.create(
+            date=datetime.date(2024, index % 4 + 1, index % 28 + 1),
+            expense_type=types[index % 3],
+            amount=Decimal('10.50') * (index + 1),
+            is_fixed=index < 12,
+        )
+
+
+def normalize(results):
+    return {name: sorted(rows, key=lambda row: repr(sorted(row.items()))) for name, rows in results.items()}
+
+
+def queryset():
+    return Expenses.objects.annotate(month=TruncMonth('date'))
+
+
+def test_grouping_sets_match_separate_queries(expenses, django_assert_num_queries):
+    aggregates = {'total': Sum('amount'), 'cantidad': Count('id'), 'mayor': Max('amount')}
+
+    with django_assert_num_queries(1):
+        results = grouping_sets_aggregate(queryset(), GROUPING_SETS, aggregates)
+
+    assert normalize(results) == normalize(_aggregate_separately(queryset(), GROUPING_SETS, aggregates))
+    assert results['total'] == [{'total': Decimal('3150.00'), 'cantidad': 24, 'mayor': Decimal('252.00')}]
+    assert len(results['por_mes_y_fijo']) == 8
+
+
+def test_grouping_sets_respect_filters_and_distinct(expenses):
+    filtered = queryset().filter(is_fixed=True, date__month__lte=2)
+    aggregates = {'tipos': Count('expense_type', distinct=True)}
+    sets = {'total': (), 'por_mes': ('month',)}
+
+    results = grouping_sets_aggregate(filtered, sets, aggregates)
+
+    assert normalize(results) == normalize(_aggregate_separately(filtered, sets, aggregates))
+
+
+def test_grouping_sets_on_empty_queryset():
+    sets = {'total': (), 'por_tipo': ('expense_type__name',)}
+
+    results = grouping_sets_aggregate(queryset(), sets, {'total': Sum('amount')})
+
+    assert results == {'total': [{'total': None}], 'por_tipo': []}
+
+
+def test_grouping_sets_with_only_the_total(expenses):
+    results = grouping_sets_aggregate(queryset(), {'total': ()}, {'total': Sum('amount')})
+
+    assert results == {'total': [{'total': Decimal('3150.00')}]}
+
+
+def test_grouping_sets_reject_filtered_aggregates():
+    with pytest.raises(ValueError):
+        grouping_sets_aggregate(queryset(), {'total': ()}, {'fijos': Sum('amount', filter=Q(is_fixed=True))})
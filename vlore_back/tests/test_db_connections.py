@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+CONNECTION_ENV = ('DB_CONN_MAX_AGE', 'DB_CONN_HEALTH_CHECKS', 'DB_REPLICA_HOST')
+
+SETTINGS_SNIPPET = (
+    'import json; from vlore_back import settings as s; '
+    'print(json.dumps({alias: [db["CONN_MAX_AGE"], db["CONN_HEALTH_CHECKS"]] for alias, db in s.DATABASES.items()}))'
+)
+
+
+def load_databases(**env):
+    """Valores de conexión de DATABASES al cargar settings.py con las variables indicadas"""
+    base_env = {key: value for key, value in os.environ.items() if key not in CONNECTION_ENV}
+    result = subprocess.run(
+        [sys.executable, '-c', SETTINGS_SNIPPET],
+        env={**base_env, **env},
+        cwd=django_settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize('env, expected', [
+    ({}, [600, True]),
+    ({'DB_CONN_MAX_AGE': '0'}, [0, True]),
+    ({'DB_CONN_MAX_AGE': 'None'}, [None, True]),
+    ({'DB_CONN_MAX_AGE': '60', 'DB_CONN_HEALTH_CHECKS': 'false'}, [60, False]),
+])
+def test_every_database_gets_connection_settings(env, expected):
+    databases = load_databases(DB_REPLICA_HOST='replica.internal', **env)
+
+    assert databases == {'default': expected, 'replica': expected}
+
+
+def simulate_request(query='SELECT pg_backend_pid()'):
+    """Un request como lo ve Django: señales de inicio y fin alrededor de una consulta"""
+    request_started.send(sender=None)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchone()[0]
+    finally:
+        request_finished.send(sender=None)
+
+
+@pytest.fixture
+def persistent_connection(monkeypatch):
+    def configure(max_age, health_checks):
+        connection.close()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', max_age)
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', health_checks)
+    yield configure
+    connection.close()
+
+
+def terminate_backend(pid):
+    other = connection.get_new_connection(connection.get_connection_params())
+    try:
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+    finally:
+        other.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connection_is_reused_across_requests(persistent_connection):
+    persistent_connection(600, True)
+
+    assert simulate_request() == simulate_request() == simulate_request()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connection_is_closed_after_each_request_without_max_age(persistent_connection):
+    persistent_connection(0, False)
+
+    assert simulate_request() != simulate_request()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_health_check_replaces_a_dropped_connection(persistent_connection):
+    persistent_connection(600, True)
+    pid = simulate_request()
+
+    # El servidor corta la conexión entre dos requests (reinicio, timeout, failover)
+    terminate_backend(pid)
+
+    new_pid = simulate_request()
+    assert new_pid != pid
+    assert simulate_request() == new_pid
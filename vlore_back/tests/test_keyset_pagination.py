@@ -0,0 +1,96 @@
+import datetime
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.urls import reverse
+
+from incomes.admin import IncomeAdmin
+from incomes.tests.factories import create_income
+from vlore_back.admin import CURSOR_AFTER_VAR, CURSOR_BEFORE_VAR
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse('admin:incomes_income_changelist')
+
+
+@pytest.fixture
+def incomes(monkeypatch):
+    monkeypatch.setattr(IncomeAdmin, 'list_per_page', 3)
+    # Fechas repetidas: el pk desempata dentro del mismo día
+    dates = [datetime.date(2024, 1, day) for day in (1, 2, 2, 2, 3, 5, 5, 6, 7)]
+    incomes = [create_income(date=date) for date in dates]
+    return [income.pk for income in sorted(incomes, key=lambda income: (income.date, income.pk), reverse=True)]
+
+
+def get_page(admin_client, query=''):
+    response = admin_client.get(URL + query)
+    assert response.status_code == 200
+    return response.context['cl']
+
+
+def page_ids(changelist):
+    return [income.pk for income in changelist.result_list]
+
+
+def test_next_and_previous_cursors_walk_every_page(admin_client, incomes):
+    changelist = get_page(admin_client)
+    assert changelist.keyset_active
+    assert changelist.keyset_first_url is None
+    assert changelist.keyset_previous_url is None
+
+    pages = [page_ids(changelist)]
+    while changelist.keyset_next_url:
+        changelist = get_page(admin_client, changelist.keyset_next_url)
+        pages.append(page_ids(changelist))
+
+    # 9 filas de a 3: la última página completa no ofrece una siguiente vacía
+    assert pages == [incomes[0:3], incomes[3:6], incomes[6:9]]
+    assert changelist.keyset_first_url == '?'
+
+    backwards = []
+    while changelist.keyset_previous_url:
+        changelist = get_page(admin_client, changelist.keyset_previous_url)
+        backwards.append(page_ids(changelist))
+
+    assert backwards == [incomes[3:6], incomes[0:3]]
+    # Al volver a la primera página ya no hay anterior
+    assert changelist.keyset_first_url is None
+    assert changelist.keyset_next_url is not None
+
+
+def test_previous_from_second_page_returns_full_first_page(admin_client, incomes):
+    first = get_page(admin_client)
+    second = get_page(admin_client, first.keyset_next_url)
+
+    # Desde la segunda página, "anterior" lleva exactamente a la primera
+    assert page_ids(get_page(admin_client, second.keyset_previous_url)) == incomes[0:3]
+
+
+def test_cursor_is_dropped_from_filter_sort_and_facet_links(admin_client, incomes):
+    first = get_page(admin_client)
+    changelist = get_page(admin_client, first.keyset_next_url + '&_facets=1')
+
+    links = [
+        changelist.add_facet_link,
+        changelist.remove_facet_link,
+        changelist.get_query_string({'o': '2'}),
+        changelist.keyset_first_url,
+    ]
+    for link in links:
+        params = parse_qs(urlparse(link).query)
+        assert CURSOR_AFTER_VAR not in params and CURSOR_BEFORE_VAR not in params
+    assert 'despues' not in changelist.params
+
+
+def test_other_orderings_use_numbered_pages(admin_client, incomes):
+    changelist = get_page(admin_client, '?o=1')
+
+    assert not changelist.keyset_active
+    assert changelist.paginator.num_pages == 3
+
+
+def test_invalid_cursor_redirects_with_error_flag(admin_client, incomes):
+    response = admin_client.get(URL, {CURSOR_AFTER_VAR: 'no-es-una-fecha,1'})
+
+    assert response.status_code == 302
+    assert response.url.endswith('?e=1')
@@ -0,0 +1,128 @@
+import multiprocessing
+
+import pytest
+from django.urls import reverse
+
+from vlore_back import metrics
+from vlore_back.metrics import SharedStore, render_metrics
+
+
+class FakeUwsgi:
+    def __init__(self, worker_id):
+        self.id = worker_id
+
+    def worker_id(self):
+        return self.id
+
+
+@pytest.fixture
+def store(settings, tmp_path, monkeypatch):
+    """Archivo de métricas vacío, propio del test"""
+    settings.METRICS_DIR = str(tmp_path / 'metricas')
+    settings.METRICS_SLOTS = 4
+    settings.METRICS_ENABLED = True
+    store = SharedStore()
+    monkeypatch.setattr(metrics, '_store', store)
+    monkeypatch.setattr(metrics, 'uwsgi', None)
+    return store
+
+
+def series(text, name):
+    for line in text.splitlines():
+        if line.startswith(f'{name} '):
+            return line.split()[-1]
+    raise AssertionError(f'{name} no está en la salida')
+
+
+def run_in_processes(target, args_list):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def record_as_worker(worker_id, times):
+    metrics.uwsgi = FakeUwsgi(worker_id) if worker_id is not None else None
+    for _ in range(times):
+        metrics.HTTP_REQUESTS.inc(label='2xx')
+        metrics.HTTP_REQUEST_DURATION.observe(0.02)
+
+
+def test_values_from_every_worker_are_summed(store):
+    run_in_processes(record_as_worker, [(1, 10), (2, 20), (3, 30)])
+
+    text = render_metrics()
+
+    assert series(text, 'vlore_http_requests_total{status="2xx"}') == '60'
+    assert series(text, 'vlore_http_request_duration_seconds_count') == '60'
+    # Cada worker escribió solo en su franja
+    position = metrics.HTTP_REQUESTS.offset * metrics.VALUE.size
+    slots = [
+        metrics.VALUE.unpack_from(store.buffer, slot * store.slot_size + position)[0]
+        for slot in range(4)
+    ]
+    assert slots == [0, 10, 20, 30]
+
+
+def test_processes_outside_uwsgi_share_slot_zero_safely(store):
+    # Comandos de importación concurrentes: la franja 0 se escribe con lock de archivo
+    run_in_processes(record_as_worker, [(None, 500)] * 4)
+
+    assert series(render_metrics(), 'vlore_http_requests_total{status="2xx"}') == '2000'
+
+
+@pytest.mark.parametrize('worker_id, slot', [(1, 1), (3, 3), (4, 0), (0, 0)])
+def test_worker_slot(store, monkeypatch, worker_id, slot):
+    monkeypatch.setattr(metrics, 'uwsgi', FakeUwsgi(worker_id))
+
+    assert metrics._worker_slot() == slot
+
+
+def test_histogram_renders_cumulative_buckets(store):
+    for value in (0.004, 0.02, 0.02, 3, 100):
+        metrics.DB_REQUEST_DURATION.observe(value)
+
+    text = render_metrics()
+
+    assert series(text, 'vlore_db_request_duration_seconds_bucket{le="0.005"}') == '1'
+    assert series(text, 'vlore_db_request_duration_seconds_bucket{le="0.025"}') == '3'
+    assert series(text, 'vlore_db_request_duration_seconds_bucket{le="5"}') == '4'
+    assert series(text, 'vlore_db_request_duration_seconds_bucket{le="+Inf"}') == '5'
+    assert series(text, 'vlore_db_request_duration_seconds_count') == '5'
+    assert float(series(text, 'vlore_db_request_duration_seconds_sum')) == pytest.approx(103.044)
+    assert '# TYPE vlore_db_request_duration_seconds histogram' in text
+
+
+def test_unknown_label_is_rejected(store):
+    with pytest.raises(ValueError):
+        metrics.IMPORT_ROWS.inc(1, 'skipped')
+
+
+def test_unwritable_directory_disables_metrics(store, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / 'archivo')
+    (tmp_path / 'archivo').write_text('')
+
+    metrics.record_import_rows(1, 0, 0)
+
+    assert store.disabled
+    assert series(render_metrics(), 'vlore_import_rows_total{result="created"}') == '0'
+
+
+@pytest.mark.parametrize('token, authorization, status', [
+    ('', 'Bearer secreto', 404),
+    ('secreto', '', 403),
+    ('secreto', 'Bearer otro', 403),
+    ('secreto', 'Bearer secreto', 200),
+])
+def test_metrics_endpoint_requires_token(client, store, settings, token, authorization, status):
+    settings.METRICS_TOKEN = token
+    metrics.record_import_rows(2, 1, 0)
+
+    response = client.get(reverse('metrics'), HTTP_AUTHORIZATION=authorization)
+
+    assert response.status_code == status
+    if status == 200:
+        assert series(response.content.decode(), 'vlore_import_rows_total{result="created"}') == '2'
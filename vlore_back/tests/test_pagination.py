@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from expenses.models import Expenses
+from expenses.tests.factories import create_expense
+from vlore_back.pagination import EstimatedCountPaginator
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def expenses():
+    for index in range(12):
+        create_expense(is_fixed=index % 3 == 0)
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE expenses_expenses')
+
+
+def count_queries(queries):
+    return [query for query in queries if 'COUNT(' in query['sql'].upper()]
+
+
+def test_small_tables_are_counted_exactly(settings, expenses):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 1000
+    analyze()
+    paginator = EstimatedCountPaginator(Expenses.objects.filter(is_fixed=True), 10)
+
+    assert paginator.count == 4
+    assert not paginator.estimated
+
+
+def test_table_without_statistics_falls_back_to_exact_count(settings):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 1
+    # ANALYZE no es transaccional: con la tabla vacía reltuples queda en 0
+    analyze()
+    for _ in range(12):
+        create_expense()
+    paginator = EstimatedCountPaginator(Expenses.objects.all(), 10)
+
+    assert paginator.count == 12
+    assert not paginator.estimated
+
+
+def test_large_unfiltered_table_uses_reltuples(settings, expenses):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 1
+    analyze()
+    paginator = EstimatedCountPaginator(Expenses.objects.all(), 10)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert paginator.count == 12
+    assert paginator.estimated
+    assert not count_queries(queries)
+
+
+def test_large_filtered_table_uses_the_plan_estimate(settings, expenses):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 1
+    analyze()
+    paginator = EstimatedCountPaginator(Expenses.objects.filter(is_fixed=True), 10)
+
+    with CaptureQueriesContext(connection) as queries:
+        count = paginator.count
+    assert paginator.estimated
+    assert count > 0
+    assert not count_queries(queries)
+    assert queries[0]['sql'].startswith('EXPLAIN')
+
+
+def test_changelist_marks_estimated_totals(admin_client, settings, expenses):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 1
+    analyze()
+
+    response = admin_client.get(reverse('admin:expenses_expenses_changelist'), {'is_fixed__exact': '1'})
+
+    changelist = response.context['cl']
+    assert changelist.result_count_estimated
+    assert changelist.full_result_count_estimated
+    assert changelist.full_result_count == 12
+    assert '≈' in response.content.decode()
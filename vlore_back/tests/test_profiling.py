@@ -0,0 +1,93 @@
+import os
+import pstats
+import time
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from vlore_back.middleware import ProfilingMiddleware
+
+
+def slow_view(request):
+    time.sleep(0.03)
+    return HttpResponse('ok')
+
+
+def fast_view(request):
+    return HttpResponse('ok')
+
+
+@pytest.fixture
+def profiling(settings, tmp_path, monkeypatch):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_PATH_PREFIXES = ['/panel/']
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_SLOW_MS = 0
+    settings.PROFILING_TOP_N = 10
+    settings.PROFILING_DIR = str(tmp_path / 'perfiles')
+    # Sorteo de la muestra fijo: entra si PROFILING_SAMPLE_RATE > 0.5
+    monkeypatch.setattr('vlore_back.middleware.random.random', lambda: 0.5)
+    return settings
+
+
+def saved_profiles(settings):
+    return sorted(os.listdir(settings.PROFILING_DIR))
+
+
+def test_disabled_middleware_is_not_used(settings):
+    settings.PROFILING_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(fast_view)
+
+
+def test_sampled_request_writes_profile_and_summary(rf, profiling):
+    profiling.PROFILING_SAMPLE_RATE = 0.6
+
+    response = ProfilingMiddleware(slow_view)(rf.get('/panel/incomes/income/', {'q': 'remera'}))
+
+    assert response.status_code == 200
+    prof, txt = saved_profiles(profiling)
+    assert '-GET-panel_incomes_income-' in prof and prof.endswith('ms.prof')
+    assert txt == prof[:-len('.prof')] + '.txt'
+    stats = pstats.Stats(os.path.join(profiling.PROFILING_DIR, prof))
+    assert any(function == 'slow_view' for _, _, function in stats.stats)
+    with open(os.path.join(profiling.PROFILING_DIR, txt)) as summary:
+        assert summary.readline().startswith('GET /panel/incomes/income/?q=remera ')
+
+
+def test_requests_outside_the_sample_are_not_profiled(rf, profiling):
+    profiling.PROFILING_SAMPLE_RATE = 0.4
+
+    ProfilingMiddleware(slow_view)(rf.get('/panel/'))
+
+    assert saved_profiles(profiling) == []
+
+
+@pytest.mark.parametrize('slow_ms, view, saved', [(10, slow_view, 2), (1000, slow_view, 0), (10, fast_view, 0)])
+def test_slow_requests_are_profiled(rf, profiling, slow_ms, view, saved):
+    profiling.PROFILING_SLOW_MS = slow_ms
+
+    ProfilingMiddleware(view)(rf.get('/panel/'))
+
+    assert len(saved_profiles(profiling)) == saved
+
+
+def test_other_paths_are_ignored(rf, profiling):
+    profiling.PROFILING_SAMPLE_RATE = 1
+
+    ProfilingMiddleware(slow_view)(rf.get('/metrics'))
+
+    assert saved_profiles(profiling) == []
+
+
+def test_save_errors_do_not_break_the_response(rf, profiling, caplog):
+    profiling.PROFILING_SAMPLE_RATE = 1
+    middleware = ProfilingMiddleware(fast_view)
+    os.rmdir(profiling.PROFILING_DIR)
+
+    response = middleware(rf.get('/panel/'))
+
+    assert response.status_code == 200
+    assert 'No se pudo guardar el perfil de /panel/' in caplog.text
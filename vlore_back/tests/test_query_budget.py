@@ -0,0 +1,52 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from expenses.models import Expenses, ExpenseType
+from incomes.models import TiendanubeSyncState, TiendanubeWebhookEvent
+from incomes.services.facets import refresh_income_facets
+from incomes.services.rollup import refresh_income_rollup
+from incomes.tests.factories import create_income
+from suppliers.models import Supplier
+from vlore_back.query_budget import assert_admin_query_budgets
+from vlore_back.routers import REPLICA_PIN_COOKIE
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def seeded_data():
+    """Varias filas por modelo registrado en el admin, para que un N+1 se note"""
+    dates = [datetime.date(2024, 1, day) for day in (5, 6, 7, 8)]
+    for index, date in enumerate(dates):
+        create_income(date=date, channel='Tienda online', country='Argentina', sku=f'SKU-{index}')
+    refresh_income_rollup(dates)
+    refresh_income_facets()
+
+    TiendanubeSyncState.objects.create(store_id='123')
+    for resource_id in ('1', '2'):
+        TiendanubeWebhookEvent.objects.create(
+            store_id='123', event='order/paid', resource_id=resource_id, payload={'id': resource_id}
+        )
+
+    for code, name in (('ALQ', 'Alquiler'), ('LUZ', 'Luz'), ('PUB', 'Publicidad')):
+        expense_type, _ = ExpenseType.objects.get_or_create(code=code, defaults={'name': name})
+        for month in (1, 2):
+            Expenses.objects.create(
+                date=datetime.date(2024, month, 10), expense_type=expense_type,
+                amount=Decimal('150.00'), is_fixed=True,
+            )
+
+    for index in range(3):
+        Supplier.objects.create(
+            business_name=f'Proveedor {index}', tax_id=f'30-0000000{index}-1',
+            contact_person='Contacto', email=f'proveedor{index}@example.com', phone='1100000000',
+            address='Calle 123', city='CABA', country='Argentina',
+        )
+
+
+def test_admin_query_budgets(admin_client, seeded_data):
+    # Con réplica configurada los datos de prueba solo están en la base principal
+    admin_client.cookies[REPLICA_PIN_COOKIE] = '1'
+    assert_admin_query_budgets(admin_client)
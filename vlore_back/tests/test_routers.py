@@ -0,0 +1,148 @@
+import datetime
+
+import pytest
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+
+from expenses.models import ExpenseType
+from incomes.models import Income, IncomeLine
+from incomes.tests.factories import create_income, income_data
+from vlore_back.routers import (
+    REPLICA_DB,
+    REPLICA_PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    _read_from_replica,
+    replica_configured,
+)
+
+# Los tests con réplica necesitan DB_REPLICA_HOST (puede ser el mismo servidor que
+# DB_HOST): la réplica de tests es otra base, test_<nombre>_replica. Usan
+# transaction=True porque dentro de una transacción abierta en la base
+# principal el router no lee de la réplica
+requires_replica = pytest.mark.skipif(not replica_configured(), reason='Sin réplica configurada (DB_REPLICA_HOST)')
+
+CHANGELIST_URL = reverse('admin:incomes_income_changelist')
+
+
+def changelist_names(client):
+    response = client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+    return [income.buyer_name for income in response.context['cl'].result_list]
+
+
+@pytest.fixture
+def incomes_in_both_databases():
+    create_income(buyer_name='En la principal')
+    Income.objects.using(REPLICA_DB).create(**income_data(buyer_name='En la réplica'))
+
+
+@requires_replica
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_changelist_reads_from_replica(admin_client, incomes_in_both_databases):
+    assert changelist_names(admin_client) == ['En la réplica']
+
+
+@requires_replica
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_change_form_reads_from_default(admin_client):
+    income = create_income(buyer_name='En la principal')
+    Income.objects.using(REPLICA_DB).create(**income_data(id=income.pk, buyer_name='En la réplica'))
+
+    response = admin_client.get(reverse('admin:incomes_income_change', args=[income.pk]))
+
+    assert response.status_code == 200
+    assert response.context['original'].buyer_name == 'En la principal'
+
+
+@requires_replica
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_income_edit_updates_lines_in_its_database():
+    income = create_income(buyer_name='En la principal')
+    replica_income = Income.objects.using(REPLICA_DB).create(**income_data(id=income.pk, buyer_name='En la réplica'))
+
+    replica_income.product_name = 'Otra remera'
+    replica_income.date = replica_income.date - datetime.timedelta(days=1)
+    replica_income.save(using=REPLICA_DB)
+
+    replica_line = IncomeLine.objects.using(REPLICA_DB).get(income_id=income.pk)
+    assert (replica_line.name, replica_line.date) == ('Otra remera', replica_income.date)
+    default_line = IncomeLine.objects.using('default').get(income_id=income.pk)
+    assert (default_line.name, default_line.date) == (income.product_name, income.date)
+
+
+@requires_replica
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_write_goes_to_default_and_pins_reads(admin_client, incomes_in_both_databases):
+    response = admin_client.post(
+        reverse('admin:expenses_expensetype_add'), {'code': 'TST', 'name': 'Prueba'}
+    )
+
+    assert response.status_code == 302
+    assert ExpenseType.objects.using('default').filter(code='TST').exists()
+    assert not ExpenseType.objects.using(REPLICA_DB).filter(code='TST').exists()
+    assert response.cookies[REPLICA_PIN_COOKIE]['max-age'] > 0
+    # El cliente de pruebas conserva la cookie: los GET siguientes leen de la principal
+    assert changelist_names(admin_client) == ['En la principal']
+
+
+@requires_replica
+@pytest.mark.django_db(databases=['default', REPLICA_DB], transaction=True)
+def test_reads_inside_atomic_block_go_to_default():
+    router = ReplicaRouter()
+    token = _read_from_replica.set(True)
+    try:
+        assert router.db_for_read(Income) == REPLICA_DB
+        with transaction.atomic():
+            assert router.db_for_read(Income) is None
+    finally:
+        _read_from_replica.reset(token)
+
+
+@pytest.mark.django_db
+@pytest.mark.filterwarnings('ignore:Overriding setting DATABASES')
+def test_without_replica_reads_go_to_default(admin_client, settings):
+    settings.DATABASES = {alias: db for alias, db in settings.DATABASES.items() if alias != REPLICA_DB}
+    create_income(buyer_name='En la principal')
+
+    token = _read_from_replica.set(True)
+    try:
+        assert ReplicaRouter().db_for_read(Income) is None
+    finally:
+        _read_from_replica.reset(token)
+    assert changelist_names(admin_client) == ['En la principal']
+
+
+@pytest.mark.filterwarnings('ignore:Overriding setting DATABASES')
+@pytest.mark.parametrize('method, url, cookies, expected', [
+    ('get', CHANGELIST_URL, {}, REPLICA_DB),
+    ('head', reverse('admin:expenses_expenses_changelist'), {}, REPLICA_DB),
+    ('get', reverse('admin:incomes_income_top_products'), {}, REPLICA_DB),
+    ('get', reverse('admin:incomes_income_revenue'), {}, REPLICA_DB),
+    # Formularios de edición, otras vistas y escrituras leen de la principal
+    ('get', reverse('admin:incomes_income_change', args=[1]), {}, None),
+    ('get', reverse('admin:incomes_income_add'), {}, None),
+    ('get', reverse('metrics'), {}, None),
+    ('post', CHANGELIST_URL, {}, None),
+    ('get', CHANGELIST_URL, {REPLICA_PIN_COOKIE: '1'}, None),
+])
+def test_middleware_routes_only_changelists_and_reports(rf, settings, method, url, cookies, expected):
+    # Solo hace falta que el alias exista en la configuración: no se consulta la réplica
+    settings.DATABASES = {**settings.DATABASES, REPLICA_DB: settings.DATABASES['default']}
+    reads = []
+
+    def get_response(request):
+        request.resolver_match = resolve(request.path_info)
+        middleware.process_view(request, None, (), {})
+        reads.append(ReplicaRouter().db_for_read(Income))
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    request = getattr(rf, method)(url)
+    request.COOKIES.update(cookies)
+    middleware(request)
+
+    assert reads == [expected]
+    # Terminado el request las lecturas vuelven a la principal
+    assert ReplicaRouter().db_for_read(Income) is None
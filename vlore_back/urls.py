@@ -20,9 +20,14 @@ from django.urls import path
 from django.views.static import serve
 from django.views.generic import RedirectView
 
+from incomes.views import tiendanube_webhook
+from vlore_back.views import metrics_view
+
 urlpatterns = [
     path('', RedirectView.as_view(url='/panel/login/', permanent=True)),
     path('panel/', admin.site.urls),
+    path('webhooks/tiendanube/', tiendanube_webhook, name='tiendanube-webhook'),
+    path('metrics', metrics_view, name='metrics'),
 
     # Servir archivos de medios incluso en producción
     path('media/<path:path>', serve, {'document_root': settings.MEDIA_ROOT}),
@@ -0,0 +1,24 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from .metrics import render_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Métricas de todos los workers en formato de texto de Prometheus
+
+    Requiere el encabezado "Authorization: Bearer <METRICS_TOKEN>"; sin
+    METRICS_TOKEN configurado el endpoint no existe.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not settings.METRICS_ENABLED:
+        raise Http404
+    authorization = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')